@@ -6,11 +6,29 @@ instruction, ensuring the agent enforces corporate planning standards (6mo/2yr/5
 """
 
 import asyncio
+import time
+from typing import List
+from pydantic import BaseModel
 from google.adk.agents import Agent
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.genai import types 
-from config.settings import get_model_json, get_runner, initialize_session, cleanup
+from config.settings import get_model_json, get_runner, initialize_session, cleanup, get_response_cache_stats
+from config.settings import get_structured_output
+from config.stream_json import StreamingArrayParser
+from config.structured_output import StructuredOutputError
 
-import json
+# Streaming lights up the dashboard phase by phase. Either way identical runs hit the
+# response cache: a streamed answer is recorded and replayed chunk by chunk.
+STREAM_PHASES = True
+
+# The dashboard contract. Validated once per agent, streamed phase by phase.
+class RoadmapPhase(BaseModel):
+    phase: str
+    dependency: str
+    outcome: str
+
+class StrategicRoadmap(BaseModel):
+    roadmap: List[RoadmapPhase]
 
 async def main():
     # 1. ARCHITECT DESIGN: The Principal Roadmap Specialist
@@ -27,11 +45,13 @@ async def main():
             "Structure: {\"roadmap\": [{\"phase\": \"...\", \"dependency\": \"...\", \"outcome\": \"...\"}]}. "
             "Do not include any text before or after the JSON."
         ),
-        model=get_model_json()
+        # Temperature 0 + identical prompt: re-runs are served from the response cache.
+        model=get_model_json(cache_responses=True)
     )
 
     # 2. ORCHESTRATION: The Runner handles the context window management
     runner = get_runner(roadmap_lead)
+    contract = get_structured_output(roadmap_lead.name, StrategicRoadmap, max_reprompts=1)
     
     # 3. STATE REGISTRATION: Maintaining the continuity of the CIO Suite
     user_id, session_id = await initialize_session()
@@ -45,37 +65,56 @@ async def main():
     print(f"--- [LOG] Applying Phased Reasoning Methodology ---\n")
     
     # 5. EXECUTION: Asynchronous Synthesis
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE if STREAM_PHASES else StreamingMode.NONE)
+    started = time.perf_counter()
     events = runner.run_async(
         user_id=user_id,
         session_id=session_id,
-        new_message=content
+        new_message=content,
+        run_config=run_config
     )
     
     print("--- [STRATEGIC ROADMAP ARCHITECTURE] ---")
-    async_response_buffer = []
+    # Each {"phase","dependency","outcome"} object is emitted the moment its brace closes;
+    # a leading ```json fence is skipped by the parser.
+    parser = StreamingArrayParser("roadmap")
+    first_phase_s = None
+    streamed = False
     async for event in events:
-        if event.is_final_response():
-            output = event.content.parts[0].text
-            print(output)
-            async_response_buffer.append(output)
-        #if event.content and event.content.parts:
-        #    part_text = event.content.parts[0].text
-        #    if part_text:
-        #        print(part_text, end="") # See it streaming in real-time
-        #        async_response_buffer.append(part_text)
-
+        if not (event.content and event.content.parts and event.content.parts[0].text):
+            continue
+        part_text = event.content.parts[0].text
+        if event.partial:
+            streamed = True
+        elif streamed:
+            continue  # The final event repeats the text already streamed.
+        for phase in parser.feed(part_text):
+            try:
+                contract.validate_item("roadmap", phase)
+            except ValueError as e:
+                print(f"[WARN] Streamed phase failed the contract: {e.errors()[0]['msg']}")
+                continue
+            if first_phase_s is None:
+                first_phase_s = time.perf_counter() - started
+            print(f"[+{time.perf_counter() - started:6.2f}s] {phase.get('phase')}: "
+                  f"{phase.get('dependency')} -> {phase.get('outcome')}")
+    total_s = time.perf_counter() - started
+    if parser.malformed:
+        print(f"[WARN] {len(parser.malformed)} streamed phase(s) were malformed JSON; deferred to the repair pass.")
 
     # 6. LIFECYCLE MANAGEMENT: Closing the connection to the Ollama compute node
-    full_output = "".join(async_response_buffer).strip()
+    # Schema validation -> local repair (fences, trailing commas, truncation) -> one targeted re-prompt.
     try:
-        # Ollama in JSON mode sometimes still adds markdown wrappers
-        if full_output.startswith("```"):
-            full_output = full_output.strip("`").replace("json", "", 1).strip()
-        
-        structured_data = json.loads(full_output)
-        print("Dashboard Data Ready:", structured_data)
-    except json.JSONDecodeError as e:
-        print(f"Failed to parse. Raw output was: {full_output}")
+        structured_data = await contract.finalize(parser.text, runner, user_id, session_id)
+        print("Dashboard Data Ready:", structured_data.model_dump())
+    except StructuredOutputError as e:
+        print(f"Failed validation after repair: {e.errors[:3]}. Raw output was: {e.raw}")
+
+    first = f"{first_phase_s:.2f} s" if first_phase_s is not None else "n/a"
+    print(f"--- [LATENCY] Time-to-first-phase: {first} | Total: {total_s:.2f} s ---")
+
+    print(f"--- [CONTRACT] {contract.stats()} ---")
+    print(f"--- [CACHE] {get_response_cache_stats()} ---")
 
     await cleanup()
 
@@ -9,20 +9,27 @@ without requiring redundant prompt injection.
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import get_model, get_runner, initialize_session, cleanup, get_context_compactor
+from config.settings import get_session_ledger
 
 async def main():
     # 1. ARCHITECT DESIGN: The Continuity Specialist
     # We define the agent's ability to monitor and update its internal 'Context Blackboard.'
+    # Long workshops stay bounded: past CONTEXT_MAX_TOKENS older turns fold into a running summary.
+    compactor = get_context_compactor()
+    # Declared budgets, deadlines and splits become typed session state, re-rendered every turn.
+    ledger = get_session_ledger()
     context_lead = Agent(
         name="Cognitive_Strategy_Partner",
         instruction=(
             "You are a Senior Strategy Partner. Your primary function is 'Stateful Reasoning.' "
             "You must maintain an internal ledger of all variables, budgets, and constraints "
             "provided during this session. Use this shared history to inform all subsequent "
-            "strategic recommendations."
+            "strategic recommendations. The SESSION LEDGER block is authoritative for declared values."
         ),
-        model=get_model()
+        model=get_model(),
+        # Compactor first: it folds the full history, then the ledger keeps its last few turns.
+        before_model_callback=[compactor, ledger]
     )
 
     runner = get_runner(context_lead)
@@ -54,6 +61,8 @@ async def main():
         if event.is_final_response():
             print(f"\n--- [STRATEGIC ALLOCATION] ---\n{event.content.parts[0].text}")
 
+    print(f"--- [CONTEXT] {compactor.stats()} | ledger facts recorded: {ledger.facts_recorded} ---")
+
     # 3. LIFECYCLE MANAGEMENT: Closing the stateful socket
     await cleanup()
 
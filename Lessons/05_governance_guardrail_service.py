@@ -9,11 +9,15 @@ PII/HIPAA-style constraints and handles infrastructure timeouts gracefully.
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import get_model, get_runner, initialize_session, cleanup, get_policy_guardrail
+from config.settings import redact_stream, get_redaction_policy
 
 async def main():
     # 1. ARCHITECT DESIGN: The Governance-First Strategist
     # We use "Policy-Based Prompting" to define non-negotiable boundaries.
+    # Clear-cut violations (PII, individual pay, HR records) never reach the model: a compiled
+    # prefilter returns the policy refusal locally, saving a full generation per probe.
+    guardrail = get_policy_guardrail()
     governed_lead = Agent(
         name="Compliance_Governance_Specialist",
         instruction=(
@@ -24,7 +28,8 @@ async def main():
             "3. PROTOCOL: If a query violates corporate policy, state the specific policy reason "
             "and offer a high-level strategic alternative."
         ),
-        model=get_model()
+        model=get_model(),
+        before_model_callback=guardrail.before_model
     )
 
     runner = get_runner(governed_lead)
@@ -40,15 +45,18 @@ async def main():
     
     try:
         # EXECUTION: Managing the asynchronous event stream within a protective envelope.
-        events = runner.run_async(
+        # Output passes through streaming PII redaction before it reaches the console.
+        events = redact_stream(runner.run_async(
             user_id=user_id,
             session_id=session_id,
             new_message=content
-        )
+        ))
         
         print("--- [GOVERNED OUTPUT] ---")
         async for event in events:
             if event.is_final_response():
+                if event.custom_metadata and "guardrail" in event.custom_metadata:
+                    print(f"[PREFILTER] Refused locally: {event.custom_metadata['guardrail']}")
                 print(event.content.parts[0].text)
                 
     except Exception as technical_fault:
@@ -57,6 +65,9 @@ async def main():
         print(f"--- [CRITICAL FAULT] Infrastructure Failure: {technical_fault} ---")
         print("--- [ACTION] Triggering Session Recovery and Administrator Alert ---")
 
+    print(f"--- [GUARDRAIL] {guardrail.stats()} ---")
+    print(f"--- [REDACTION] {get_redaction_policy().stats()} ---")
+
     # 3. CLEANUP: Ensuring no residual data remains in local memory buffers.
     await cleanup()
 
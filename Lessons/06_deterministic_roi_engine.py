@@ -8,15 +8,17 @@ to eliminate hallucinated metrics.
 
 
 import asyncio
-import ast
 import inspect
-import re
 from google.adk.agents import Agent
 from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import get_model, get_runner, get_tool_runtime, initialize_session, cleanup
+from config.settings import deterministic_tool, get_tool_memo_stats
+from config.roi_engine import evaluate_portfolio
+from config.money_parser import normalize_arguments
 
 # 1. ARCHITECT DESIGN: The Atomic Financial Tool
-# THE TOOL: Deterministic Microservice
+# THE TOOL: Deterministic Microservice (memoized: the retry loop repeats identical calls)
+@deterministic_tool
 def run_math_calculation(cap_ex: float, annual_opex_savings: float) -> dict:
     roi = ((annual_opex_savings - cap_ex) / cap_ex) * 100
     payback = cap_ex / annual_opex_savings if annual_opex_savings > 0 else 0
@@ -25,7 +27,9 @@ def run_math_calculation(cap_ex: float, annual_opex_savings: float) -> dict:
 TOOL_REGISTRY = {
     "run_math_calculation": run_math_calculation,
     "calculate_roi": run_math_calculation,
-    "math_tool": run_math_calculation
+    "math_tool": run_math_calculation,
+    # Vectorized engine: ROI / payback / NPV / IRR + sensitivity grid for a whole portfolio.
+    "evaluate_portfolio": evaluate_portfolio
 }
 
 # The Step 2 Validator
@@ -37,29 +41,21 @@ def validate_inputs(args):
     except:
         return False, "Invalid numeric data."
 
-# The Step 3 Super Scrubber
-def scrub_arguments(raw_args):
-    if isinstance(raw_args, str):
-        try: raw_args = ast.literal_eval(raw_args)
-        except: return {}
-    
-    clean_dict = {}
-    for k, v in raw_args.items():
-        # Step 3 logic: clean the value
-        cleaned_val = super_scrub(v) 
-        
-        # Step 1 logic: map to correct key
-        key = k.lower()
-        if any(x in key for x in ["cap", "cost", "exp"]): clean_dict["cap_ex"] = cleaned_val
-        if any(x in key for x in ["save", "opex"]): clean_dict["annual_opex_savings"] = cleaned_val
-    return clean_dict
-
-def super_scrub(val):
-    if isinstance(val, (int, float)): return float(val)
-    clean_val = re.sub(r'[$,\s]', '', str(val)).lower()
-    mult = 1000.0 if 'k' in clean_val else 1000000.0 if 'm' in clean_val else 1.0
-    match = re.search(r"[-+]?\d*\.\d+|\d+", clean_val.replace('k','').replace('m',''))
-    return float(match.group()) * mult if match else 0.0
+# The Step 3 Super Scrubber: config/money_parser.normalize_arguments maps keys
+# (cap/cost/exp -> cap_ex, sav/opex -> annual_opex_savings) and parses "$2.5M",
+# "450k", "1.2 million", "(300k)" or "$2-3M" with precompiled patterns.
+
+# The Step 4 Dispatcher: resolves one function call to (tool, clean args) or an error payload.
+def resolve_call(call, agent_name):
+    target_func = TOOL_REGISTRY.get(call.name)
+    if not target_func or call.name == agent_name:
+        return {'error': 'Use math tool'}
+    # Portfolio calls carry a structured project list: validated inside the engine.
+    if target_func is evaluate_portfolio:
+        return target_func, call.args or {}
+    clean_args = normalize_arguments(call.args)
+    valid, err = validate_inputs(clean_args)
+    return (target_func, clean_args) if valid else {'error': err}
 
 
 
@@ -67,12 +63,16 @@ async def main():
     agent_name = "FinOps_Analyst"
     agent = Agent(
         name=agent_name,
-        instruction="Use 'run_math_calculation' for math. Then give a plain text summary.",
+        instruction=(
+            "Use 'run_math_calculation' for math. For several projects at once, call 'evaluate_portfolio' "
+            "a single time with every project. Then give a plain text summary."
+        ),
         model=get_model(),
-        tools=[run_math_calculation]
+        tools=[run_math_calculation, evaluate_portfolio]
     )
 
     runner = get_runner(agent)
+    runtime = get_tool_runtime()
     user_id, session_id = await initialize_session()    
     query = "Analyze a $250k project with $400,000 yearly savings."
     content = types.Content(role="user", parts=[types.Part(text=query)])
@@ -87,39 +87,27 @@ async def main():
         async for event in events:
             if not event.content or not event.content.parts: continue
 
+            # Every function call of the turn, not just the first one.
+            calls = event.get_function_calls()
+            if calls:
+                # CIRCUIT BREAKER: If it already has math and drifts to unknown tools, just exit and summarize
+                if stored_result and any(TOOL_REGISTRY.get(c.name) is None or c.name == agent_name for c in calls):
+                    print(f"\n--- [FINAL SUMMARY] ---\nROI: {stored_result['roi_percent']}% | Payback: {stored_result['payback_years']} yrs.")
+                    await cleanup(); return
+
+                # Scrub, Validate & Execute: all calls concurrently, all responses in one tool message
+                print(f"[TURN {turn}] Executing {len(calls)} tool call(s)...")
+                content = await runtime.execute(calls, resolve=lambda c: resolve_call(c, agent_name), role="tool")
+                for res in content.parts:
+                    result = res.function_response.response.get('result')
+                    if isinstance(result, dict) and 'roi_percent' in result:
+                        stored_result = result
+                print(f"[TOOLS] {runtime.stats()}")
+                print(f"[MEMO] {get_tool_memo_stats()}")
+                response_received = True; break
+
             for part in event.content.parts:
-                if part.function_call:
-                    call_name = part.function_call.name
-                    call_id = part.function_call.id
-                    
-                    # Registry & Alias Check
-                    target_func = TOOL_REGISTRY.get(call_name)
-                    
-                    if not target_func or call_name == agent_name:
-                        # CIRCUIT BREAKER: If it already has math, just exit and summarize
-                        if stored_result:
-                            print(f"\n--- [FINAL SUMMARY] ---\nROI: {stored_result['roi_percent']}% | Payback: {stored_result['payback_years']} yrs.")
-                            await cleanup(); return
-                        
-                        # Otherwise, tell it to try the right tool
-                        res_part = types.Part(function_response=types.FunctionResponse(id=call_id, name=call_name, response={'error': 'Use math tool'}))
-                        content = types.Content(role="tool", parts=[res_part]); response_received = True; break
-
-                    # Scrub & Validate
-                    clean_args = scrub_arguments(part.function_call.args)
-                    valid, err = validate_inputs(clean_args)
-                    
-                    if not valid:
-                        res_part = types.Part(function_response=types.FunctionResponse(id=call_id, name=call_name, response={'error': err}))
-                        content = types.Content(role="tool", parts=[res_part]); response_received = True; break
-
-                    # Execute
-                    print(f"[TURN {turn}] Calculating...")
-                    stored_result = target_func(**clean_args)
-                    res_part = types.Part(function_response=types.FunctionResponse(id=call_id, name=call_name, response={'result': stored_result}))
-                    content = types.Content(role="tool", parts=[res_part]); response_received = True; break
-
-                elif part.text and part.text.strip():
+                if part.text and part.text.strip():
                     print(f"\n--- [AGENT SUMMARY] ---\n{part.text.strip()}")
                     await cleanup(); return 
 
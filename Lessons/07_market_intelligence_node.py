@@ -9,9 +9,28 @@ the agent to live industry vectors, we ensure strategic alignment with the
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import get_model, get_runner, initialize_session, cleanup, get_semantic_cache
+from config.settings import cached_io_tool, get_io_cache_stats
+from config.sector_index import SectorIndex
 
 # 1. ARCHITECT DESIGN: The Market Intelligence Tool (Async Pattern)
+# Simulation of a high-latency API call (e.g., Tavily, Serper, or Internal RAG)
+INTELLIGENCE_VAULT = {
+    "Banking": "2026 SHIFT: Transition from 'Mobile-First' to 'Agentic-First' banking. Differentiator: Sovereign AI agents for hyper-personalized asset management.",
+    "Supply Chain": "2026 SHIFT: Autonomous mesh networks for logistics. Differentiator: Predictive self-healing supply chains.",
+    "Healthcare": "2026 SHIFT: Generative Diagnostic Co-pilots. Differentiator: Sub-second clinical decision support (CDS) integration."
+}
+SECTOR_ALIASES = {
+    "finance": "Banking", "financial services": "Banking", "banking and finance": "Banking", "fintech": "Banking",
+    "logistics": "Supply Chain", "procurement": "Supply Chain",
+    "health": "Healthcare", "medical": "Healthcare", "life sciences": "Healthcare",
+}
+# Prebuilt once: noisy sector strings ("banking & finance", "supply-chain", "health care")
+# resolve to a vault key in microseconds instead of falling through to the generic trend.
+SECTOR_INDEX = SectorIndex(INTELLIGENCE_VAULT, aliases=SECTOR_ALIASES)
+
+# Sector telemetry moves slowly: one fetch per sector per 15 minutes, shared by every session.
+@cached_io_tool(ttl=900, key=lambda industry_vector: SECTOR_INDEX.canonical(industry_vector))
 async def fetch_industry_intelligence(industry_vector: str) -> str:
     """
     Retrieves high-fidelity innovation trends and competitive differentiators 
@@ -20,22 +39,17 @@ async def fetch_industry_intelligence(industry_vector: str) -> str:
     Args:
         industry_vector: The specific sector (e.g., 'Banking', 'Healthcare').
     """
-    # Defensive programming: Normalizing the input vector
-    sector = str(industry_vector).strip().title()
-    
-    # Simulation of a high-latency API call (e.g., Tavily, Serper, or Internal RAG)
-    intelligence_vault = {
-        "Banking": "2026 SHIFT: Transition from 'Mobile-First' to 'Agentic-First' banking. Differentiator: Sovereign AI agents for hyper-personalized asset management.",
-        "Supply Chain": "2026 SHIFT: Autonomous mesh networks for logistics. Differentiator: Predictive self-healing supply chains.",
-        "Healthcare": "2026 SHIFT: Generative Diagnostic Co-pilots. Differentiator: Sub-second clinical decision support (CDS) integration."
-    }
+    # Defensive programming: Resolving the noisy input vector to a vault sector
+    sector = SECTOR_INDEX.canonical(industry_vector)
     
-    data_payload = intelligence_vault.get(sector, "TREND DETECTED: Cross-sector acceleration of Agentic AI Orchestration Layers.")
+    data_payload = INTELLIGENCE_VAULT.get(sector, "TREND DETECTED: Cross-sector acceleration of Agentic AI Orchestration Layers.")
     return f"[EXTERNAL DATA SOURCE] Intelligence for {sector}: {data_payload}"
 
 async def main():
     # 2. ORCHESTRATION: The Market Intelligence Lead
     # We move beyond 'answering' to 'synthesizing' opportunity vs. threat.
+    # A rephrased sector question skips both the tool round-trip and the generation.
+    semantic_cache = get_semantic_cache()
     market_lead = Agent(
         name="MarketIntelligence_Analyst",
         instruction=(
@@ -46,7 +60,9 @@ async def main():
             "OUTPUT STRUCTURE: 1. Current Shift | 2. Strategic Differentiator | 3. CIO Opportunity vs. Threat."
         ),
         model=get_model(),
-        tools=[fetch_industry_intelligence] 
+        tools=[fetch_industry_intelligence],
+        before_model_callback=semantic_cache.before_model,
+        after_model_callback=semantic_cache.after_model,
     )
 
     runner = get_runner(market_lead)
@@ -72,6 +88,9 @@ async def main():
             print(event.content.parts[0].text)
 
     # 5. LIFECYCLE MANAGEMENT
+    print(f"--- [CACHE] {semantic_cache.stats()} ---")
+    print(f"--- [IO CACHE] {get_io_cache_stats()} ---")
+    print(f"--- [SECTOR INDEX] {SECTOR_INDEX.stats()['lookups']} ---")
     await cleanup()
 
 if __name__ == "__main__":
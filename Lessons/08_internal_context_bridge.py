@@ -10,9 +10,20 @@ import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
 from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import cached_io_tool, get_io_cache_stats, get_skb_store
+from config.skb_prefetch import SkbPrefetcher
 
 # 1. ARCHITECT DESIGN: The Internal Knowledge Base (SKB) Connector
-# This simulates an MCP-compliant server querying a Vector Store or SQL DB.
+# This simulates an MCP-compliant server querying an indexed SQL store (SQLite + FTS5).
+# Seed records for the lesson; real exports load via get_skb_store().load_csv/load_jsonl.
+INTERNAL_SKB_SEED = {
+    "Project_Alpha": "Status: CRITICAL/DELAYED. Risk: Legacy API bottleneck. Budget: $1.2M utilized.",
+    "Cloud_Migration": "Status: OPTIMIZED. Savings: $300k YTD. Infrastructure: 65% Serverless transition.",
+    "Cyber_Shield": "Status: PROTOTYPING. Priority: P0 (Executive Mandate). Launch: Q3 2026."
+}
+
+# Project telemetry changes intra-day, so entries live one minute (plus one stale minute).
+@cached_io_tool(ttl=60, key=lambda resource_key: str(resource_key).replace(" ", "_").title())
 async def query_internal_strategy_skb(resource_key: str) -> str:
     """
     Queries the private Strategy Knowledge Base for real-time project telemetry, 
@@ -23,16 +34,28 @@ async def query_internal_strategy_skb(resource_key: str) -> str:
     """
     # Defensive normalization of the lookup key
     lookup = str(resource_key).replace(" ", "_").title()
+    skb = get_skb_store()
+
+    # Exact key first (indexed), then key prefix, then ranked full text over records and KPIs.
+    data_entry = skb.get(lookup)
+    if data_entry is not None:
+        return f"[INTERNAL DATA SOURCE - SECURE] {lookup}: {data_entry}"
+    related = skb.prefix(lookup, limit=3) or skb.search(str(resource_key), limit=3)
+    if related:
+        closest = " | ".join(f"{key}: {body}" for key, body in related)
+        return f"[INTERNAL DATA SOURCE - SECURE] {lookup}: No exact record. Closest records -> {closest}"
+    return f"[INTERNAL DATA SOURCE - SECURE] {lookup}: NULL: No internal record found. Exercise caution."
+
+async def query_internal_strategy_skb_batch(resource_keys: list[str]) -> dict:
+    """
+    Queries the private Strategy Knowledge Base for several project identifiers or
+    KPI names in one call (use this when comparing or reallocating between projects).
     
-    # Mocking a secure internal repository
-    internal_skb = {
-        "Project_Alpha": "Status: CRITICAL/DELAYED. Risk: Legacy API bottleneck. Budget: $1.2M utilized.",
-        "Cloud_Migration": "Status: OPTIMIZED. Savings: $300k YTD. Infrastructure: 65% Serverless transition.",
-        "Cyber_Shield": "Status: PROTOTYPING. Priority: P0 (Executive Mandate). Launch: Q3 2026."
-    }
-    
-    data_entry = internal_skb.get(lookup, "NULL: No internal record found. Exercise caution.")
-    return f"[INTERNAL DATA SOURCE - SECURE] {lookup}: {data_entry}"
+    Args:
+        resource_keys: The internal project identifiers or KPI metric names.
+    """
+    found = get_skb_store().get_many(resource_keys)
+    return {key: entry or "NULL: No internal record found. Exercise caution." for key, entry in found.items()}
 
 async def main():
     # 2. ORCHESTRATION: The Strategic Resource Auditor
@@ -44,19 +67,27 @@ async def main():
             "Your mission: Perform resource reconciliation by comparing internal project status "
             "against corporate goals. "
             "PROTOCOL: You MUST invoke 'query_internal_strategy_skb' for any mention of "
-            "internal projects or KPIs. Prioritize the returned [INTERNAL DATA] over "
+            "internal projects or KPIs; use 'query_internal_strategy_skb_batch' when several "
+            "projects are involved. Records already attached under [PREFETCHED INTERNAL CONTEXT] "
+            "count as queried: use them directly and only call the tools for resources they do not cover. "
+            "Prioritize the returned [INTERNAL DATA] over "
             "your general training knowledge for final recommendations."
         ),
         model=get_model(),
-        tools=[query_internal_strategy_skb] 
+        tools=[query_internal_strategy_skb, query_internal_strategy_skb_batch] 
     )
 
     runner = get_runner(resource_auditor)
+    get_skb_store().upsert(INTERNAL_SKB_SEED)
     user_id, session_id = await initialize_session()
     
     # 3. INTERNAL DATA INQUIRY: A high-stakes resource reallocation query
     user_query = "Assess the viability of shifting senior engineering resources from Project Alpha to the Cloud Migration initiative."
     content = types.Content(role="user", parts=[types.Part(text=user_query)])
+    # Pre-dispatch: SKB records named in the query are fetched concurrently and attached,
+    # saving the model pass that would only have asked for them.
+    prefetcher = SkbPrefetcher(get_skb_store(), fetch=query_internal_strategy_skb)
+    content = await prefetcher.ground(content)
     
     print(f"--- [SYSTEM] Establishing Secure SKB Bridge | Session: {session_id} ---")
     print(f"--- [LOG] Interrogating Private Data Store for Resource Key: 'Project Alpha' ---\n")
@@ -74,6 +105,8 @@ async def main():
             print(event.content.parts[0].text)
 
     # 5. LIFECYCLE MANAGEMENT
+    print(f"--- [IO CACHE] {get_io_cache_stats()} ---")
+    print(f"--- [SKB] {len(get_skb_store()):,} records indexed | prefetch {prefetcher.stats()} ---")
     await cleanup()
 
 if __name__ == "__main__":
@@ -10,15 +10,27 @@ import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
 from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import redact_stream, get_redaction_policy
+from config.settings import get_policy_engine
+from config.preauth import PreAuthorizer, protected_tool
 
 # 1. ARCHITECT DESIGN: The Entitlement Registry (Mock IAM)
 # In production, this would be an OIDC token or Active Directory lookup.
+# Roles inherit their parents' scopes; the policy engine compiles both into bitmasks.
+IAM_ROLES = {
+    "analyst": {"scopes": ["market_research"]},
+    "finance_lead": {"scopes": ["calculate_roi"], "inherits": ["analyst"]},
+    "executive": {"scopes": ["authorize_budget"], "inherits": ["finance_lead"]},
+}
 IAM_REGISTRY = {
-    "exec_lead_2026": ["market_research", "calculate_roi", "authorize_budget"],
-    "associate_analyst": ["market_research"]
+    "exec_lead_2026": ["executive"],
+    "associate_analyst": ["analyst"]
 }
 
 # 2. PROTECTED TOOL: Budget Authorization Service
+# Scope and action-verb metadata let the pre-check refuse an explicit command
+# ("Reallocate $500,000 to Project Alpha") before the model runs; questions still reach it.
+@protected_tool(["authorize_budget"], intents=[r"realloc", r"transfer", r"authori[sz]e", r"move", r"shift"])
 def authorize_capital_reallocation(amount: float, target_project: str, user_id: str) -> str:
     """
     Executes a fund transfer between strategic initiatives. 
@@ -31,10 +43,9 @@ def authorize_capital_reallocation(amount: float, target_project: str, user_id:
     """
     # Defensive Check: Explicitly cast and verify principal identity
     principal = str(user_id).strip()
-    scopes = IAM_REGISTRY.get(principal, [])
     
-    # Policy Enforcement Point (PEP)
-    if "authorize_budget" not in scopes:
+    # Policy Enforcement Point (PEP): cached bitmask decision, audited either way.
+    if not get_policy_engine().authorize(principal, "authorize_budget", resource=target_project):
         return f"[SECURITY ALERT] Access Denied: Principal '{principal}' lacks 'authorize_budget' scope."
     
     return f"[SUCCESS] Transaction Confirmed: ${amount:,.2f} reallocated to {target_project} by authorized principal '{principal}'."
@@ -42,6 +53,7 @@ def authorize_capital_reallocation(amount: float, target_project: str, user_id:
 async def main():
     # 3. ORCHESTRATION: The Governance-Aware Strategist
     # We instruct the agent to be transparent about security policies.
+    preauth = PreAuthorizer(get_policy_engine(), [authorize_capital_reallocation])
     secure_lead = Agent(
         name="IAM_Governance_Strategist",
         instruction=(
@@ -51,10 +63,15 @@ async def main():
             "3. Do not attempt to bypass or 'hallucinate' permissions."
         ),
         model=get_model(),
-        tools=[authorize_capital_reallocation] 
+        tools=[authorize_capital_reallocation],
+        # Entitlement pre-check: provable denials never reach the model; other turns only
+        # see the tools this session's principal may use.
+        before_model_callback=preauth.before_model
     )
 
     runner = get_runner(secure_lead)
+    # Reloading the registry recompiles the masks and invalidates every cached decision.
+    get_policy_engine().load(IAM_REGISTRY, IAM_ROLES)
     
     # 4. SCENARIO: Testing an unauthorized principal (Junior Analyst)
     # The Architect tests the failure mode to ensure the system fails 'closed.'
@@ -72,17 +89,25 @@ async def main():
     print(f"--- [LOG] Principal '{current_user}' attempting sensitive financial action ---\n")
     
     # 5. EXECUTION: The Agent attempts to act, but the Tool enforces the gate
-    events = runner.run_async(
+    # The audit log is printed through streaming PII redaction (emails, phones, account IDs).
+    events = redact_stream(runner.run_async(
         user_id=user_id,
         session_id=session_id,
         new_message=content
-    )
+    ))
     
     print("--- [GOVERNANCE AUDIT LOG] ---")
     async for event in events:
+        if event.custom_metadata and "preauth" in event.custom_metadata:
+            print(f"[PREAUTH] Refused before the model: {event.custom_metadata['preauth']}")
         if event.is_final_response():
             print(event.content.parts[0].text)
 
+    print(f"--- [REDACTION] {get_redaction_policy().stats()} ---")
+    # Flush first: audit_written only counts records already on disk.
+    await get_policy_engine().audit.flush()
+    print(f"--- [IAM] {get_policy_engine().stats()} | pre-check {preauth.stats()} ---")
+
     # 6. LIFECYCLE MANAGEMENT
     await cleanup()
 
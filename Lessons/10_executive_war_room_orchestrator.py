@@ -8,8 +8,15 @@ self-correcting intelligence loop that mimics executive decision-making.
 
 import asyncio
 from google.adk.agents import Agent
-from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import get_model, initialize_session, cleanup, get_workflow, get_session_scope
+
+STAGE_BANNERS = {
+    "pitch": "🚀 [STAGE] Growth_Orchestrator delivered the Innovation Case",
+    "fiscal_audit": "⚖️ [STAGE] Risk_Audit_Specialist completed the Fiscal Stress-Test",
+    "legal_review": "📜 [STAGE] Legal_Compliance_Counsel completed the Regulatory Review",
+    "security_review": "🛡️ [STAGE] Security_Architecture_Lead completed the Threat Model",
+    "verdict": "🏛️ [STAGE] Executive_Decision_Lead issued the verdict",
+}
 
 async def main():
     # 1. ARCHITECT DESIGN: Defining the "Conflict Personas"
@@ -33,6 +40,31 @@ async def main():
         model=get_model()
     )
 
+    # Agents 3 & 4: Independent critiques that only need the pitch, so they run beside the CFO
+    legal = Agent(
+        name="Legal_Compliance_Counsel",
+        instruction=(
+            "You are General Counsel. Identify labor-law, consumer-protection and liability "
+            "exposure. Cite the obligations the proposal would breach."
+        ),
+        model=get_model()
+    )
+    security = Agent(
+        name="Security_Architecture_Lead",
+        instruction=(
+            "You are the CISO. Threat-model the proposal: data exposure, prompt injection, "
+            "fraud vectors and the blast radius of an agent failure."
+        ),
+        model=get_model()
+    )
+
+    # Agent 5: The Board Synthesis (CEO), reconciling every view
+    ceo_synthesizer = Agent(
+        name="Executive_Decision_Lead", 
+        instruction="Review the following debate. Provide a final 'Go/No-Go' recommendation with three mandatory mitigation steps.", 
+        model=get_model()
+    )
+
     # 2. STATE INITIALIZATION
     user_id, session_id = await initialize_session()
     proposal = "Decommission 100% of human-led customer support in favor of Agentic AI by Q1 2026."
@@ -40,46 +72,51 @@ async def main():
     print(f"--- [SYSTEM] Initializing Strategic War Room | Session: {session_id} ---")
     print(f"--- [PROPOSAL] {proposal} ---\n")
 
-    # --- PHASE 1: The Innovation Pitch ---
-    # Capturing the 'Pro' vector
-    runner_inv = get_runner(innovator)
-    content_inv = types.Content(role="user", parts=[types.Part(text=f"Draft a high-impact pitch for: {proposal}")])
-    pitch_payload = ""
-    
-    print("🚀 [ACTION] Growth_Orchestrator drafting the Innovation Case...")
-    async for event in runner_inv.run_async(user_id=user_id, session_id=session_id, new_message=content_inv):
-        if event.is_final_response():
-            pitch_payload = event.content.parts[0].text
-    
-    # --- PHASE 2: The Fiscal Rebuttal ---
-    # Handing off the 'Pro' vector to the 'Con' agent for critique
-    runner_cfo = get_runner(cfo)
-    content_cfo = types.Content(role="user", parts=[types.Part(text=f"Perform a ruthless risk audit on this pitch: {pitch_payload}")])
-    audit_payload = ""
+    # 3. WORKFLOW DESIGN: Each stage declares the outputs it reads; independent critiques
+    # run concurrently as soon as the pitch lands (WORKFLOW_MAX_CONCURRENCY caps the fan-out).
+    # Every agent runs in its own sub-session of the war-room session and sees only its
+    # declared inputs; outputs are handed off to the parent session as 'handoff:<stage>'.
+    scope = get_session_scope(user_id, session_id)
+    war_room = get_workflow()
+    war_room.add("pitch", scope.stage(innovator, "Draft a high-impact pitch for: {proposal}", name="pitch"),
+                 inputs=["proposal"])
+    war_room.add("fiscal_audit", scope.stage(cfo, "Perform a ruthless risk audit on this pitch: {pitch}", name="fiscal_audit"),
+                 inputs=["pitch"])
+    war_room.add("legal_review", scope.stage(legal, "Review this pitch for legal exposure: {pitch}", name="legal_review"),
+                 inputs=["pitch"])
+    war_room.add("security_review", scope.stage(security, "Threat-model this pitch: {pitch}", name="security_review"),
+                 inputs=["pitch"])
+    war_room.add("verdict", scope.stage(
+        ceo_synthesizer,
+        "INNOVATION CASE: {pitch}\n\nFISCAL AUDIT: {fiscal_audit}\n\n"
+        "LEGAL REVIEW: {legal_review}\n\nSECURITY REVIEW: {security_review}",
+        name="verdict",
+    ), inputs=["pitch", "fiscal_audit", "legal_review", "security_review"])
 
-    print("⚖️ [ACTION] Risk_Audit_Specialist executing Fiscal Stress-Test...")
-    async for event in runner_cfo.run_async(user_id=user_id, session_id=session_id, new_message=content_cfo):
-        if event.is_final_response():
-            audit_payload = event.content.parts[0].text
+    # 4. EXECUTION: Stage completions stream in as they land
+    events = []
+    async for event in war_room.stream({"proposal": proposal}):
+        events.append(event)
+        if event["status"] != "done":
+            print(f"⚠️ [STAGE] {event['stage']} {event['status']}: {event['error']}")
+            continue
+        print(f"{STAGE_BANNERS[event['stage']]} | {event['latency_s']:.1f}s | "
+              f"{event['prompt_tokens']} -> {event['output_tokens']} tokens")
+        if event["stage"] == "verdict":
+            print("\n--- [FINAL EXECUTIVE RECONCILIATION] ---")
+            print(event["output"])
 
-    # --- PHASE 3: The Board Synthesis (CEO) ---
-    # Final 'Policy Enforcement' agent to reconcile the two views
-    ceo_synthesizer = Agent(
-        name="Executive_Decision_Lead", 
-        instruction="Review the following debate. Provide a final 'Go/No-Go' recommendation with three mandatory mitigation steps.", 
-        model=get_model()
-    )
-    runner_ceo = get_runner(ceo_synthesizer)
-    
-    final_debate_vector = f"INNOVATION CASE: {pitch_payload}\n\nFISCAL AUDIT: {audit_payload}"
-    content_final = types.Content(role="user", parts=[types.Part(text=final_debate_vector)])
-    
-    print("\n--- [FINAL EXECUTIVE RECONCILIATION] ---")
-    async for event in runner_ceo.run_async(user_id=user_id, session_id=session_id, new_message=content_final):
-        if event.is_final_response():
-            print(event.content.parts[0].text)
+    path, path_s = war_room.critical_path(events)
+    # Not a serial run: stages sharing one model run slower side by side. For a measured
+    # cap-1 vs cap-4 comparison see `python -m config.workflow`.
+    stage_sum_s = sum(e.get("latency_s", 0.0) for e in events)
+    print(f"\n--- [WORKFLOW] wall {max(e.get('end_s', 0.0) for e in events):.1f}s | "
+          f"sum of stage latencies {stage_sum_s:.1f}s | critical path {' -> '.join(path)} = {path_s:.1f}s ---")
+    prompt_tokens = sum(e.get("prompt_tokens", 0) for e in events)
+    print(f"--- [CONTEXT] {prompt_tokens:,} prompt tokens across {len(events)} scoped agents | "
+          f"hand-offs on the war-room session: {sorted(await scope.handoffs())} ---")
 
-    # 3. LIFECYCLE MANAGEMENT
+    # 5. LIFECYCLE MANAGEMENT
     await cleanup()
 
 if __name__ == "__main__":
@@ -10,7 +10,7 @@ import asyncio
 import time
 from google.adk.agents import Agent
 from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import get_model, get_runner, initialize_session, cleanup, get_model_pool_stats, get_endpoint_metrics
 
 async def execute_strategic_audit(runner, user_id, session_id, project_name, draft_text):
     """
@@ -78,6 +78,15 @@ async def main():
     execution_time = time.perf_counter() - start_benchmark
     print(f"--- [SYSTEM] Portfolio Audit Completed in {execution_time:.2f} seconds. ---")
 
+    # Connection telemetry: reused sockets mean no per-audit TCP handshake.
+    pool = get_model_pool_stats()
+    print(f"--- [POOL] Requests: {pool['requests_sent']} | New Connections: {pool['connections_opened']} "
+          f"| Reused: {pool['connections_reused']} | Client Hits/Misses: {pool['hits']}/{pool['misses']} ---")
+    # Only populated when OLLAMA_API_BASE lists several inference nodes.
+    for endpoint, node in get_endpoint_metrics().items():
+        print(f"--- [NODE] {endpoint} | Requests: {node['requests']} | Errors: {node['errors']} "
+              f"| Avg Latency: {node['avg_latency_ms']} ms | Healthy: {node['healthy']} ---")
+
     # 5. LIFECYCLE MANAGEMENT
     await cleanup()
 
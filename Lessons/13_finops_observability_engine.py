@@ -9,7 +9,7 @@ operational spend, enabling 'Value-Based' model orchestration.
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import get_model, get_runner, initialize_session, cleanup, get_semantic_cache
 
 # ARCHITECT'S BENCHMARK: 2026 Model Unit Pricing
 # Pricing reflects enterprise-grade tokens/sec and reliability.
@@ -19,6 +19,8 @@ COST_PER_1M_TOKENS_OUT = 1.50 # Reasoning generation cost
 async def main():
     # 1. ARCHITECT DESIGN: The Efficiency Lead
     # Instructed to balance depth with token economy.
+    # Rephrased repeats of an answered inquiry are served by the semantic cache at zero token cost.
+    semantic_cache = get_semantic_cache()
     efficiency_lead = Agent(
         name="FinOps_Analyst",
         instruction=(
@@ -26,7 +28,9 @@ async def main():
             "Analyze the inquiry with precision. Avoid 'Token Bloat'—ensure "
             "every word adds measurable strategic value."
         ),
-        model=get_model()
+        model=get_model(),
+        before_model_callback=semantic_cache.before_model,
+        after_model_callback=semantic_cache.after_model,
     )
 
     runner = get_runner(efficiency_lead)
@@ -52,6 +56,10 @@ async def main():
             
             # 4. METADATA EXTRACTION: The FinOps Audit
             usage = event.usage_metadata
+            if usage is None:
+                # Served from the semantic cache: no model call, no token spend.
+                print(f"\n--- [CACHE] Semantic hit {event.custom_metadata} | Insight Cost: $0.00000 ---")
+                continue
             p_tokens = usage.prompt_token_count
             c_tokens = usage.candidates_token_count
             total_tokens = p_tokens + c_tokens
@@ -69,6 +77,7 @@ async def main():
             print(f"Calculated Insight Cost:  ${total_cost:.5f}")
             print("—"*40)
 
+    print(f"--- [CACHE] {semantic_cache.stats()} ---")
     await cleanup()
 
 if __name__ == "__main__":
@@ -7,9 +7,8 @@ tone, we ensure the CIO's office receives consistent, board-ready intelligence.
 """
 
 import asyncio
-from google.adk.agents import Agent
 from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import get_model, get_agent, get_runner, initialize_session, cleanup
 
 async def validate_agent_contract(test_name, query, success_criteria):
     """
@@ -18,7 +17,8 @@ async def validate_agent_contract(test_name, query, success_criteria):
     print(f"[TESTING] {test_name}...")
     
     # 1. SETUP: The Subject under Test
-    strategy_subject = Agent(
+    # The registry hands every test vector the same built subject and runner.
+    strategy_subject = get_agent(
         name="Strategy_Vetting_Subject",
         instruction=(
             "You are a Senior CIO Advisor. You must include a 'FINANCIAL IMPACT' "
@@ -7,9 +7,8 @@ requests get disruptive advice while 'Compliance' requests get defensive audits.
 """
 
 import asyncio
-from google.adk.agents import Agent
 from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import get_model, get_agent, get_runner, initialize_session, cleanup
 
 # 1. ARCHITECT DESIGN: The Persona Registry
 # This defines the 'Core Values' and 'Risk Thresholds' for each business unit.
@@ -31,11 +30,12 @@ PERSONA_CONFIG = {
 async def execute_specialized_consult(business_unit: str, inquiry: str):
     """
     Dynamically constructs a specialized agent based on the departmental persona.
+    Repeat consults for the same unit reuse the registered Agent and Runner.
     """
     config = PERSONA_CONFIG.get(business_unit, PERSONA_CONFIG["Default"])
     
     # 2. INJECTION: Wrapping the Agent in its Departmental Persona
-    agent = Agent(
+    agent = get_agent(
         name=f"Strategist_{business_unit}",
         instruction=(
             f"You are the {config['role']} for the organization. {config['instruction']} "
@@ -10,10 +10,13 @@ precision math, historical precedent, and reconciled stakeholder logic.
 import asyncio
 from google.adk.agents import Agent
 from google.genai import types 
-from config.settings import get_model, get_runner, initialize_session, cleanup
+from config.settings import get_model, get_runner, get_tool_runtime, initialize_session, cleanup
+from config.settings import deterministic_tool, get_tool_memo_stats, cached_io_tool, get_io_cache_stats
+from config.roi_engine import evaluate_portfolio
 
 # --- 1. THE ENTERPRISE TOOLSET ---
 
+@deterministic_tool
 def calculate_precision_roi(investment: str, projected_savings: str) -> str:
     """Performs deterministic financial validation to avoid LLM hallucination."""
     try:
@@ -26,6 +29,7 @@ def calculate_precision_roi(investment: str, projected_savings: str) -> str:
     except (ValueError, TypeError):
         return "Error: Non-numeric financial data provided."
 
+@cached_io_tool(ttl=3600)  # Retrospectives are written once; an hour-old copy is fine.
 async def fetch_institutional_archives(topic: str) -> str:
     """Retrieves historical 'scars and successes' from the organizational memory."""
     archive = {
@@ -40,12 +44,14 @@ async def main():
         name="Global_CIO_Advisor",
         instruction=(
             "You are the Lead Strategic Advisor for the Office of the CIO. "
-            "For every request: 1. Audit finances via 'calculate_precision_roi'. "
+            "For every request: 1. Audit finances via 'calculate_precision_roi' "
+            "(for a multi-project portfolio, one 'evaluate_portfolio' call covering every project). "
             "2. Inoculate the plan using 'fetch_institutional_archives'. "
             "3. Reconcile conflicting stakeholder perspectives into a single 'Go/No-Go' verdict."
         ),
         model=get_model(),
-        tools=[calculate_precision_roi, fetch_institutional_archives]
+        # Calls in one turn run concurrently (sync tools on the pool), each under TOOL_TIMEOUT_S.
+        tools=get_tool_runtime().wrap_all([calculate_precision_roi, evaluate_portfolio, fetch_institutional_archives])
     )
 
     runner = get_runner(master_strategist)
@@ -81,6 +87,9 @@ async def main():
             # Final Metrics Observability
             usage = event.usage_metadata
             print(f"\n[TELEMETRY] Total Session Weight: {usage.total_token_count} tokens.")
+            print(f"[TELEMETRY] Tool latency: {get_tool_runtime().stats()}")
+            print(f"[TELEMETRY] Tool memo: {get_tool_memo_stats()}")
+            print(f"[TELEMETRY] I/O cache: {get_io_cache_stats()}")
 
     await cleanup()
     print(f"\n--- [COMPLETED] 21-Day ADK Masterclass Series | Architecture Finalized ---")
@@ -0,0 +1,192 @@
+"""
+FILE: config/agent_registry.py
+DESCRIPTION: LRU registry that reuses built Agents and Runners across calls.
+ARCHITECT'S NOTE: Persona factories (lesson 18) and test harnesses (lesson 14) ask for
+the same agent over and over. Agents are keyed by (name, instruction hash, tool set,
+model config, extra options); Runners by the agent they wrap.
+
+BENCHMARK: python -m config.agent_registry
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def _fingerprint(value):
+    """Stable identity for tools / callbacks / models inside a cache key."""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return tuple(_fingerprint(v) for v in value)
+    if callable(value) and hasattr(value, "__qualname__"):
+        name = f"{getattr(value, '__module__', '')}.{value.__qualname__}"
+        # Closures from one factory and methods bound to different instances share a qualname;
+        # their identity tells them apart (a cached agent keeps its tools alive, so ids can't be reused).
+        bound = getattr(value, "__self__", None)
+        if bound is not None and not isinstance(bound, type) and type(bound).__name__ != "module":
+            return f"{name}@{id(bound):x}"
+        if getattr(value, "__closure__", None) or "<locals>" in value.__qualname__:
+            return f"{name}@{id(value):x}"
+        return name
+    if hasattr(value, "name") and isinstance(getattr(value, "name"), str):
+        return f"{type(value).__name__}:{value.name}"
+    return repr(value)
+
+
+def _model_fingerprint(model):
+    if model is None or isinstance(model, str):
+        return model
+    extra = {k: v for k, v in getattr(model, "_additional_args", {}).items() if k != "client"}
+    # LiteLlm keeps llm_client out of _additional_args; it decides caching and balancing, so
+    # models that differ only in client (plain / cached / balanced) must not share an agent.
+    client = getattr(model, "llm_client", None)
+    client_id = f"{type(client).__name__}@{id(client):x}" if client is not None else None
+    return (type(model).__name__, getattr(model, "model", None), json.dumps(extra, sort_keys=True, default=str),
+            client_id)
+
+
+class AgentRegistry:
+    """Memoizes Agent and Runner construction with bounded LRU eviction."""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._agents = OrderedDict()
+        self._runners = OrderedDict()
+        self._lock = threading.Lock()
+        self.agent_hits = self.agent_misses = 0
+        self.runner_hits = self.runner_misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def agent_key(name, instruction, model, tools=None, **agent_kwargs):
+        instruction_hash = hashlib.sha256(str(instruction).encode("utf-8")).hexdigest()[:16]
+        tool_set = tuple(sorted(str(_fingerprint(t)) for t in tools or ()))
+        extras = tuple(sorted((k, str(_fingerprint(v))) for k, v in agent_kwargs.items()))
+        return (name, instruction_hash, tool_set, _model_fingerprint(model), extras)
+
+    def _put(self, table, key, value):
+        table[key] = value
+        if len(table) > self.maxsize:
+            table.popitem(last=False)
+            self.evictions += 1
+
+    def get_agent(self, name, instruction, model, tools=None, **agent_kwargs):
+        from google.adk.agents import Agent
+
+        key = self.agent_key(name, instruction, model, tools, **agent_kwargs)
+        with self._lock:
+            agent = self._agents.get(key)
+            if agent is not None:
+                self._agents.move_to_end(key)
+                self.agent_hits += 1
+                return agent
+            self.agent_misses += 1
+            kwargs = dict(agent_kwargs)
+            if tools:
+                kwargs["tools"] = list(tools)
+            agent = Agent(name=name, instruction=instruction, model=model, **kwargs)
+            self._put(self._agents, key, agent)
+            return agent
+
+    def get_runner(self, agent, factory):
+        """`factory(agent)` builds the Runner on a miss; entries hold the agent to pin its id."""
+        key = id(agent)
+        with self._lock:
+            entry = self._runners.get(key)
+            if entry is not None and entry[0] is agent:
+                self._runners.move_to_end(key)
+                self.runner_hits += 1
+                return entry[1]
+            self.runner_misses += 1
+            runner = factory(agent)
+            self._put(self._runners, key, (agent, runner))
+            return runner
+
+    def clear(self):
+        with self._lock:
+            self._agents.clear()
+            self._runners.clear()
+
+    def stats(self):
+        return {
+            "agents": len(self._agents),
+            "runners": len(self._runners),
+            "agent_hits": self.agent_hits,
+            "agent_misses": self.agent_misses,
+            "runner_hits": self.runner_hits,
+            "runner_misses": self.runner_misses,
+            "evictions": self.evictions,
+        }
+
+
+# --- BENCHMARK: per-call Agent + Runner construction overhead ---
+
+def _benchmark(calls=2000):
+    import time
+
+    from google.adk.agents import Agent
+    from google.adk.runners import Runner
+    from config.settings import APP_NAME, get_model, _session_service
+
+    personas = ["Innovation_Lab", "Compliance_Finance", "Default"]
+    instruction = "You are the {} strategist. Ensure your final recommendation reflects departmental values."
+    model = get_model()
+    service = _session_service()
+
+    def build_runner(agent):
+        return Runner(agent=agent, app_name=APP_NAME, session_service=service)
+
+    start = time.perf_counter()
+    for i in range(calls):
+        unit = personas[i % len(personas)]
+        build_runner(Agent(name=f"Strategist_{unit}", instruction=instruction.format(unit), model=model))
+    fresh_us = (time.perf_counter() - start) / calls * 1e6
+
+    registry = AgentRegistry()
+    start = time.perf_counter()
+    for i in range(calls):
+        unit = personas[i % len(personas)]
+        agent = registry.get_agent(f"Strategist_{unit}", instruction.format(unit), model)
+        registry.get_runner(agent, build_runner)
+    cached_us = (time.perf_counter() - start) / calls * 1e6
+
+    print(f"--- [BENCHMARK] {calls} consults over {len(personas)} personas ---")
+    print(f"Fresh Agent + Runner per call: {fresh_us:>10.1f} us/call")
+    print(f"AgentRegistry:                 {cached_us:>10.1f} us/call ({fresh_us / cached_us:.0f}x faster)")
+    print(f"Registry stats: {registry.stats()}")
+
+    # Tools with one qualname but different state must never share a cached agent.
+    def make_lookup(region):
+        def lookup_region_spend(quarter: str) -> str:
+            """Spend for one region."""
+            return f"{region} {quarter}"
+        return lookup_region_spend
+
+    class Ledger:
+        def __init__(self, book):
+            self.book = book
+
+        def balance(self, account: str) -> str:
+            """Balance from this ledger."""
+            return f"{self.book}:{account}"
+
+    pairs = [(make_lookup("EMEA"), make_lookup("APAC")), (Ledger("opex").balance, Ledger("capex").balance)]
+    for first, second in pairs:
+        a = registry.get_agent("Tool_Identity_Probe", "probe", model, tools=[first])
+        b = registry.get_agent("Tool_Identity_Probe", "probe", model, tools=[second])
+        assert a is not b and b.tools[0] is second, first.__qualname__
+        assert registry.get_agent("Tool_Identity_Probe", "probe", model, tools=[first]) is a
+    print("Closures from one factory and methods of different instances get distinct agents: yes")
+
+    # Same model id and config, different llm_client: plain, response-cached, load-balanced.
+    variants = [model, get_model(cache_responses=True), get_model(endpoints=["http://a:11434", "http://b:11434"])]
+    agents = [registry.get_agent("Client_Identity_Probe", "probe", m) for m in variants]
+    assert len({id(a) for a in agents}) == len(variants)
+    assert all(a.model is m for a, m in zip(agents, variants))
+    assert registry.get_agent("Client_Identity_Probe", "probe", get_model(cache_responses=True)) is agents[1]
+    print("Models differing only in llm_client (plain / cached / balanced) get distinct agents: yes")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,212 @@
+"""
+FILE: config/context_compaction.py
+DESCRIPTION: Rolling context compaction for long-lived stateful sessions.
+ARCHITECT'S NOTE: A workshop session re-sends its full history on every turn, so the
+prompt grows without bound and prefill latency climbs with it. Once the history passes
+a token threshold, older turns are folded into a running summary stored in session
+state, and only the last N turns travel verbatim. The default summarizer is extractive
+(it keeps figures, budgets and constraints), so compaction itself costs no generation.
+
+BENCHMARK: python -m config.context_compaction            (simulated prefill cost)
+           python -m config.context_compaction --live     (against OLLAMA_API_BASE)
+"""
+import re
+
+SUMMARY_KEY = "context_summary"
+FOLDED_KEY = "context_folded_turns"
+SUMMARY_HEADER = "[CONTEXT SUMMARY"
+
+# Sentences carrying numbers, money, percentages or commitments survive the fold.
+_SALIENT = re.compile(r"[$%]|\d|\b(budget|must|constraint|deadline|approved|decision|risk)\b", re.I)
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text):
+    """~4 characters per token: close enough for llama-family tokenizers to drive a threshold."""
+    return (len(text) + 3) // 4
+
+
+def _text(content):
+    return " ".join(p.text for p in content.parts or () if getattr(p, "text", None))
+
+
+def extractive_summary(previous, turns, max_chars=1200):
+    """Folds turns into the running summary, keeping salient sentences, newest last."""
+    lines = [previous] if previous else []
+    for turn in turns:
+        for content in turn:
+            sentences = [s.strip() for s in _SENTENCE.split(_text(content)) if s.strip()]
+            kept = [s for s in sentences if _SALIENT.search(s)] or sentences[:1]
+            if kept:
+                lines.append(f"{content.role}: {' '.join(kept)}")
+    summary = "\n".join(lines)
+    # Oldest facts give way first when the summary itself outgrows its budget.
+    return summary[-max_chars:] if len(summary) > max_chars else summary
+
+
+def split_turns(contents):
+    """Groups contents into turns; a turn opens at each user message that is not a tool result."""
+    turns = []
+    for content in contents:
+        opens = content.role == "user" and not any(p.function_response for p in content.parts or ())
+        if opens or not turns:
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+class ContextCompactor:
+    """before_model_callback that keeps the prompt under `max_tokens` by folding old turns."""
+
+    def __init__(self, max_tokens=2000, keep_last=4, summarizer=extractive_summary):
+        self.max_tokens = max_tokens
+        self.keep_last = keep_last
+        self.summarizer = summarizer
+        self.compactions = 0
+        self.turns_folded = 0
+        self.tokens_saved = 0
+
+    def __call__(self, callback_context, llm_request):
+        from google.genai import types
+
+        state = callback_context.state
+        summary = state.get(SUMMARY_KEY, "")
+        folded = state.get(FOLDED_KEY, 0)
+        turns = split_turns(llm_request.contents)
+        folded = min(folded, max(len(turns) - 1, 0))
+        original = sum(estimate_tokens(_text(c)) for c in llm_request.contents)
+
+        live = turns[folded:]
+        live_tokens = estimate_tokens(summary) + sum(estimate_tokens(_text(c)) for t in live for c in t)
+        if live_tokens > self.max_tokens and len(live) > self.keep_last:
+            cut = len(live) - self.keep_last
+            summary = self.summarizer(summary, live[:cut])
+            folded += cut
+            self.compactions += 1
+            self.turns_folded += cut
+            state[SUMMARY_KEY] = summary
+            state[FOLDED_KEY] = folded
+        if not folded:
+            return None
+
+        header = types.Content(
+            role="user",
+            parts=[types.Part(text=f"{SUMMARY_HEADER} of {folded} earlier turns]\n{summary}")],
+        )
+        llm_request.contents = [header] + [c for t in turns[folded:] for c in t]
+        self.tokens_saved += max(original - sum(estimate_tokens(_text(c)) for c in llm_request.contents), 0)
+        return None
+
+    def stats(self):
+        return {
+            "max_tokens": self.max_tokens,
+            "keep_last": self.keep_last,
+            "compactions": self.compactions,
+            "turns_folded": self.turns_folded,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+# --- BENCHMARK: 50-turn scripted workshop, with and without compaction ---
+
+def _scripted_turns(count):
+    topics = ["cloud exit", "ERP core", "data mesh", "agent platform", "security uplift"]
+    turns = ["Establish the 2026 AI Innovation Budget at $4.5 Million. Acknowledge and store this constraint."]
+    for i in range(1, count):
+        topic = topics[i % len(topics)]
+        turns.append(
+            f"Workshop item {i}: evaluate the {topic} initiative against the stored budget. "
+            f"Assume a {10 + i % 30}% cost overrun risk and a {6 + i % 18}-month horizon. "
+            "Summarize the trade-offs for the steering committee in three bullet points."
+        )
+    return turns
+
+
+async def _run_session(model, compactor, turns):
+    import time
+
+    from google.adk.agents import Agent
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    agent = Agent(
+        name="Cognitive_Strategy_Partner",
+        instruction="You are a Senior Strategy Partner. Maintain a ledger of budgets and constraints.",
+        model=model,
+        before_model_callback=compactor,
+    )
+    service = InMemorySessionService()
+    runner = Runner(agent=agent, app_name="compaction_bench", session_service=service)
+    await service.create_session(app_name="compaction_bench", user_id="bench", session_id="s")
+    rows = []
+    for query in turns:
+        started = time.perf_counter()
+        prompt_tokens = 0
+        message = types.Content(role="user", parts=[types.Part(text=query)])
+        async for event in runner.run_async(user_id="bench", session_id="s", new_message=message):
+            if event.usage_metadata and event.usage_metadata.prompt_token_count:
+                prompt_tokens = event.usage_metadata.prompt_token_count
+        rows.append((prompt_tokens, time.perf_counter() - started))
+    return rows
+
+
+def _simulated_model(prefill_s_per_1k_tokens=0.05):
+    """Stand-in LLM whose latency grows with prompt size, like a local prefill."""
+    import asyncio
+
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai import types
+
+    class PrefillBoundLlm(BaseLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            prompt_tokens = sum(estimate_tokens(_text(c)) for c in llm_request.contents)
+            await asyncio.sleep(prompt_tokens / 1000 * prefill_s_per_1k_tokens)
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text=(
+                    "Acknowledged. The $4.5M budget holds. Trade-offs: cost risk is material; "
+                    "sequencing matters; the steering committee must approve the horizon."
+                ))]),
+                usage_metadata=types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=prompt_tokens, candidates_token_count=30, total_token_count=prompt_tokens + 30
+                ),
+            )
+
+    return PrefillBoundLlm(model="simulated-prefill")
+
+
+async def _benchmark(turns=50, live=False):
+    model = None
+    if live:
+        from config.settings import get_model
+        model = get_model()
+    script = _scripted_turns(turns)
+
+    def baseline(callback_context, llm_request):
+        return None
+
+    compactor = ContextCompactor(max_tokens=1500, keep_last=4)
+    await _run_session(model or _simulated_model(), baseline, script[:2])  # Warm imports and pools.
+    results = {}
+    for label, callback in (("full history", baseline), ("compacted", compactor)):
+        results[label] = await _run_session(model or _simulated_model(), callback, script)
+
+    print(f"--- [BENCHMARK] {turns}-turn session | {'live model' if live else 'simulated prefill'} ---")
+    print(f"{'turn':>5} {'full tokens':>12} {'full s':>8} {'compact tokens':>15} {'compact s':>10}")
+    for i in (0, 9, 19, 29, 39, turns - 1):
+        (ft, fs), (ct, cs) = results["full history"][i], results["compacted"][i]
+        print(f"{i + 1:>5} {ft:>12} {fs:>8.3f} {ct:>15} {cs:>10.3f}")
+    for label, rows in results.items():
+        tokens = sum(t for t, _ in rows)
+        latency = sum(s for _, s in rows)
+        print(f"{label:>13}: {tokens:>8} prompt tokens total | {latency:7.2f} s total | "
+              f"last turn {rows[-1][0]} tokens")
+    print(f"Compactor stats: {compactor.stats()}")
+
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+
+    asyncio.run(_benchmark(live="--live" in sys.argv))
@@ -0,0 +1,258 @@
+"""
+FILE: config/load_balancer.py
+DESCRIPTION: Least-outstanding-requests routing across several Ollama inference nodes.
+ARCHITECT'S NOTE: Fan-out lessons (11, 16) fire many generations at once. Each call is
+routed to the healthy endpoint with the fewest in-flight requests; a background probe
+ejects nodes that stop answering and readmits them once they recover.
+
+DEMO: python -m config.load_balancer   (three local stub nodes with different speeds)
+"""
+import asyncio
+import itertools
+import time
+
+import httpx
+from google.adk.models.lite_llm import LiteLLMClient
+
+
+class Endpoint:
+    """Live routing state and counters for one inference node."""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.total_latency = 0.0
+        self.ewma_latency = 0.0
+        self.healthy = True
+        self.consecutive_failures = 0
+
+    def record(self, latency, ok):
+        self.requests += 1
+        self.total_latency += latency
+        self.ewma_latency = latency if self.requests == 1 else 0.8 * self.ewma_latency + 0.2 * latency
+        if not ok:
+            self.errors += 1
+
+    def metrics(self):
+        return {
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.total_latency / self.requests * 1000, 2) if self.requests else 0.0,
+            "ewma_latency_ms": round(self.ewma_latency * 1000, 2),
+        }
+
+
+class EndpointBalancer:
+    """Routes each call to the healthy endpoint with the fewest in-flight requests."""
+
+    def __init__(self, urls, health_interval=5.0, health_timeout=2.0, eject_after=3, health_path="/api/tags"):
+        self.endpoints = [Endpoint(u) for u in urls]
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.eject_after = eject_after
+        self.health_path = health_path
+        self._tie_breaker = itertools.count()
+        self._health_task = None
+
+    def _pick(self):
+        candidates = [e for e in self.endpoints if e.healthy] or self.endpoints
+        # Least outstanding first; among equals prefer the faster node, then rotate.
+        turn = next(self._tie_breaker)
+        return min(
+            candidates,
+            key=lambda e: (e.in_flight, e.ewma_latency, (self.endpoints.index(e) - turn) % len(self.endpoints)),
+        )
+
+    def acquire(self):
+        self._ensure_health_checks()
+        endpoint = self._pick()
+        endpoint.in_flight += 1
+        return endpoint, time.perf_counter()
+
+    def release(self, endpoint, started, ok=True):
+        endpoint.in_flight -= 1
+        endpoint.record(time.perf_counter() - started, ok)
+        # Passive health: repeated request failures eject without waiting for the probe.
+        endpoint.consecutive_failures = 0 if ok else endpoint.consecutive_failures + 1
+        if endpoint.consecutive_failures >= self.eject_after:
+            endpoint.healthy = False
+
+    # --- Active health checks ---
+
+    def _ensure_health_checks(self):
+        if self._health_task is None or self._health_task.done():
+            try:
+                self._health_task = asyncio.get_running_loop().create_task(self._health_loop())
+            except RuntimeError:
+                self._health_task = None  # No loop yet; the next async acquire starts it.
+
+    async def _health_loop(self):
+        async with httpx.AsyncClient(timeout=self.health_timeout) as client:
+            while True:
+                await asyncio.gather(*(self._probe(client, e) for e in self.endpoints))
+                await asyncio.sleep(self.health_interval)
+
+    async def _probe(self, client, endpoint):
+        try:
+            # A fresh connection each time: a node must still accept new sockets to be healthy.
+            response = await client.get(endpoint.url + self.health_path, headers={"Connection": "close"})
+            ok = response.status_code < 500
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            endpoint.consecutive_failures = 0
+            endpoint.healthy = True
+        else:
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.eject_after:
+                endpoint.healthy = False
+
+    async def aclose(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._health_task = None
+
+    def metrics(self):
+        return {e.url: e.metrics() for e in self.endpoints}
+
+
+class BalancedLiteLLMClient(LiteLLMClient):
+    """LiteLLM client that rewrites api_base per call from an EndpointBalancer."""
+
+    def __init__(self, balancer):
+        super().__init__()
+        self.balancer = balancer
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        endpoint, started = self.balancer.acquire()
+        kwargs["api_base"] = endpoint.url
+        try:
+            response = await super().acompletion(model=model, messages=messages, tools=tools, **kwargs)
+        except Exception:
+            self.balancer.release(endpoint, started, ok=False)
+            raise
+        if not kwargs.get("stream"):
+            self.balancer.release(endpoint, started)
+            return response
+        return self._track_stream(response, endpoint, started)
+
+    async def _track_stream(self, stream, endpoint, started):
+        # A streamed generation stays in flight until its last chunk arrives.
+        ok = False
+        try:
+            async for chunk in stream:
+                yield chunk
+            ok = True
+        finally:
+            self.balancer.release(endpoint, started, ok=ok)
+
+
+# --- DEMO: local stub nodes with different simulated speeds ---
+
+def _start_stub_node(delay, port=0):
+    """Threaded keep-alive HTTP server speaking just enough of the Ollama API.
+
+    It runs outside the event loop on purpose: litellm issues some blocking calls
+    (model-info lookups) from the loop thread, which an in-loop stub would deadlock on.
+    """
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class StubOllama(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._reply({"models": []})
+
+        def do_POST(self):
+            if self.server.stopped:
+                self.close_connection = True  # A dead node drops even its keep-alive sockets.
+                return
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if "messages" not in request:
+                return self._reply({})  # /api/show model-info probe
+            time.sleep(delay)
+            self._reply({
+                "model": request.get("model", "stub"),
+                "created_at": "2026-01-01T00:00:00Z",
+                "message": {"role": "assistant", "content": f"stub reply after {delay * 1000:.0f} ms"},
+                "done": True,
+                "prompt_eval_count": 10,
+                "eval_count": 5,
+            })
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubOllama)
+    server.daemon_threads = True
+    server.stopped = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _stop_stub_node(server):
+    server.stopped = True
+    server.shutdown()
+    server.server_close()
+
+
+async def _demo(requests=60, concurrency=12):
+    speeds = [0.05, 0.15, 0.40]
+    nodes = [_start_stub_node(d) for d in speeds]
+    balancer = EndpointBalancer([url for _, url in nodes], health_interval=0.2, eject_after=2)
+    client = BalancedLiteLLMClient(balancer)
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with gate:
+            await client.acompletion(
+                model="ollama_chat/llama3.2:latest",
+                messages=[{"role": "user", "content": f"audit {i}"}],
+                tools=None,
+            )
+
+    print(f"--- [DEMO] {requests} calls, concurrency {concurrency}, node delays {speeds} s ---")
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    print(f"Wall time: {time.perf_counter() - start:.2f} s")
+    for url, m in balancer.metrics().items():
+        print(f"  {url}: {m}")
+
+    # Kill the fastest node: the probe ejects it, traffic shifts, a restart readmits it.
+    fast_server, fast_url = nodes[0]
+    _stop_stub_node(fast_server)
+    await asyncio.sleep(0.6)
+    print(f"Stopped {fast_url}: healthy = {balancer.endpoints[0].healthy}")
+    before = balancer.endpoints[0].requests
+    await asyncio.gather(*(one(i) for i in range(12)))
+    print(f"  calls routed to the ejected node: {balancer.endpoints[0].requests - before}")
+
+    nodes[0] = _start_stub_node(speeds[0], port=int(fast_url.rsplit(":", 1)[1]))
+    await asyncio.sleep(0.6)
+    print(f"Restarted {fast_url}: healthy = {balancer.endpoints[0].healthy}")
+
+    await balancer.aclose()
+    for server, _ in nodes:
+        _stop_stub_node(server)
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
@@ -0,0 +1,184 @@
+"""
+FILE: config/model_pool.py
+DESCRIPTION: Shared model-client registry backed by a pooled keep-alive HTTP session.
+ARCHITECT'S NOTE: Every agent that asks for the same (model, api_base, config) triple
+receives the same LiteLlm instance, and every instance talks to Ollama through one
+keep-alive connection pool. The counters below prove the TCP handshakes are amortized.
+"""
+import functools
+import json
+import threading
+
+import httpx
+from google.adk.models.lite_llm import LiteLlm, LiteLLMClient
+
+from config.load_balancer import BalancedLiteLLMClient, EndpointBalancer
+from config.response_cache import CachedLiteLLMClient
+
+
+class PooledHttpSession:
+    """Lazily-built keep-alive httpx client with request / new-connection telemetry."""
+
+    def __init__(self, pool_size=10, keepalive_expiry=30.0, timeout=600.0):
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self._client = None
+        self.requests_sent = 0
+        self.connections_opened = 0
+
+    @property
+    def client(self):
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=self.keepalive_expiry,
+                ),
+                timeout=self.timeout,
+                event_hooks={"request": [self._on_request]},
+            )
+        return self._client
+
+    async def _on_request(self, request):
+        # httpcore reports every fresh TCP connect through the 'trace' extension;
+        # a request that never triggers it rode on a pooled keep-alive socket.
+        self.requests_sent += 1
+        request.extensions["trace"] = self._on_trace
+
+    async def _on_trace(self, event_name, info):
+        if event_name == "connection.connect_tcp.started":
+            self.connections_opened += 1
+
+    def stats(self):
+        reused = max(self.requests_sent - self.connections_opened, 0)
+        return {
+            "pool_size": self.pool_size,
+            "requests_sent": self.requests_sent,
+            "connections_opened": self.connections_opened,
+            "connections_reused": reused,
+            "reuse_ratio": round(reused / self.requests_sent, 4) if self.requests_sent else 0.0,
+        }
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+@functools.cache
+def _pooled_handler_type():
+    """AsyncHTTPHandler subclass that borrows a caller-owned httpx client.
+
+    The stock constructor always builds a private client; swapping it out afterwards
+    orphaned that client (and its aiohttp session) unclosed. Defined lazily so litellm's
+    HTTP stack stays off the import path.
+    """
+    from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+
+    class PooledHTTPHandler(AsyncHTTPHandler):
+        def __init__(self, client):
+            self._pooled_client = client
+            super().__init__()
+            self.client = client  # The setter marks it borrowed: close() leaves the pool open.
+
+        def create_client(self, *args, **kwargs):
+            return self._pooled_client
+
+    return PooledHTTPHandler
+
+
+class ModelClientRegistry:
+    """Hands out one shared LiteLlm per (model id, api_base, config) key.
+
+    `api_base` may also be a sequence of endpoints; those clients route every call
+    through a shared EndpointBalancer (least outstanding requests). Clients built with
+    cache_responses=True sit on top of the shared exact-match response cache.
+    """
+
+    def __init__(self, session, response_cache_factory=None):
+        self.session = session
+        self._clients = {}
+        self._balancers = {}
+        self._response_cache_factory = response_cache_factory
+        self._response_cache = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(model_id, api_base, config, cache_responses=False):
+        if not isinstance(api_base, str):
+            api_base = tuple(api_base)
+        return (model_id, api_base, json.dumps(config or {}, sort_keys=True, default=str), cache_responses)
+
+    def get(self, model_id, api_base, config=None, cache_responses=False):
+        key = self._key(model_id, api_base, config, cache_responses)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+            self.misses += 1
+            client = self._build(model_id, api_base, config, cache_responses)
+            self._clients[key] = client
+            return client
+
+    def _build(self, model_id, api_base, config, cache_responses=False):
+        endpoints = [api_base] if isinstance(api_base, str) else list(api_base)
+        kwargs = {"model": model_id, "api_base": endpoints[0], "client": self._http_handler()}
+        if len(endpoints) > 1:
+            kwargs["llm_client"] = BalancedLiteLLMClient(self._balancer(endpoints))
+        if cache_responses:
+            inner = kwargs.get("llm_client") or LiteLLMClient()
+            kwargs["llm_client"] = CachedLiteLLMClient(inner, self.response_cache)
+        if config:
+            kwargs["config"] = config
+        return LiteLlm(**kwargs)
+
+    def _balancer(self, endpoints):
+        # One balancer per endpoint set, so every config on those nodes shares in-flight counts.
+        key = tuple(endpoints)
+        if key not in self._balancers:
+            self._balancers[key] = EndpointBalancer(endpoints)
+        return self._balancers[key]
+
+    @property
+    def response_cache(self):
+        if self._response_cache is None:
+            self._response_cache = self._response_cache_factory()
+        return self._response_cache
+
+    def response_cache_stats(self):
+        return self._response_cache.stats() if self._response_cache is not None else {}
+
+    def endpoint_metrics(self):
+        metrics = {}
+        for balancer in self._balancers.values():
+            metrics.update(balancer.metrics())
+        return metrics
+
+    def _http_handler(self):
+        # litellm's provider handlers accept a pre-built AsyncHTTPHandler via `client=`;
+        # it is built straight around the shared keep-alive pool.
+        return _pooled_handler_type()(self.session.client)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "clients": len(self._clients),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            **self.session.stats(),
+        }
+
+    async def reset(self):
+        """Drops cached clients and closes the pool (connections are bound to one event loop)."""
+        with self._lock:
+            self._clients.clear()
+            balancers, self._balancers = list(self._balancers.values()), {}
+        for balancer in balancers:
+            await balancer.aclose()
+        await self.session.aclose()
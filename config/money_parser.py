@@ -0,0 +1,328 @@
+"""
+FILE: config/money_parser.py
+DESCRIPTION: Precompiled money / quantity parser for tool-call arguments (single and bulk).
+ARCHITECT'S NOTE: Models pass amounts as "$250k", "1.2 million", "USD 400,000",
+"(1,500)", "-$3bn" or "1.5-2M". The old scrubber rebuilt regexes per call and
+multiplied any value that merely contained an 'm' or 'k' ("5 months" became 5M).
+Here every pattern is compiled once, units must be whole tokens, English number words
+are understood, ranges resolve to their midpoint and nothing ever raises: an
+unparseable value is None. A minus and accounting parentheses are one negation
+("-(300k)" is -300k, not +300k), and percentages ("15%", "10-15%") are never money.
+A leading minus negates a whole range ("-$2-3M" is -3M..-2M). In free text a range is
+tried before single amounts ("between $1M and $2M"), and a minus is a sign only when it
+is attached to the amount, so the dash in "about 10 - 20k" separates a range.
+
+BENCHMARK: python -m config.money_parser   (property/fuzz corpus + parse throughput)
+"""
+import json
+import math
+import re
+from functools import lru_cache
+
+_UNITS = {
+    "k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "mn": 1e6, "mil": 1e6, "million": 1e6,
+    "b": 1e9, "bn": 1e9, "billion": 1e9, "t": 1e12, "tn": 1e12, "trillion": 1e12,
+}
+_UNIT = r"(?:thousand|million|billion|trillion|mil|mm|mn|bn|tn|k|m|b|t)"
+_CURRENCY = r"(?:[$€£¥]|usd|eur|gbp|us\$)"
+_NUMBER = r"(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|\.\d+"
+# One amount: optional sign / accounting parenthesis, currency before or after, unit suffix.
+# `tight`: a minus only counts when it touches the currency or digits (free text).
+def _amount_regex(p, tight=False):
+    sign = rf"[-−](?={_CURRENCY}|[\d.])" if tight else r"[-−]"
+    return (
+        rf"(?P<{p}neg>{sign})?\s*{_CURRENCY}?\s*(?P<{p}neg2>{sign})?\s*(?P<{p}num>{_NUMBER})"
+        rf"\s*(?P<{p}unit>{_UNIT})?(?![a-z])\s*(?:{_CURRENCY}|dollars?|euros?|pounds?)?"
+    )
+
+
+_SINGLE = re.compile(rf"^\s*(?P<sign>[-−])?\s*(?P<paren>\()?\s*{_amount_regex('a_')}\s*(?(paren)\))\s*$", re.I)
+_RANGE = re.compile(rf"^\s*{_amount_regex('a_')}\s*(?:-|–|to|and)\s*{_amount_regex('b_')}\s*$", re.I)
+_SEARCH = re.compile(rf"(?<![\w.]){_amount_regex('a_', tight=True)}", re.I)
+_RANGE_SEARCH = re.compile(
+    rf"(?<![\w.]){_amount_regex('a_', tight=True)}\s*(?:-|–|to|and)\s*(?P<upper>{_amount_regex('b_', tight=True)})", re.I
+)
+_MARKED = re.compile(r"[$€£¥a-z]", re.I)  # A unit or currency inside a matched amount.
+_PERCENT = re.compile(rf"(?:{_NUMBER})\s*(?:(?:-|–|to)\s*(?:{_NUMBER})\s*)?%", re.I)
+_CLEAN_WORDS = re.compile(r"[^a-z\s-]")
+
+_WORD_VALUES = {
+    "zero": 0, "one": 1, "a": 1, "an": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80,
+    "ninety": 90, "half": 0.5,
+}
+_WORD_FILLER = {"and", "dollars", "dollar", "usd", "of", "euros", "pounds"}
+
+# Argument-name routing for the ROI tool (lesson 06): first matching rule wins.
+DEFAULT_KEY_RULES = (
+    (re.compile(r"sav|opex|benefit"), "annual_opex_savings"),
+    (re.compile(r"cap|cost|exp|invest"), "cap_ex"),
+)
+
+
+def _amount(match, prefix, inherited_unit=None):
+    number = float(match.group(prefix + "num").replace(",", ""))
+    unit = (match.group(prefix + "unit") or inherited_unit or "").lower()
+    value = number * _UNITS.get(unit, 1.0)
+    if match.group(prefix + "neg") or match.group(prefix + "neg2"):
+        value = -value
+    return value
+
+
+def _parse_words(text):
+    """'two point five million' is out of scope; 'four hundred thousand', 'half a million' are in."""
+    words = [w for w in _CLEAN_WORDS.sub(" ", text.lower()).replace("-", " ").split() if w not in _WORD_FILLER]
+    if not words:
+        return None
+    negative = words[0] in ("minus", "negative")
+    if negative:
+        words = words[1:]
+    total = current = 0.0
+    seen = False
+    for word in words:
+        if word in ("a", "an") and current:
+            continue  # "half a million"
+        if word in _WORD_VALUES:
+            value = _WORD_VALUES[word]
+            current = current * value if word == "half" and current else current + value
+            seen = True
+        elif word == "hundred":
+            current = (current or 1) * 100
+            seen = True
+        elif word in ("thousand", "million", "billion", "trillion"):
+            total += (current or 1) * _UNITS[word]
+            current = 0.0
+            seen = True
+        else:
+            return None
+    if not seen:
+        return None
+    value = total + current
+    return -value if negative else value
+
+
+@lru_cache(maxsize=4096)
+def _parse_text(text):
+    if text[-1].isdigit():
+        try:
+            value = float(text)  # Plain numerals skip the regexes entirely.
+            return value if math.isfinite(value) else None
+        except ValueError:
+            pass
+    match = _SINGLE.match(text)
+    if match:
+        value = _amount(match, "a_")
+        # "-(300k)", "(-300k)" and "(300k)" are all one negation.
+        return -abs(value) if match.group("paren") or match.group("sign") else value
+    lo_hi = _parse_range_text(text)
+    if lo_hi is not None:
+        return (lo_hi[0] + lo_hi[1]) / 2.0
+    words = _parse_words(text)
+    if words is not None:
+        return words
+    # Free text ("FY2026 budget of $4.5M"): prefer the first amount carrying a unit or currency.
+    # Percentages ("20% contingency", "10-15%") are blanked first so they can't be read as amounts.
+    text = _PERCENT.sub(lambda m: " " * len(m.group(0)), text)
+    # A range counts only when its upper bound is marked ("10 - 20k", "$1M and $2M"), so
+    # "2025-2026" or "$4.5M and 200 staff" never become one.
+    for match in _RANGE_SEARCH.finditer(text):
+        if _MARKED.search(match.group("upper")):
+            low, high = _range_bounds(match)
+            return (low + high) / 2.0
+    best = None
+    for match in _SEARCH.finditer(text):
+        if _MARKED.search(match.group(0)):
+            return _amount(match, "a_")
+        best = best or match
+    return _amount(best, "a_") if best else None
+
+
+def _parse_range_text(text):
+    if "%" in text:
+        return None
+    match = _RANGE.match(text)
+    return _range_bounds(match) if match else None
+
+
+def _range_bounds(match):
+    # "1.5-2M": a bare lower bound inherits the upper bound's unit.
+    high = _amount(match, "b_")
+    low = _amount(match, "a_", inherited_unit=match.group("b_unit"))
+    if low < 0 <= high and not (match.group("b_neg") or match.group("b_neg2")):
+        high = -high  # "-$2-3M": the leading minus negates the whole range.
+    return (min(low, high), max(low, high))
+
+
+def parse_money(value):
+    """Returns a float (ranges -> midpoint) or None; never raises."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    return _parse_text(text) if text else None
+
+
+def parse_money_range(value):
+    """Returns (low, high); a single amount gives (x, x). None when unparseable."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (float(value), float(value))
+    text = str(value).strip()
+    lo_hi = _parse_range_text(text)
+    if lo_hi is not None:
+        return lo_hi
+    single = parse_money(text)
+    return None if single is None else (single, single)
+
+
+def normalize_arguments(raw_args, key_rules=DEFAULT_KEY_RULES):
+    """Tool-call args (dict or JSON string) -> {canonical_key: float}; unknown keys are dropped."""
+    if isinstance(raw_args, str):
+        try:
+            raw_args = json.loads(raw_args)
+        except ValueError:
+            return {}
+    if not isinstance(raw_args, dict):
+        return {}
+    clean = {}
+    for key, value in raw_args.items():
+        name = str(key).lower()
+        for pattern, canonical in key_rules:
+            if pattern.search(name):
+                parsed = parse_money(value)
+                if parsed is not None:
+                    clean[canonical] = parsed
+                break
+    return clean
+
+
+def normalize_arguments_bulk(arg_dicts, key_rules=DEFAULT_KEY_RULES):
+    """Normalizes thousands of argument dicts in one call; repeated strings hit the parse cache."""
+    return [normalize_arguments(args, key_rules) for args in arg_dicts]
+
+
+# --- BENCHMARK: property / fuzz corpus, then throughput vs the legacy scrubber ---
+
+def _legacy_super_scrub(val):
+    """Lesson 06's original super_scrub, kept here only as the benchmark baseline."""
+    if isinstance(val, (int, float)):
+        return float(val)
+    clean_val = re.sub(r'[$,\s]', '', str(val)).lower()
+    mult = 1000.0 if 'k' in clean_val else 1000000.0 if 'm' in clean_val else 1.0
+    match = re.search(r"[-+]?\d*\.\d+|\d+", clean_val.replace('k', '').replace('m', ''))
+    return float(match.group()) * mult if match else 0.0
+
+
+def _property_corpus(count, seed=21):
+    """(text, expected) pairs generated from known amounts with randomized formatting."""
+    import random
+
+    rng = random.Random(seed)
+    units = [("", 1.0), ("k", 1e3), ("K", 1e3), (" thousand", 1e3), ("M", 1e6), ("m", 1e6), ("mm", 1e6),
+             (" million", 1e6), (" Million", 1e6), ("bn", 1e9), ("B", 1e9), (" billion", 1e9)]
+    corpus = []
+    for _ in range(count):
+        unit, scale = rng.choice(units)
+        mantissa = round(rng.uniform(0.01, 999.99), rng.choice([0, 1, 2]))
+        digits = f"{mantissa:,.{rng.choice([0, 1, 2])}f}" if scale == 1.0 and rng.random() < 0.5 else repr(mantissa)
+        digits = digits[:-2] if digits.endswith(".0") else digits
+        expected = float(digits.replace(",", "")) * scale
+        prefix, suffix = rng.choice([("$", ""), ("", ""), ("USD ", ""), ("", " USD"), ("€", ""), ("", " dollars")])
+        text = f"{prefix}{digits}{unit}{suffix}"
+        style = rng.random()
+        if style < 0.1:
+            text, expected = f"-{text}", -expected
+        elif style < 0.2:
+            text, expected = f"({text})", -expected
+        elif style < 0.3:
+            text = f"  {text}\t"
+        corpus.append((text, expected))
+    corpus += [
+        ("1.5-2M", 1.75e6), ("$250k to $400k", 325e3), ("four hundred thousand", 4e5),
+        ("half a million", 5e5), ("two million five hundred thousand", 2.5e6), ("5 months", 5.0),
+        ("approx. $250k one-off", 2.5e5), ("minus three million", -3e6), ("-$4.5M", -4.5e6),
+        ("$-4.5M", -4.5e6), ("3bn", 3e9), ("USD 400,000", 4e5), (".5m", 5e5), (1200, 1200.0),
+        ("-(300k)", -3e5), ("(-300k)", -3e5), ("-($1.2M)", -1.2e6), ("$4.5M with 20% contingency", 4.5e6),
+        ("about 10 - 20k", 15e3), ("-$2-3M", -2.5e6), ("between $1M and $2M", 1.5e6),
+        ("a 2025-2026 budget of $4.5M", 4.5e6), ("$4.5M and 200 staff", 4.5e6), ("cut spend by -$2M", -2e6),
+    ]
+    return corpus
+
+
+def _selftest(count=20_000):
+    import random
+
+    failures = []
+    for text, expected in _property_corpus(count):
+        got = parse_money(text)
+        if got is None or not math.isclose(got, expected, rel_tol=1e-9, abs_tol=1e-9):
+            failures.append((text, expected, got))
+    # Fuzz: arbitrary junk must never raise, and must never invent a multiplier from letters.
+    rng = random.Random(3)
+    alphabet = "0123456789$€,.-()kmbKMB tonusdUSDmillionthousand\t"
+    for _ in range(count):
+        junk = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+        parse_money(junk)
+        parse_money_range(junk)
+    for text in ("mom", "km", "bbb", "make it 5 months", "", "   ", None, True, "$", "--"):
+        got = parse_money(text)
+        if got not in (None, 5.0):
+            failures.append((text, "None or 5", got))
+    for text in ("10-15%", "15%", "10 to 15 %"):  # Percentages are not money, alone or as a range.
+        for parse in (parse_money, parse_money_range):
+            if parse(text) is not None:
+                failures.append((text, f"{parse.__name__} -> None", parse(text)))
+    for text, expected in (("-$2-3M", (-3e6, -2e6)), ("1.5-2M", (1.5e6, 2e6))):
+        if parse_money_range(text) != expected:
+            failures.append((text, expected, parse_money_range(text)))
+    print(f"--- [SELFTEST] {count:,} property cases + {count:,} fuzz strings: {len(failures)} failures ---")
+    for failure in failures[:10]:
+        print(f"  FAIL {failure}")
+    return not failures
+
+
+def _benchmark(count=200_000):
+    import time
+
+    corpus = [text for text, _ in _property_corpus(count, seed=99) if isinstance(text, str)]
+    args = [{"cap_ex": text, "annual_opex_savings": corpus[-i - 1]} for i, text in enumerate(corpus)]
+
+    start = time.perf_counter()
+    for text in corpus:
+        _legacy_super_scrub(text)
+    legacy_s = time.perf_counter() - start
+
+    _parse_text.cache_clear()
+    start = time.perf_counter()
+    for text in corpus:
+        parse_money(text)
+    cold_s = time.perf_counter() - start
+    repeated = corpus[:4096] * 10
+    for text in repeated[:4096]:
+        parse_money(text)
+    start = time.perf_counter()
+    for text in repeated:
+        parse_money(text)
+    warm_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    normalize_arguments_bulk(args)
+    bulk_s = time.perf_counter() - start
+
+    wrong = sum(1 for text, expected in _property_corpus(2000) if isinstance(text, str)
+                and abs(_legacy_super_scrub(text) - expected) > 1e-6 * max(1.0, abs(expected)))
+    print(f"--- [BENCHMARK] {len(corpus):,} amount strings ---")
+    print(f"Legacy super_scrub:       {len(corpus) / legacy_s:>12,.0f} values/s (wrong on {wrong / 20:.1f}% of the corpus)")
+    print(f"parse_money (all unique): {len(corpus) / cold_s:>12,.0f} values/s")
+    print(f"parse_money (repeated):   {len(repeated) / warm_s:>12,.0f} values/s (parse cache hits)")
+    print(f"normalize_arguments_bulk: {len(args) / bulk_s:>12,.0f} arg dicts/s ({len(args):,} dicts, 2 values each)")
+
+
+if __name__ == "__main__":
+    import sys
+
+    ok = _selftest()
+    _benchmark()
+    sys.exit(0 if ok else 1)
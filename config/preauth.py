@@ -0,0 +1,258 @@
+"""
+FILE: config/preauth.py
+DESCRIPTION: Entitlement pre-check: deny provably unauthorized actions before the model runs.
+ARCHITECT'S NOTE: In lesson 09 an analyst asking to move $500k paid for two generations
+(one to call the tool, one to summarize its refusal) before the tool's gate said no.
+Protected tools now declare their required scopes and action verbs as metadata.
+At the first model call of a turn, every sentence of the request is matched against
+one compiled pattern. A keyword is not proof of intent ("what is our policy on
+budget reallocation?" asks nothing), so only a strict imperative counts: a sentence
+that opens with the tool's verb and names a money amount and a target ("Reallocate
+$500,000 to Project Alpha"). Questions never match. If such a command names a
+protected action and the session's principal fails the scope check, the templated
+denial is returned as the model response and the model is never called. Any other
+turn goes to the model with the protected tools the principal cannot use removed from
+both the declarations and the dispatch table, so it can neither plan around them nor
+call them.
+
+The principal is the session's authenticated user_id, never a name in the prompt text.
+The tool-level gate stays in place as the policy enforcement point.
+
+DEMO: python -m config.preauth   (mixed-principal workload: model calls with and without the pre-check)
+"""
+import re
+
+# "$500,000", "$1.2M", "250k", "3 million", "USD 40,000". A bare count ("2 engineers") is not money.
+_UNIT = r"(?:k|m|mm|bn|million|billion|usd|dollars)"
+_AMOUNT = (rf"(?:\$\s?\d[\d,]*(?:\.\d+)?(?:\s?{_UNIT})?|\d[\d,]*(?:\.\d+)?\s?{_UNIT}"
+           rf"|usd\s?\d[\d,]*(?:\.\d+)?)\b")
+# Verb, amount within four words, then "to/into/for <target>" within six more.
+_COMMAND = (r"(?:[a-z_ ]{{1,30}}:\s*)?(?:please\s+)?(?:{verbs})\w*\s+(?:\S+\s+){{0,4}}?" + _AMOUNT
+            + r"(?:\s+\S+){{0,6}}?\s+(?:to|into|for|towards?)\s+['\"]?[a-z0-9]")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+DEFAULT_DENIAL = ("[SECURITY ALERT] Access Denied: Principal '{principal}' lacks {scopes} for '{tool}'. "
+                  "The request was refused before execution; request the entitlement from your IAM administrator.")
+
+
+def protected_tool(scopes, intents=(), denial=None):
+    """Tool metadata: required scopes plus lower-case regex fragments for the action's verbs."""
+    def decorate(func):
+        func.required_scopes = tuple(scopes)
+        func.intent_patterns = tuple(intents)
+        func.denial_template = denial or DEFAULT_DENIAL
+        return func
+    return decorate
+
+
+class PreAuthorizer:
+    """before_model_callback: short-circuits provable denials, hides tools the principal cannot use."""
+
+    def __init__(self, engine, tools, max_sessions=10_000):
+        self.engine = engine
+        self.protected = {t.__name__: t for t in tools if getattr(t, "required_scopes", None)}
+        self._group_to_tool = {}
+        alternatives = []
+        for i, (name, tool) in enumerate(self.protected.items()):
+            if tool.intent_patterns:
+                self._group_to_tool[f"t{i}"] = name
+                alternatives.append(f"(?P<t{i}>{'|'.join(tool.intent_patterns)})")
+        self._pattern = re.compile(_COMMAND.format(verbs="|".join(alternatives))) if alternatives else None
+        self.max_sessions = max_sessions
+        self._denied = {}
+        self.counters = {"turns": 0, "short_circuited": 0, "tools_hidden": 0}
+
+    def intended(self, text):
+        """Protected tools the text commands (imperative verb + amount + target), in order."""
+        if self._pattern is None:
+            return []
+        found = {}
+        for sentence in _SENTENCE.split(text.lower()):
+            sentence = sentence.strip()
+            match = None if sentence.endswith("?") else self._pattern.match(sentence)
+            if match:
+                found.update(dict.fromkeys(self._group_to_tool[g] for g, v in match.groupdict().items() if v))
+        return list(found)
+
+    def denied_tools(self, principal, session_id=None):
+        """Protected tools `principal` cannot use; cached per session and policy generation."""
+        key = (session_id, principal, self.engine.generation)
+        denied = self._denied.get(key)
+        if denied is None:
+            denied = frozenset(name for name, tool in self.protected.items()
+                               if not self.engine.check(principal, tool.required_scopes))
+            if len(self._denied) >= self.max_sessions:
+                self._denied.clear()
+            self._denied[key] = denied
+        return denied
+
+    def denial(self, principal, tool_name):
+        tool = self.protected[tool_name]
+        return tool.denial_template.format(principal=principal, tool=tool_name,
+                                           scopes=", ".join(f"'{s}'" for s in tool.required_scopes))
+
+    @staticmethod
+    def _hide(llm_request, denied):
+        llm_request.tools_dict = {n: t for n, t in llm_request.tools_dict.items() if n not in denied}
+        kept = []
+        for tool in llm_request.config.tools or ():
+            if tool.function_declarations:
+                tool.function_declarations = [d for d in tool.function_declarations if d.name not in denied]
+                if not tool.function_declarations:
+                    continue
+            kept.append(tool)
+        llm_request.config.tools = kept or None
+
+    def before_model(self, callback_context, llm_request):
+        from google.adk.models.llm_response import LlmResponse
+        from google.genai import types
+
+        principal = str(callback_context.user_id)
+        session = getattr(callback_context, "session", None)
+        denied = self.denied_tools(principal, session.id if session else None)
+        last = llm_request.contents[-1] if llm_request.contents else None
+        first_call = last is not None and last.role == "user" and not any(p.function_response for p in last.parts or ())
+        if first_call:
+            self.counters["turns"] += 1
+            for tool_name in self.intended(" ".join(p.text or "" for p in last.parts or ())):
+                if tool_name in denied:
+                    self.counters["short_circuited"] += 1
+                    self.engine.authorize(principal, self.protected[tool_name].required_scopes, resource="preauth")
+                    return LlmResponse(
+                        content=types.Content(role="model", parts=[types.Part(text=self.denial(principal, tool_name))]),
+                        custom_metadata={"preauth": {"principal": principal, "tool": tool_name}},
+                    )
+        if denied:
+            self.counters["tools_hidden"] += first_call
+            self._hide(llm_request, denied)
+        return None
+
+    def stats(self):
+        return dict(self.counters)
+
+
+# --- DEMO: lesson 09's gatekeeper under a mixed-principal workload ---
+
+_PRINCIPALS = ["exec_lead_2026", "finance_partner", "associate_analyst", "contractor_x"]
+_REQUESTS = [
+    "Reallocate $500,000 to 'Project Alpha' for immediate AI infrastructure scaling.",
+    "Transfer $1.2M from Cloud Migration to Cyber Shield.",
+    "Authorize the budget for the Q3 data residency program.",
+    "What ROI should we expect from the Cyber Shield prototype?",
+    "Summarize the market research on agent platforms.",
+    "Can we shift $250k of the innovation fund into Project Alpha?",
+]
+# Mention the action's words but command nothing: these must always reach the model.
+_QUESTIONS = [
+    "Summarize the knowledge transfer risks for Project Alpha.",
+    "What is our policy on budget reallocation?",
+    "Explain transfer pricing for the EU subsidiaries.",
+    "Who can authorize the budget for Q3?",
+    "Shift 2 engineers to Cyber Shield.",
+    "Should we transfer $1.2M to Cyber Shield?",
+]
+
+
+async def _run(workload, tools, preauth):
+    from google.adk.agents import Agent
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    model_calls = []
+    outcomes = {"denied": 0, "executed": 0, "answered": 0}
+
+    class ScriptedStrategist(BaseLlm):
+        """Calls whichever advertised tool the request (loosely) asks for, then summarizes."""
+
+        async def generate_content_async(self, llm_request, stream=False):
+            model_calls.append(1)
+            last = llm_request.contents[-1]
+            advertised = set(llm_request.tools_dict)
+            if any(p.function_response for p in last.parts or ()):
+                text = str(last.parts[0].function_response.response)
+                outcomes["denied" if "Denied" in text else "executed"] += 1
+                parts = [types.Part(text="Policy summary: " + text)]
+            else:
+                asked = (last.parts[0].text or "").lower()
+                principal = asked.split("\n")[0].removeprefix("principal_id: ")
+                wanted = [t.__name__ for t in tools if t.__name__ in advertised and any(
+                    word in asked for word in t.demo_keywords)]
+                if wanted:
+                    parts = [types.Part(function_call=types.FunctionCall(
+                        id="c0", name=wanted[0], args={"amount": 500000, "target_project": "Project Alpha", "user_id": principal}))]
+                else:
+                    outcomes["answered"] += 1
+                    parts = [types.Part(text="Advisory answer without privileged actions.")]
+            yield LlmResponse(content=types.Content(role="model", parts=parts))
+
+    agent = Agent(name="IAM_Governance_Strategist", instruction="Identity-aware execution.",
+                  model=ScriptedStrategist(model="scripted"), tools=tools,
+                  before_model_callback=preauth.before_model if preauth else None)
+    service = InMemorySessionService()
+    runner = Runner(agent=agent, app_name="preauth_demo", session_service=service)
+    for i, (principal, request) in enumerate(workload):
+        await service.create_session(app_name="preauth_demo", user_id=principal, session_id=f"s{i}")
+        message = types.Content(role="user", parts=[types.Part(text=f"PRINCIPAL_ID: {principal}\nACTION_REQUEST: {request}")])
+        async for event in runner.run_async(user_id=principal, session_id=f"s{i}", new_message=message):
+            if event.custom_metadata and "preauth" in event.custom_metadata:
+                outcomes["denied"] += 1
+    return len(model_calls), outcomes
+
+
+async def _demo(requests=240):
+    import random
+    import time
+
+    from config.iam_policy import PolicyEngine
+
+    engine = PolicyEngine({
+        "exec_lead_2026": ["executive"], "finance_partner": ["finance_lead"], "associate_analyst": ["analyst"],
+    }, {
+        "analyst": {"scopes": ["market_research"]},
+        "finance_lead": {"scopes": ["calculate_roi"], "inherits": ["analyst"]},
+        "executive": {"scopes": ["authorize_budget"], "inherits": ["finance_lead"]},
+    })
+
+    @protected_tool(["authorize_budget"], intents=[r"realloc", r"transfer", r"authori[sz]e", r"move", r"shift"])
+    def authorize_capital_reallocation(amount: float, target_project: str, user_id: str) -> str:
+        """Executes a fund transfer between strategic initiatives (the tool keeps its own gate)."""
+        if not engine.authorize(user_id, "authorize_budget", resource=target_project):
+            return f"[SECURITY ALERT] Access Denied: Principal '{user_id}' lacks 'authorize_budget' scope."
+        return f"[SUCCESS] ${amount:,.2f} reallocated to {target_project}."
+
+    authorize_capital_reallocation.demo_keywords = ("realloc", "transfer", "budget", "shift")
+    rng = random.Random(5)
+    workload = [(rng.choice(_PRINCIPALS), rng.choice(_REQUESTS)) for _ in range(requests)]
+    tools = [authorize_capital_reallocation]
+
+    await _run(workload[:2], tools, None)  # Warm-up.
+    started = time.perf_counter()
+    base_calls, base = await _run(workload, tools, None)
+    base_s = time.perf_counter() - started
+    engine.counters["denials"] = 0
+    preauth = PreAuthorizer(engine, tools)
+    started = time.perf_counter()
+    pre_calls, pre = await _run(workload, tools, preauth)
+    pre_s = time.perf_counter() - started
+    print(f"--- [DEMO] {requests} requests from {len(_PRINCIPALS)} principals (one unknown) ---")
+    print(f"Tool gate only:  {base_calls} model calls | outcomes {base} | {base_s:.2f} s")
+    print(f"With pre-check:  {pre_calls} model calls | outcomes {pre} | {pre_s:.2f} s")
+    print(f"Model calls avoided: {base_calls - pre_calls} ({(1 - pre_calls / base_calls) * 100:.0f}%); "
+          f"denials without the model: {preauth.stats()['short_circuited']}")
+    print(f"Pre-check: {preauth.stats()} | IAM: {engine.stats()}")
+
+    # Questions that merely mention the action go to the model, even for principals without the scope.
+    asked = [(principal, q) for q in _QUESTIONS for principal in ("associate_analyst", "contractor_x")]
+    calls, outcomes = await _run(asked, tools, PreAuthorizer(engine, tools))
+    assert calls == len(asked) and outcomes["denied"] == 0, (calls, outcomes)
+    print(f"Questions mentioning the action: {len(asked)} turns, {calls} reached the model, "
+          f"{outcomes['denied']} refused | outcomes {outcomes}")
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    asyncio.run(_demo())
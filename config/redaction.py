@@ -0,0 +1,277 @@
+"""
+FILE: config/redaction.py
+DESCRIPTION: Streaming PII redaction for agent output with a bounded lookahead window.
+ARCHITECT'S NOTE: Governance lessons print model output as it arrives, so leaked
+identifiers must be masked in flight. Buffering the whole answer would throw away
+streaming latency; instead each stream holds back only the tail that could still be
+the start of a match: the trailing unbroken token (emails, SSNs) or the longest
+pattern that may contain spaces (phones, IBANs, configured names). Everything
+before that window is masked and released immediately.
+
+IBANs are the exception to lower-case matching: on folded text the IBAN shape also
+matches prose ("FY26 plan will need..."). They are matched on the original text
+(upper-case country code and groups), and only masked once the mod-97 checksum holds.
+
+BENCHMARK: python -m config.redaction
+"""
+import re
+import time
+
+# Kind -> (lower-case regex, may the match contain whitespace?). Bounded quantifiers keep
+# windows finite.
+DEFAULT_PATTERNS = {
+    # The lookbehind anchors emails at token starts instead of retrying inside every word.
+    "EMAIL": (r"(?<![a-z0-9._%+-])[a-z0-9._%+-]{1,64}@[a-z0-9-]{1,63}(?:\.[a-z0-9-]{1,63}){0,4}\.[a-z]{2,24}", False),
+    "SSN": (r"\b\d{3}-\d{2}-\d{4}\b", False),
+    "PHONE": (r"(?<!\w)(?:\+?1[ .-]?)?\(?\d{3}\)?[ .-]?\d{3}[ .-]\d{4}\b", True),
+    # An explicit no/number/id/#/: marker and a digit in the identifier keep prose
+    # ("account manager", "account reconciliation") out.
+    "ACCOUNT": (r"\b(?:account|acct|a/c)(?: ?(?:no|number|id)[.:#]? ?| ?[:#] ?)(?=[a-z-]{0,19}\d)[a-z0-9-]{6,20}\b",
+                True),
+}
+# Case-sensitive, on the original text; reported as ACCOUNT. Candidates must pass iban_valid().
+IBAN_PATTERN = r"(?P<iban>\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){3,7}(?: ?[A-Z0-9]{1,4})?\b)"
+# Longest possible text for each space-capable pattern above (bounded by its quantifiers).
+_SPACED_MAX = {"PHONE": 20, "ACCOUNT": 45}
+_TOKEN_MAX = 64 + 1 + 5 * 64 + 25
+
+
+def iban_valid(candidate):
+    """ISO 13616 check: 15-34 characters, digits in the account part, mod-97 remainder of 1."""
+    iban = candidate.replace(" ", "")
+    if not 15 <= len(iban) <= 34 or not any(c.isdigit() for c in iban[4:]):
+        return False
+    return int("".join(str(int(c, 36)) for c in iban[4:] + iban[:4])) % 97 == 1
+
+
+def _first_of(left, right):
+    """Merges two ordered match streams; on overlap the earlier (then longer) match wins."""
+    a, b = next(left, None), next(right, None)
+    end = 0
+    while a is not None or b is not None:
+        if b is None or (a is not None and (a.start(), -a.end()) <= (b.start(), -b.end())):
+            match, a = a, next(left, None)
+        else:
+            match, b = b, next(right, None)
+        if match.start() >= end:
+            end = match.end()
+            yield match
+
+
+class RedactionPolicy:
+    """Compiled patterns + configured names, shared by every stream; counts redactions."""
+
+    def __init__(self, names=(), patterns=None):
+        patterns = dict(patterns or DEFAULT_PATTERNS)
+        names = sorted({n.strip() for n in names if n.strip()}, key=len, reverse=True)
+        if names:
+            patterns["NAME"] = (r"\b(?:%s)\b" % "|".join(re.escape(n.lower()) for n in names), True)
+        self._kinds = {}
+        alternatives = []
+        for i, (kind, (regex, _)) in enumerate(patterns.items()):
+            self._kinds[f"k{i}"] = kind
+            alternatives.append(f"(?P<k{i}>{regex})")
+        # Matching runs on lower-cased text (same offsets) because IGNORECASE is ~1.5x slower;
+        # the case-insensitive pattern is kept for the rare text whose lower() changes length.
+        self.pattern = re.compile("|".join(alternatives))
+        self._folding_pattern = re.compile("|".join(alternatives), re.IGNORECASE)
+        self._iban = re.compile(IBAN_PATTERN)
+        self._kinds["iban"] = "ACCOUNT"
+        patterns.setdefault("ACCOUNT", ("", True))
+        spaced = [_SPACED_MAX.get(k, 0) for k, (_, has_space) in patterns.items() if has_space]
+        if names:
+            spaced.append(len(names[0]))
+        # Minimal holdback for matches that may span whitespace; token-like matches use the tail run.
+        self.spaced_window = max(spaced, default=1) - 1
+        self.redactions = {kind: 0 for kind in patterns}
+        self.bytes_scanned = 0
+        self.seconds = 0.0
+
+    def finditer(self, text):
+        folded = text.lower()
+        if len(folded) != len(text):
+            matches = self._folding_pattern.finditer(text)
+        else:
+            matches = self.pattern.finditer(folded)
+        ibans = (m for m in self._iban.finditer(text) if iban_valid(m.group()))
+        return _first_of(matches, ibans)
+
+    def mask(self, match):
+        kind = self._kinds[match.lastgroup]
+        self.redactions[kind] += 1
+        return f"[REDACTED:{kind}]"
+
+    def redact(self, text):
+        """Whole-text redaction (non-streamed responses)."""
+        started = time.perf_counter()
+        out = []
+        pos = 0
+        for match in self.finditer(text):
+            out.append(text[pos:match.start()])
+            out.append(self.mask(match))
+            pos = match.end()
+        out.append(text[pos:])
+        out = "".join(out)
+        self.bytes_scanned += len(text)
+        self.seconds += time.perf_counter() - started
+        return out
+
+    def stats(self):
+        return {
+            "redactions": dict(self.redactions),
+            "bytes_scanned": self.bytes_scanned,
+            "mb_per_s": round(self.bytes_scanned / self.seconds / 1e6, 1) if self.seconds else 0.0,
+            "lookahead_chars": self.spaced_window,
+        }
+
+
+class StreamingRedactor:
+    """Per-stream state: feed() returns the masked text that is safe to release now."""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self._buffer = ""
+
+    def _holdback(self):
+        buffer = self._buffer
+        if not buffer or buffer[-1].isspace():
+            run = 0
+        else:
+            run = len(buffer) - 1 - max(buffer.rfind(" "), buffer.rfind("\n"), buffer.rfind("\t"))
+        return min(max(run, self.policy.spaced_window), _TOKEN_MAX, len(buffer))
+
+    def feed(self, chunk, final=False):
+        started = time.perf_counter()
+        self._buffer += chunk
+        buffer = self._buffer
+        cut = len(buffer) if final else len(buffer) - self._holdback()
+        out = []
+        pos = 0
+        for match in self.policy.finditer(buffer):
+            if match.end() > cut or (not final and match.end() == len(buffer)):
+                cut = min(cut, match.start())  # Might still grow with the next chunk.
+                break
+            out.append(buffer[pos:match.start()])
+            out.append(self.policy.mask(match))
+            pos = match.end()
+        if pos < cut:
+            out.append(buffer[pos:cut])
+            pos = cut
+        self._buffer = buffer[pos:]
+        self.policy.bytes_scanned += len(chunk)
+        self.policy.seconds += time.perf_counter() - started
+        return "".join(out)
+
+    def flush(self):
+        return self.feed("", final=True)
+
+
+def _with_text(event, text_parts, partial=None):
+    from google.genai import types
+
+    texts = iter(text_parts)
+    parts = [types.Part(text=next(texts)) if p.text is not None else p for p in event.content.parts]
+    update = {"content": types.Content(role=event.content.role, parts=parts)}
+    if partial is not None:
+        update["partial"] = partial
+    return event.model_copy(update=update)
+
+
+async def redact_events(events, policy):
+    """Wraps a run_async event stream; partial text is masked in flight, final text in full."""
+    stream = StreamingRedactor(policy)
+    last_partial = None
+    async for event in events:
+        if not (event.content and event.content.parts and any(p.text for p in event.content.parts)):
+            yield event
+            continue
+        if event.partial:
+            last_partial = event
+            yield _with_text(event, [stream.feed(p.text) if p.text is not None else None
+                                     for p in event.content.parts if p.text is not None])
+            continue
+        if last_partial is not None:
+            # Release the held-back tail before the aggregated final event.
+            tail = stream.flush()
+            if tail:
+                yield _with_text(last_partial, [tail] + [""] * (sum(p.text is not None for p in last_partial.content.parts) - 1))
+            last_partial = None
+        yield _with_text(event, [policy.redact(p.text) for p in event.content.parts if p.text is not None])
+
+
+# --- BENCHMARK: large synthetic outputs, token-sized and larger chunks ---
+
+def _synthetic_output(size_bytes, seed=5):
+    import random
+
+    rng = random.Random(seed)
+    fragments = [
+        "The steering committee approved the Sovereign Cloud roadmap for 2026. ",
+        "Escalate to jane.doe@northwind-corp.com before the audit window closes. ",
+        "Call the program office at (555) 201-7788 to confirm vendor terms. ",
+        "Settlement routes through account no: AC-99812734 at the treasury desk. ",
+        "Wire reference IBAN DE89 3704 0044 0532 0130 00 covers phase one. ",
+        "Priya Raman owns the data residency workstream with Marcus Lee. ",
+        "Latency budgets stay under 200 ms for the agentic control plane. ",
+        "Do not record SSN 123-45-6789 in any planning document. ",
+        "Our FY26 plan will need more time and budget. ",
+        "Our account manager contacted procurement about account reconciliation. ",
+    ]
+    parts = []
+    total = 0
+    while total < size_bytes:
+        fragment = rng.choice(fragments)
+        parts.append(fragment)
+        total += len(fragment)
+    return "".join(parts)
+
+
+def _benchmark(size_mb=8):
+    policy = RedactionPolicy(names=["Priya Raman", "Marcus Lee"])
+    text = _synthetic_output(size_mb * 1_000_000)
+    expected = RedactionPolicy(names=["Priya Raman", "Marcus Lee"]).redact(text)
+
+    print(f"--- [BENCHMARK] {len(text) / 1e6:.1f} MB synthetic output | lookahead {policy.spaced_window} chars ---")
+    start = time.perf_counter()
+    whole = policy.redact(text)
+    elapsed = time.perf_counter() - start
+    print(f"{'whole text':>18}: {len(text) / elapsed / 1e6:7.1f} MB/s")
+    assert whole == expected
+    assert "Our FY26 plan will need more time and budget." in whole, "prose redacted as an account"
+    assert "Our account manager contacted procurement about account reconciliation." in whole
+    prose = [
+        "Our account manager contacted procurement.",
+        "Accountability for account holders sits with finance.",
+        "Account reconciliation closes on the 5th; the account identifier format is unchanged.",
+        "Take the account number into consideration before filing.",
+    ]
+    for sentence in prose:
+        assert RedactionPolicy().redact(sentence) == sentence, f"prose redacted as an account: {sentence!r}"
+    for marked in ("account no: AC-99812734", "Acct #44120093", "A/C: 123456789", "account number 7731-0042"):
+        assert RedactionPolicy().redact(marked) == "[REDACTED:ACCOUNT]", marked
+    probe = RedactionPolicy().redact("IBAN DE89 3704 0044 0532 0130 00 vs DE00 3704 0044 0532 0130 00 "
+                                     "vs de89 3704 0044 0532 0130 00 vs GB82 WEST 1234 5698 7654 32")
+    assert probe == ("IBAN [REDACTED:ACCOUNT] vs DE00 3704 0044 0532 0130 00 "
+                     "vs de89 3704 0044 0532 0130 00 vs [REDACTED:ACCOUNT]"), probe
+
+    for chunk_size in (4, 16, 256, 4096):
+        stream = StreamingRedactor(RedactionPolicy(names=["Priya Raman", "Marcus Lee"]))
+        out = []
+        latencies = []
+        start = time.perf_counter()
+        for offset in range(0, len(text), chunk_size):
+            chunk_start = time.perf_counter()
+            out.append(stream.feed(text[offset:offset + chunk_size]))
+            latencies.append(time.perf_counter() - chunk_start)
+        out.append(stream.flush())
+        elapsed = time.perf_counter() - start
+        assert "".join(out) == expected, f"chunk size {chunk_size}: streamed output differs"
+        latencies.sort()
+        print(f"{f'{chunk_size} B chunks':>18}: {len(text) / elapsed / 1e6:7.1f} MB/s | "
+              f"per chunk p50 {latencies[len(latencies) // 2] * 1e6:6.1f} us, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:6.1f} us | identical to whole-text: yes")
+    print(f"Redactions: {policy.redactions}")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,279 @@
+"""
+FILE: config/response_cache.py
+DESCRIPTION: Exact-match LLM response cache with single-flight request coalescing.
+ARCHITECT'S NOTE: A temperature-0 agent replaying the same prompt should not pay for a
+second generation. Responses are keyed on (model, config, system instruction, normalized
+history, new message), held in a bounded in-memory LRU backed by an on-disk SQLite tier,
+and concurrent identical requests share a single in-flight call to Ollama. Streamed
+calls are cached too: the chunks are passed through live and recorded, and once the
+stream completes the chunk list is stored (under a separate key) and later replayed
+as a stream, so callers that stream still see incremental output on a hit.
+
+BENCHMARK: python -m config.response_cache
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from google.adk.models.lite_llm import LiteLLMClient
+
+# Per-call plumbing that never changes what the model generates.
+_TRANSPORT_ARGS = {"client", "api_base", "stream", "stream_options", "metadata", "timeout"}
+
+
+def _normalize(value):
+    """Canonical form: dict keys sorted, None dropped, text whitespace-trimmed."""
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in sorted(value.items()) if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def request_key(model, messages, tools, **kwargs):
+    config = {k: v for k, v in kwargs.items() if k not in _TRANSPORT_ARGS}
+    system = [m for m in messages if m.get("role") == "system"]
+    history = [m for m in messages if m.get("role") != "system"]
+    payload = {
+        "model": model,
+        "config": config,
+        "tools": tools,
+        "system": system,
+        "history": history[:-1],
+        "message": history[-1:] if history else [],
+    }
+    canonical = json.dumps(_normalize(payload), sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Bounded memory LRU in front of a SQLite tier; values are serialized responses."""
+
+    def __init__(self, max_entries=512, disk_path=None):
+        self.max_entries = max_entries
+        self._memory = OrderedDict()  # key -> (payload, original_latency_s)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._disk = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, payload TEXT NOT NULL, latency REAL NOT NULL)"
+            )
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.latency_saved = 0.0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                self.latency_saved += entry[1]
+                return entry[0]
+            row = None
+            if self._disk is not None:
+                row = self._disk.execute("SELECT payload, latency FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self.latency_saved += row[1]
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def put(self, key, payload, latency):
+        with self._lock:
+            self._remember(key, payload, latency)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO responses (key, payload, latency) VALUES (?, ?, ?)", (key, payload, latency)
+                )
+                self._disk.commit()
+
+    def _remember(self, key, payload, latency):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[0])
+        self._memory[key] = (payload, latency)
+        self._memory_bytes += len(payload)
+        while len(self._memory) > self.max_entries:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            # Coalesced waiters missed the cache but never reached the model either.
+            served = self.memory_hits + self.disk_hits + self.coalesced
+            disk_bytes = 0
+            if self._disk is not None:
+                disk_bytes = self._disk.execute("SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM responses").fetchone()[0]
+            return {
+                "entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "model_calls": self.misses - self.coalesced,
+                "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": disk_bytes,
+                "latency_saved_s": round(self.latency_saved, 3),
+            }
+
+
+class CachedLiteLLMClient(LiteLLMClient):
+    """Wraps another LiteLLM client; identical calls (streamed or not) are served from cache."""
+
+    def __init__(self, inner, cache):
+        super().__init__()
+        self.inner = inner
+        self.cache = cache
+        self._in_flight = {}
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        from litellm import ModelResponse
+
+        streaming = bool(kwargs.get("stream"))
+        key = request_key(model, messages, tools, **kwargs)
+        if streaming:
+            key = f"stream:{key}"  # A chunk list, not a ModelResponse: never served to the other mode.
+        payload = self.cache.get(key)
+        if payload is None:
+            # Single flight: the first caller generates, identical concurrent callers await it.
+            pending = self._in_flight.get(key)
+            if pending is not None:
+                self.cache.coalesced += 1
+                payload = await asyncio.shield(pending)
+        if payload is not None:
+            return self._replay(payload) if streaming else ModelResponse(**json.loads(payload))
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            started = time.perf_counter()
+            response = await self.inner.acompletion(model=model, messages=messages, tools=tools, **kwargs)
+            if streaming:
+                return self._record(key, future, response, started)
+            payload = json.dumps(response.model_dump(), default=str)
+            self.cache.put(key, payload, time.perf_counter() - started)
+            future.set_result(payload)
+            self._in_flight.pop(key, None)
+            return response
+        except BaseException as exc:
+            self._abandon(key, future, exc)
+            raise
+
+    def _abandon(self, key, future, exc):
+        self._in_flight.pop(key, None)
+        if future.done():
+            return
+        if isinstance(exc, Exception):
+            future.set_exception(exc)
+            # Waiters re-raise it; mark it retrieved so an unawaited future stays quiet.
+            future.exception()
+        else:
+            future.cancel()  # Cancelled, or the consumer closed the stream early.
+
+    async def _record(self, key, future, stream, started):
+        """Passes chunks through as they arrive; caches the chunk list only if the stream completes."""
+        chunks = []
+        try:
+            async for chunk in stream:
+                chunks.append(chunk.model_dump())
+                yield chunk
+        except BaseException as exc:
+            self._abandon(key, future, exc)
+            raise
+        payload = json.dumps(chunks, default=str)
+        self.cache.put(key, payload, time.perf_counter() - started)
+        future.set_result(payload)
+        self._in_flight.pop(key, None)
+
+    @staticmethod
+    async def _replay(payload):
+        from litellm import ModelResponseStream
+
+        for chunk in json.loads(payload):
+            yield ModelResponseStream(**chunk)
+
+
+# --- BENCHMARK: replayed and concurrent identical prompts against a slow fake model ---
+
+async def _benchmark(replays=20, concurrent=10, model_latency=0.25):
+    from litellm import ModelResponse, ModelResponseStream
+
+    class SlowModel(LiteLLMClient):
+        calls = 0
+
+        async def acompletion(self, model, messages, tools, **kwargs):
+            SlowModel.calls += 1
+            if kwargs.get("stream"):
+                return self._stream(model)
+            await asyncio.sleep(model_latency)
+            return ModelResponse(
+                model=model,
+                choices=[{"index": 0, "finish_reason": "stop",
+                          "message": {"role": "assistant", "content": '{"roadmap": []}'}}],
+            )
+
+        @staticmethod
+        async def _stream(model):
+            pieces = ['{"road', 'map": ', '[]}']
+            for i, piece in enumerate(pieces):
+                await asyncio.sleep(model_latency / len(pieces))
+                yield ModelResponseStream(
+                    model=model,
+                    choices=[{"index": 0, "delta": {"role": "assistant", "content": piece},
+                              "finish_reason": "stop" if i == len(pieces) - 1 else None}],
+                )
+
+    client = CachedLiteLLMClient(SlowModel(), ResponseCache(max_entries=128))
+    messages = [
+        {"role": "system", "content": "You are a Principal Strategy Architect. Output JSON only."},
+        {"role": "user", "content": "Draft a 5-year roadmap for migrating our legacy ERP."},
+    ]
+    config = {"response_format": {"type": "json_object"}, "temperature": 0}
+
+    print(f"--- [BENCHMARK] fake model latency {model_latency * 1000:.0f} ms ---")
+    start = time.perf_counter()
+    await asyncio.gather(*(client.acompletion("ollama_chat/llama3.2", messages, None, config=config)
+                           for _ in range(concurrent)))
+    print(f"{concurrent} concurrent identical calls: {time.perf_counter() - start:.3f} s, model calls = {SlowModel.calls}")
+
+    start = time.perf_counter()
+    for _ in range(replays):
+        # Trailing whitespace is normalized away, so replays still hit.
+        replay = [dict(m) for m in messages]
+        replay[-1]["content"] += "  "
+        await client.acompletion("ollama_chat/llama3.2", replay, None, config=config)
+    elapsed = time.perf_counter() - start
+    print(f"{replays} sequential replays:           {elapsed:.4f} s ({elapsed / replays * 1e6:.0f} us/call), "
+          f"model calls = {SlowModel.calls}")
+
+    # Streamed calls: the first run streams live and is recorded; re-runs replay the same chunks.
+    runs = []
+    for _ in range(3):
+        start = time.perf_counter()
+        stream = await client.acompletion("ollama_chat/llama3.2", messages, None, config=config, stream=True)
+        runs.append([chunk.choices[0].delta.content async for chunk in stream])
+        print(f"streamed run {len(runs)}: {len(runs[-1])} chunks in {time.perf_counter() - start:.3f} s, "
+              f"model calls = {SlowModel.calls}")
+    assert runs[0] == runs[1] == runs[2] and "".join(filter(None, runs[0])) == '{"roadmap": []}'
+    assert SlowModel.calls == 2, "streamed re-runs must replay from cache"
+    print(f"Cache stats: {client.cache.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_benchmark())
@@ -0,0 +1,187 @@
+"""
+FILE: config/scoped_sessions.py
+DESCRIPTION: Per-agent sub-sessions under a parent session, with explicit hand-off artifacts.
+ARCHITECT'S NOTE: When every war-room agent shares one session, each one replays every
+other agent's raw history. The CFO reads the innovator's transcript, and the CEO reads
+the pitch and audit twice: once as history and once inside its prompt. Here each stage
+runs in its own child session (`<parent>.<stage>`, with the parent id kept in its
+state), so its prompt holds exactly the inputs it declares. A stage's output is
+published to the parent session as a `handoff:<stage>` state entry. That makes it a
+durable artifact a later turn can read without replaying anyone's transcript. Child
+sessions also make concurrent stages safe: no two generations append to the same
+history.
+
+DEMO: python -m config.scoped_sessions   (token accounting: shared session vs scoped sub-sessions)
+"""
+import asyncio
+import time
+
+from config.context_compaction import estimate_tokens
+
+HANDOFF_PREFIX = "handoff:"
+
+
+class SessionScope:
+    """Child sessions and hand-off artifacts for the stages of one parent session."""
+
+    def __init__(self, service, app_name, user_id, parent_id):
+        self.service = service
+        self.app_name = app_name
+        self.user_id = user_id
+        self.parent_id = parent_id
+        self.usage = {}
+
+    async def child(self, stage):
+        """The stage's sub-session; reused if the stage runs again (it keeps its own thread)."""
+        session_id = f"{self.parent_id}.{stage}"
+        session = await self.service.get_session(app_name=self.app_name, user_id=self.user_id, session_id=session_id)
+        if session is None:
+            session = await self.service.create_session(
+                app_name=self.app_name, user_id=self.user_id, session_id=session_id,
+                state={"parent_session": self.parent_id, "scope": stage},
+            )
+        return session
+
+    async def publish(self, stage, text):
+        """Records a stage output on the parent session as `handoff:<stage>`."""
+        from google.adk.events import Event, EventActions
+
+        parent = await self.service.get_session(app_name=self.app_name, user_id=self.user_id, session_id=self.parent_id)
+        event = Event(author=stage, invocation_id=f"handoff-{stage}-{time.time_ns()}",
+                      actions=EventActions(state_delta={HANDOFF_PREFIX + stage: text}))
+        await self.service.append_event(parent, event)
+
+    async def handoffs(self):
+        parent = await self.service.get_session(app_name=self.app_name, user_id=self.user_id, session_id=self.parent_id)
+        return {k[len(HANDOFF_PREFIX):]: v for k, v in parent.state.items() if k.startswith(HANDOFF_PREFIX)}
+
+    def stage(self, agent, prompt, runner=None, name=None):
+        """Workflow stage: runs `agent` in its sub-session on the declared inputs, then hands off."""
+        name = name or agent.name
+
+        async def run(inputs):
+            from google.genai import types
+
+            if runner is None:
+                from config.settings import get_runner
+                stage_runner = get_runner(agent)
+            else:
+                stage_runner = runner
+            session = await self.child(name)
+            message = types.Content(role="user", parts=[types.Part(text=prompt.format(**inputs))])
+            text, usage = "", {"prompt_tokens": 0, "output_tokens": 0}
+            async for event in stage_runner.run_async(user_id=self.user_id, session_id=session.id, new_message=message):
+                if event.usage_metadata:
+                    usage["prompt_tokens"] += event.usage_metadata.prompt_token_count or 0
+                    usage["output_tokens"] += event.usage_metadata.candidates_token_count or 0
+                if event.is_final_response() and event.content and event.content.parts:
+                    text = event.content.parts[0].text or ""
+            if not usage["prompt_tokens"]:
+                usage = {"prompt_tokens": estimate_tokens(message.parts[0].text), "output_tokens": estimate_tokens(text)}
+            self.usage[name] = usage
+            await self.publish(name, text)
+            return text, usage
+
+        return run
+
+
+def token_report(runs):
+    """Table of prompt tokens per stage for several designs: {design: [workflow events]}."""
+    designs = list(runs)
+    stages = list(dict.fromkeys(e["stage"] for events in runs.values() for e in events))
+    per = {d: {e["stage"]: e.get("prompt_tokens", 0) for e in runs[d]} for d in designs}
+    lines = [f"{'stage':<18}" + "".join(f"{d:>16}" for d in designs)]
+    for stage in stages:
+        lines.append(f"{stage:<18}" + "".join(f"{per[d].get(stage, 0):>16,}" for d in designs))
+    totals = {d: sum(per[d].values()) for d in designs}
+    lines.append(f"{'TOTAL prompt':<18}" + "".join(f"{totals[d]:>16,}" for d in designs))
+    return "\n".join(lines), totals
+
+
+# --- DEMO: lesson 10's war room, shared session vs scoped sub-sessions ---
+
+async def _demo():
+    from google.adk.agents import Agent
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    from config.workflow import Workflow
+
+    class ScriptedExecutive(BaseLlm):
+        """Counts the tokens it is actually sent; answers with a ~250-token memo."""
+
+        async def generate_content_async(self, llm_request, stream=False):
+            sent = str(llm_request.config.system_instruction or "") + " ".join(
+                p.text or "" for c in llm_request.contents for p in c.parts or ())
+            await asyncio.sleep(0.05)
+            text = (f"{llm_request.config.system_instruction.split('.')[0]}: " + "analysis " * 110).strip()
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                usage_metadata=types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=estimate_tokens(sent), candidates_token_count=estimate_tokens(text)),
+            )
+
+    graph = {
+        "pitch": ("You are the Chief Innovation Officer.", "Draft a high-impact pitch for: {proposal}", ["proposal"]),
+        "fiscal_audit": ("You are a Skeptical CFO.", "Perform a ruthless risk audit on this pitch: {pitch}", ["pitch"]),
+        "legal_review": ("You are General Counsel.", "Review this pitch for legal exposure: {pitch}", ["pitch"]),
+        "security_review": ("You are the CISO.", "Threat-model this pitch: {pitch}", ["pitch"]),
+        "verdict": ("Review the following debate.",
+                    "INNOVATION CASE: {pitch}\n\nFISCAL AUDIT: {fiscal_audit}\n\n"
+                    "LEGAL REVIEW: {legal_review}\n\nSECURITY REVIEW: {security_review}",
+                    ["pitch", "fiscal_audit", "legal_review", "security_review"]),
+    }
+    proposal = {"proposal": "Decommission 100% of human-led customer support in favor of Agentic AI by Q1 2026."}
+    service = InMemorySessionService()
+
+    def build(make_stage, cap):
+        workflow = Workflow(max_concurrency=cap)
+        for name, (instruction, prompt, inputs) in graph.items():
+            agent = Agent(name=name, instruction=instruction, model=ScriptedExecutive(model="scripted"))
+            runner = Runner(agent=agent, app_name="scoped_demo", session_service=service)
+            workflow.add(name, make_stage(agent, prompt, runner), inputs)
+        return workflow
+
+    runs = {}
+    # Shared: every stage appends to one session (run serially, as lesson 10 originally did).
+    shared = await service.create_session(app_name="scoped_demo", user_id="u")
+
+    def shared_stage(agent, prompt, runner):
+        async def run(inputs):
+            message = types.Content(role="user", parts=[types.Part(text=prompt.format(**inputs))])
+            text, usage = "", {"prompt_tokens": 0, "output_tokens": 0}
+            async for event in runner.run_async(user_id="u", session_id=shared.id, new_message=message):
+                if event.usage_metadata:
+                    usage["prompt_tokens"] += event.usage_metadata.prompt_token_count or 0
+                    usage["output_tokens"] += event.usage_metadata.candidates_token_count or 0
+                if event.is_final_response():
+                    text = event.content.parts[0].text
+            return text, usage
+        return run
+
+    parent = await service.create_session(app_name="scoped_demo", user_id="u")
+    scope = SessionScope(service, "scoped_demo", "u", parent.id)
+
+    def scoped_stage(agent, prompt, runner):
+        return scope.stage(agent, prompt, runner=runner)
+
+    _, runs["shared session"] = await build(shared_stage, 1).run(proposal)
+    _, runs["scoped"] = await build(scoped_stage, 4).run(proposal)
+
+    table, totals = token_report(runs)
+    print("--- [DEMO] War-room prompt tokens per agent (5 agents, ~250-token memos) ---")
+    print(table)
+    saved = totals["shared session"] - totals["scoped"]
+    print(f"Scoped sub-sessions send {saved:,} fewer prompt tokens ({saved / totals['shared session'] * 100:.0f}%); "
+          f"verdict alone: {runs['shared session'][-1]['prompt_tokens']:,} -> {runs['scoped'][-1]['prompt_tokens']:,}")
+    handoffs = await scope.handoffs()
+    child = await scope.child("verdict")
+    print(f"Parent session hand-offs: {sorted(handoffs)} | verdict sub-session: {child.id[-20:]} "
+          f"events={len(child.events)} parent={child.state['parent_session'][:8]}...")
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
@@ -0,0 +1,396 @@
+"""
+FILE: config/sector_index.py
+DESCRIPTION: Prebuilt fuzzy lookup index for sector names (aliases, trigrams, edit distance).
+ARCHITECT'S NOTE: `fetch_industry_intelligence` used `.strip().title()` plus an exact
+dict lookup, so "banking & finance", "supply-chain" or "health care" fell through to
+the generic trend and the model re-called the tool. The index resolves a noisy string
+in three tiers, cheapest first:
+  1. alias table     - normalized form (case, '&', punctuation, filler words) and its
+                       space-free form map straight to a canonical sector or alias;
+  2. trigram index   - unknown query words are matched against the vault vocabulary
+                       through a character-trigram inverted index; the corrected words
+                       then intersect per-word postings (NumPy arrays). A key is scored
+                       by how much of it the query covers ("retail banking" fully
+                       covers "Banking"), weighted by spelling quality; Jaccard only
+                       breaks ties, and equally good keys for different sectors
+                       ("Finance & Health") resolve to nothing;
+  3. edit distance   - when a misspelt word keeps too few trigrams, its trigram
+                       shortlist is re-ranked by edit distance (transpositions
+                       count once, with an early exit past the acceptance bound);
+                       a word still unmatched ("banks") takes the one vocabulary
+                       word its 4+ letter stem is a prefix of, if that word is unique.
+Everything is built once and results are cached per normalized query; a lookup
+never scans the vault.
+
+BENCHMARK: python -m config.sector_index   (accuracy + latency on a 100k-sector, 30k-word vault)
+"""
+import re
+from bisect import bisect_left
+from collections import OrderedDict
+
+import numpy as np
+
+_PUNCT = re.compile(r"[^a-z0-9]+")
+_FILLER = {"sector", "sectors", "industry", "industries", "vertical", "market", "markets", "the", "and", "of"}
+
+
+def normalize(text):
+    words = _PUNCT.sub(" ", str(text).lower().replace("&", " and ")).split()
+    return " ".join(w for w in words if w not in _FILLER)
+
+
+def _trigrams(norm):
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit=None):
+    """Levenshtein distance counting an adjacent transposition as one edit ("sreVices").
+
+    Returns limit + 1 as soon as the distance is known to exceed `limit`.
+    """
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i]
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if cost and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)
+            current.append(value)
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class SectorMatch(tuple):
+    """(name, score, method); method is 'exact', 'alias', 'trigram' or 'edit'."""
+
+    __slots__ = ()
+
+    def __new__(cls, name, score, method):
+        return super().__new__(cls, (name, score, method))
+
+    name = property(lambda self: self[0])
+    score = property(lambda self: self[1])
+    method = property(lambda self: self[2])
+
+
+class SectorIndex:
+    """Canonical sector names plus aliases, resolved by alias -> trigram -> edit distance."""
+
+    def __init__(self, names, aliases=None, min_score=0.6, word_score=0.6, cache_size=4096):
+        self.names = list(dict.fromkeys(names))
+        self.min_score = min_score
+        self.word_score = word_score
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        index_of = {name: i for i, name in enumerate(self.names)}
+        keys = {}
+        for i, name in enumerate(self.names):
+            keys.setdefault(normalize(name), i)
+        self._exact = dict(keys)
+        for alias, canonical in (aliases or {}).items():
+            keys.setdefault(normalize(alias), index_of[canonical])
+        # Glued spellings ("healthcare" for "Health Care", "supplychain") resolve in the alias tier.
+        self._alias = {norm.replace(" ", ""): i for norm, i in reversed(list(keys.items()))}
+        self._alias.update({norm: i for norm, i in keys.items() if norm not in self._exact})
+
+        # Word postings: every key (name or alias) is a bag of vocabulary words.
+        self._key_text = list(keys)
+        self._key_ids = np.fromiter(keys.values(), dtype=np.int32, count=len(keys))
+        self._vocab = {}
+        postings = []
+        lengths = []
+        for k, norm in enumerate(self._key_text):
+            words = set(norm.split())
+            lengths.append(len(words))
+            for word in words:
+                w = self._vocab.setdefault(word, len(self._vocab))
+                if w == len(postings):
+                    postings.append([])
+                postings[w].append(k)
+        self._postings = [np.array(p, dtype=np.int32) for p in postings]
+        self._key_words = np.array(lengths, dtype=np.int32)
+        # Character-trigram inverted index over the vocabulary, for misspelt or split words.
+        self._words = list(self._vocab)
+        grams = {}
+        for w, word in enumerate(self._words):
+            for gram in _trigrams(word):
+                grams.setdefault(gram, []).append(w)
+        self._grams = {gram: np.array(ids, dtype=np.int32) for gram, ids in grams.items()}
+        self._gram_size = np.array([len(_trigrams(word)) for word in self._words], dtype=np.float32)
+        self._sorted_words = sorted(self._words)
+        # Single-deletion variants: a typo and its intended word usually share one ("sreVices"/"services").
+        self._deletes = {}
+        for w, word in enumerate(self._words):
+            for variant in _deletions(word):
+                self._deletes.setdefault(variant, []).append(w)
+        self.lookups = {"exact": 0, "alias": 0, "trigram": 0, "edit": 0, "none": 0, "cached": 0}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _split(self, word):
+        """'aerospacefinance' -> ['aerospace', 'finance'] when both halves are known words."""
+        for i in range(2, len(word) - 1):
+            left, right = word[:i], word[i:]
+            if left in self._vocab and (right in self._vocab or right in _FILLER):
+                return [left] if right in _FILLER else [left, right]
+        return None
+
+    def _correct(self, word):
+        """Vocabulary word for a query word: (word_id, similarity, method) or None."""
+        w = self._vocab.get(word)
+        if w is not None:
+            return w, 1.0, "exact"
+        best = None
+        nearby = {w for variant in _deletions(word) | {word} for w in self._deletes.get(variant, ())}
+        for w in nearby:
+            score = _similarity(word, self._words[w], 1.0 - self.word_score)
+            if best is None or score > best[1]:
+                best = (w, score, "edit")
+        if best is not None and best[1] >= self.word_score:
+            return best
+        grams = _trigrams(word)
+        lists = [self._grams[g] for g in grams if g in self._grams]
+        best = None
+        if lists:
+            ids, shared = np.unique(np.concatenate(lists), return_counts=True)
+            dice = 2.0 * shared / (len(grams) + self._gram_size[ids])
+            top = np.argsort(-dice)[:4]
+            for t in top:
+                if dice[t] >= 0.75 and (best is None or dice[t] > best[1]):
+                    best = (int(ids[t]), float(dice[t]), "trigram")
+            if best is None:
+                # Typos break most trigrams of a short word: re-rank the shortlist by edit distance.
+                for t in top:
+                    score = _similarity(word, self._words[ids[t]], 1.0 - self.word_score)
+                    if best is None or score > best[1]:
+                        best = (int(ids[t]), score, "edit")
+        if best and best[1] >= self.word_score:
+            return best
+        return self._unique_prefix(word)
+
+    def _unique_prefix(self, word):
+        """'banks' -> 'banking': the longest 4+ letter stem that starts exactly one vocabulary word."""
+        for end in range(len(word), 3, -1):
+            stem = word[:end]
+            lo = bisect_left(self._sorted_words, stem)
+            hi = bisect_left(self._sorted_words, stem + "\uffff", lo)
+            if hi - lo == 1:
+                return self._vocab[self._sorted_words[lo]], self.word_score, "edit"
+            if hi - lo > 1:
+                return None  # The stem is ambiguous; shorter stems only get worse.
+        return None
+
+    def resolve(self, query):
+        """Returns a SectorMatch or None when nothing scores at least `min_score`."""
+        norm = normalize(query)
+        if norm in self._cache:
+            self._cache.move_to_end(norm)
+            self.lookups["cached"] += 1
+            return self._cache[norm]
+        match = self._resolve(norm)
+        self._cache[norm] = match
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        self.lookups[match.method if match else "none"] += 1
+        return match
+
+    def _resolve(self, norm):
+        if not norm:
+            return None
+        if norm in self._exact:
+            return SectorMatch(self.names[self._exact[norm]], 1.0, "exact")
+        alias = self._alias.get(norm, self._alias.get(norm.replace(" ", "")))
+        if alias is not None:
+            return SectorMatch(self.names[alias], 1.0, "alias")
+
+        words = []
+        for word in norm.split():
+            # A dropped space glues two known words together.
+            words += (word not in self._vocab and self._split(word)) or [word]
+        words = list(dict.fromkeys(words))
+        corrected = [c for c in map(self._correct, words) if c is not None]
+        if not corrected:
+            return None
+        ids = list(dict.fromkeys(w for w, _, _ in corrected))
+        quality = sum(sim for _, sim, _ in corrected) / len(corrected)
+        method = "edit" if any(m == "edit" for _, _, m in corrected) else "trigram"
+        # Keys holding every corrected word: intersect postings, rarest first.
+        ordered = sorted((self._postings[w] for w in ids), key=len)
+        keys = ordered[0]
+        complete = True
+        for posting in ordered[1:]:
+            narrowed = np.intersect1d(keys, posting, assume_unique=True)
+            if not len(narrowed):
+                complete = False
+                break
+            keys = narrowed
+        if complete:
+            matched = np.full(len(keys), len(ids), dtype=np.float32)
+        else:
+            # No key holds every word: score every key holding any of them.
+            keys, counts = np.unique(np.concatenate(ordered), return_counts=True)
+            matched = counts.astype(np.float32)
+        # Coverage of the key: extra query words ("retail banking") don't count against it.
+        key_words = self._key_words[keys]
+        score = matched / key_words * quality
+        best = np.flatnonzero(score >= score.max() - 1e-6)
+        if score[best[0]] < self.min_score:
+            return None
+        if len(best) > 1:
+            # Equally covered keys: the closest word set (Jaccard) wins ("Digital Banking" over "Banking").
+            jaccard = matched[best] / (len(words) + key_words[best] - matched[best])
+            best = best[jaccard >= jaccard.max() - 1e-6][:64]
+        if len(best) > 1 and len({int(self._key_ids[keys[b]]) for b in best}) > 1:
+            if len({frozenset(self._key_text[keys[b]].split()) for b in best}) > 1:
+                return None  # "Finance & Health": as good a match for two different sectors.
+            # Same word set in another order: the key whose word order the query follows wins.
+            order = [self._words[w] for w, _, _ in corrected]
+
+            def agreement(b):
+                key = self._key_text[keys[b]].split()
+                return sum(x == y for x, y in zip((w for w in order if w in key), key))
+
+            best = [max(best, key=agreement)]
+        top = int(best[0])
+        return SectorMatch(self.names[self._key_ids[keys[top]]], round(float(score[top]), 3), method)
+
+    def canonical(self, query, default=None):
+        """Resolved canonical name, or `default` (the title-cased query when None)."""
+        match = self.resolve(query)
+        if match:
+            return match.name
+        return default if default is not None else str(query).strip().title()
+
+    def stats(self):
+        return {"sectors": len(self.names), "keys": len(self._key_text), "vocabulary": len(self._words),
+                "trigrams": len(self._grams), "lookups": dict(self.lookups)}
+
+
+def _deletions(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))} if len(word) > 3 else set()
+
+
+def _similarity(a, b, max_loss=1.0):
+    """1 - edit distance / longer length; 0 once the loss would exceed `max_loss`."""
+    longest = max(len(a), len(b)) or 1
+    limit = int(max_loss * longest)
+    distance = edit_distance(a, b, limit)
+    return 0.0 if distance > limit else 1.0 - distance / longest
+
+
+# --- BENCHMARK: 100k synthetic sectors over a 30k-word vocabulary, noisy queries ---
+
+_ONSETS = ["b", "c", "d", "f", "g", "h", "k", "l", "m", "n", "p", "r", "s", "t", "v", "w", "z",
+           "br", "cl", "dr", "fl", "gr", "pl", "pr", "st", "tr", "sh", "ch", "th", "sp", "sk"]
+_VOWELS = ["a", "e", "i", "o", "u", "ai", "ea", "io", "ou"]
+_CODAS = ["", "", "n", "r", "s", "t", "l", "m", "nd", "rk", "st", "x"]
+
+
+def _synthetic_vocabulary(size, rng):
+    """`size` distinct pronounceable words of 2-4 syllables (a stand-in for a real sector lexicon)."""
+    words = set()
+    while len(words) < size:
+        syllables = rng.choice((2, 2, 3, 3, 4))
+        words.add("".join(rng.choice(_ONSETS) + rng.choice(_VOWELS) + rng.choice(_CODAS)
+                          for _ in range(syllables)))
+    return sorted(words)
+
+
+def _synthetic_vault(size, vocabulary=30_000, seed=23):
+    """Names of 1-4 words; word frequency is Zipf-like, so common words have long postings."""
+    import itertools
+    import random
+
+    rng = random.Random(seed)
+    words = [w.title() for w in _synthetic_vocabulary(vocabulary, rng)]
+    cumulative = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(words))))
+    names = {}
+    while len(names) < size:
+        picked = rng.choices(words, cum_weights=cumulative, k=rng.choice((1, 2, 2, 3, 3, 3, 4)))
+        if len(set(picked)) == len(picked):
+            names.setdefault(" ".join(picked), None)
+    return list(names)
+
+
+def _noisy(name, rng):
+    """One realistic corruption: case, '&', hyphens, glued words, filler, dropped/swapped letters."""
+    text = name
+    for _ in range(rng.randint(1, 2)):
+        kind = rng.randrange(6)
+        if kind == 0:
+            text = text.lower()
+        elif kind == 1:
+            text = text.replace(" ", "-", 1)
+        elif kind == 2:
+            text = text + rng.choice([" sector", " industry", " market"])
+        elif kind == 3 and len(text) > 6:
+            i = rng.randrange(1, len(text) - 1)
+            text = text[:i] + text[i + 1:]
+        elif kind == 4 and len(text) > 6:
+            i = rng.randrange(1, len(text) - 2)
+            text = text[:i] + text[i + 1] + text[i] + text[i + 2:]
+        else:
+            text = text.upper()
+    return text
+
+
+def _benchmark(size=100_000, queries=5_000):
+    import random
+    import time
+
+    vault = _synthetic_vault(size)
+    started = time.perf_counter()
+    index = SectorIndex(vault)
+    build_s = time.perf_counter() - started
+
+    rng = random.Random(19)
+    targets = [rng.choice(vault) for _ in range(queries)]
+    exact = list(targets)
+    noisy = [_noisy(t, rng) for t in targets]
+    # A plain word the vault doesn't know, before or after the name ("retail banking").
+    extra = [rng.choice(["retail ", "global ", ""]) + t + rng.choice([" services", " group", " it", ""])
+             for t in targets]
+
+    print(f"--- [BENCHMARK] {len(vault):,} sectors | {index.stats()['vocabulary']:,} words | build {build_s:.2f} s ---")
+    for label, batch in (("clean", exact), ("noisy", noisy), ("extra", extra)):
+        index._cache.clear()
+        latencies = []
+        correct = 0
+        for query, target in zip(batch, targets):
+            t0 = time.perf_counter()
+            match = index.resolve(query)
+            latencies.append(time.perf_counter() - t0)
+            correct += bool(match) and match.name == target
+        latencies.sort()
+        print(f"{label:>6}: accuracy {correct / len(batch):6.1%} | p50 {latencies[len(latencies) // 2] * 1e6:7.1f} us | "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:7.1f} us")
+
+    t0 = time.perf_counter()
+    for query in extra[-1000:]:
+        index.resolve(query)
+    print(f"repeat: {(time.perf_counter() - t0) / 1000 * 1e6:7.2f} us/lookup (resolution cache)")
+
+    # Baseline: the lesson's exact `.strip().title()` lookup.
+    titled = {name: name for name in vault}
+    baseline = sum(titled.get(str(q).strip().title()) == t for q, t in zip(noisy, targets))
+    print(f"Exact .strip().title() lookup on the noisy set: {baseline / len(noisy):6.1%}")
+
+    # Lesson 07's vault with the phrasings that used to fall through.
+    small = SectorIndex(["Banking", "Supply Chain", "Healthcare"],
+                        aliases={"finance": "Banking", "financial services": "Banking", "logistics": "Supply Chain",
+                                 "health": "Healthcare", "medical": "Healthcare"})
+    for query in ("banking & finance", "supply-chain", "health care", "HEALTHCARE industry", "bankng",
+                  "Financial Services", "logistcs", "retail banking", "banks", "Healthcare IT", "medical devices",
+                  "Finance & Health", "quantum gravity"):
+        print(f"  {query!r:24} -> {small.resolve(query)}")
+
+
+if __name__ == "__main__":
+    _benchmark()
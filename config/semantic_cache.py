@@ -0,0 +1,325 @@
+"""
+FILE: config/semantic_cache.py
+DESCRIPTION: Semantic cache for final agent answers (embedding nearest-neighbour lookup).
+ARCHITECT'S NOTE: Executives ask the same question in many phrasings ("Sovereign Cloud
+compliance risks" vs "compliance exposure of our sovereign cloud"). The user query is
+embedded locally, a NumPy cosine top-1 search runs over the cached queries of the same
+agent (name + instruction hash), and above the similarity threshold the stored answer is
+returned without a model call. Capacity is bounded (LRU eviction) and the index persists
+as a `.npy` matrix plus a JSON sidecar.
+
+Lexical hashing scores questions about different subjects as near-duplicates ("...the
+banking sector..." vs "...the healthcare sector..." is 0.90, "risks of migrating" vs
+"risks of not migrating" higher still). So similarity alone never serves an answer: the
+cached and the new query must also have the same content words - every word that is not
+phrasing filler (openers, articles, auxiliaries, generic qualifiers such as "main"),
+with numbers and negations (not/no/without/n't) always counted as content.
+
+BENCHMARK: python -m config.semantic_cache
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_CONTRACTED_NOT = re.compile(r"n['\u2019]t\b")
+# How a question is phrased, not what it is about. Negations are deliberately absent.
+_FILLER = frozenset(
+    "what which who whom whose why when where how is are was were be been being do does did can could should "
+    "would will may might shall must assess summarize summarise explain draft give list show compare describe "
+    "outline estimate evaluate analyze analyse identify provide please tell me us in on at by for of to from "
+    "with into about as and or the a an our my we i you your it its this that these those there their "
+    "main primary key top biggest major overall current".split()
+)
+
+
+def key_terms(text):
+    """Content words of a query: plural-folded non-filler words, numbers and negations included."""
+    words = _TOKEN.findall(_CONTRACTED_NOT.sub(" not", text.lower()))
+    return frozenset(
+        w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+        for w in words
+        if w not in _FILLER and (len(w) > 1 or w.isdigit())
+    )
+
+
+def same_subject(a, b):
+    """True when two key_terms() sets match exactly (so no word, number or "not" differs)."""
+    return a == b
+
+
+def hashed_embedding(texts, dim=256):
+    """Local, dependency-free embedding: signed feature hashing of words and character trigrams.
+
+    crc32 (not hash()) keeps vectors stable across processes, so a persisted index stays valid.
+    """
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = _TOKEN.findall(text.lower())
+        features = list(words)
+        for word in words:
+            padded = f" {word} "
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        for feature in features:
+            h = zlib.crc32(feature.encode("utf-8"))
+            out[row, h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    return out / np.maximum(norms, 1e-12)
+
+
+class _Segment:
+    """Cached queries of one agent scope: a growable unit-vector matrix plus answers."""
+
+    def __init__(self, dim, capacity):
+        self.vectors = np.zeros((min(capacity, 1024), dim), dtype=np.float32)
+        self.last_used = np.zeros(len(self.vectors), dtype=np.int64)
+        self.queries = []
+        self.answers = []
+        self.terms = []
+
+    def __len__(self):
+        return len(self.answers)
+
+    def slot(self, capacity):
+        """Row index for a new entry: append (doubling storage) or evict the LRU row."""
+        size = len(self)
+        if size < capacity:
+            if size == len(self.vectors):
+                grow = min(len(self.vectors) * 2, capacity)
+                self.vectors = np.resize(self.vectors, (grow, self.vectors.shape[1]))
+                self.last_used = np.resize(self.last_used, grow)
+            self.queries.append(None)
+            self.answers.append(None)
+            self.terms.append(None)
+            return size, False
+        return int(np.argmin(self.last_used[:size])), True
+
+
+class SemanticCache:
+    """Per-agent cosine top-1 cache of final answers, usable as ADK model callbacks."""
+
+    def __init__(self, threshold=0.88, capacity=10_000, dim=256, embed_fn=None, path=None):
+        self.threshold = threshold
+        self.capacity = capacity
+        self.dim = dim
+        self.embed_fn = embed_fn or (lambda texts: hashed_embedding(texts, dim))
+        self.path = path
+        self._segments = {}
+        self._pending = {}  # invocation_id -> (scope, query) awaiting the final answer
+        self._lock = threading.Lock()
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.subject_rejects = 0
+        if path and os.path.exists(path + ".npy"):
+            self.load(path)
+
+    @staticmethod
+    def scope(agent_name, instruction):
+        return f"{agent_name}:{hashlib.sha256(str(instruction).encode('utf-8')).hexdigest()[:16]}"
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    # --- Core API ---
+
+    def lookup(self, scope, query):
+        """Returns (answer, similarity) for the best same-subject match above the threshold, else None."""
+        vector = self.embed_fn([query])[0]
+        terms = key_terms(query)
+        with self._lock:
+            segment = self._segments.get(scope)
+            if segment is None or not len(segment):
+                self.misses += 1
+                return None
+            scores = segment.vectors[:len(segment)] @ vector
+            candidates = np.flatnonzero(scores >= self.threshold)
+            for best in candidates[np.argsort(-scores[candidates])]:
+                if same_subject(segment.terms[best], terms):
+                    segment.last_used[best] = self._tick()
+                    self.hits += 1
+                    return segment.answers[best], float(scores[best])
+            self.misses += 1
+            if len(candidates):
+                self.subject_rejects += 1
+            return None
+
+    def add(self, scope, query, answer):
+        self.add_vectors(scope, self.embed_fn([query]), [query], [answer])
+
+    def add_vectors(self, scope, vectors, queries, answers):
+        """Bulk insert of pre-normalized embeddings (used by the loader and the benchmark)."""
+        with self._lock:
+            segment = self._segments.setdefault(scope, _Segment(self.dim, self.capacity))
+            for vector, query, answer in zip(vectors, queries, answers):
+                row, evicted = segment.slot(self.capacity)
+                self.evictions += evicted
+                segment.vectors[row] = vector
+                segment.last_used[row] = self._tick()
+                segment.queries[row] = query
+                segment.answers[row] = answer
+                segment.terms[row] = key_terms(query)
+
+    # --- Persistence: one .npy matrix for every scope + JSON sidecar for the rest ---
+
+    def save(self, path=None):
+        path = path or self.path
+        with self._lock:
+            scopes = list(self._segments.items())
+            matrix = (np.concatenate([s.vectors[:len(s)] for _, s in scopes])
+                      if scopes else np.zeros((0, self.dim), dtype=np.float32))
+            sidecar = {
+                "dim": self.dim,
+                "scopes": [
+                    {"scope": name, "rows": len(s), "queries": s.queries, "answers": s.answers,
+                     "last_used": s.last_used[:len(s)].tolist()}
+                    for name, s in scopes
+                ],
+            }
+        np.save(path + ".npy", matrix)
+        with open(path + ".json", "w", encoding="utf-8") as handle:
+            json.dump(sidecar, handle)
+
+    def load(self, path):
+        with open(path + ".json", encoding="utf-8") as handle:
+            sidecar = json.load(handle)
+        if sidecar["dim"] != self.dim:
+            raise ValueError(f"Semantic cache at {path} has dim {sidecar['dim']}, expected {self.dim}.")
+        matrix = np.load(path + ".npy")
+        offset = 0
+        for entry in sidecar["scopes"]:
+            rows = entry["rows"]
+            self.add_vectors(entry["scope"], matrix[offset:offset + rows], entry["queries"], entry["answers"])
+            segment = self._segments[entry["scope"]]
+            if rows <= self.capacity:
+                segment.last_used[:rows] = entry["last_used"]
+            offset += rows
+        self._clock = max([self._clock] + [int(s.last_used[:len(s)].max()) for s in self._segments.values() if len(s)])
+
+    # --- ADK integration: before/after model callbacks ---
+
+    def before_model(self, callback_context, llm_request):
+        """Answers the opening model call of a turn from cache when a similar query was seen."""
+        from google.adk.models.llm_response import LlmResponse
+        from google.genai import types
+
+        last = llm_request.contents[-1] if llm_request.contents else None
+        if last is None or last.role != "user" or any(p.function_response for p in last.parts or ()):
+            return None  # Mid-turn call (e.g. after a tool result): not a cacheable question.
+        user_content = callback_context.user_content
+        query = "".join(p.text or "" for p in (user_content.parts if user_content else ()))
+        if not query.strip():
+            return None
+        system = llm_request.config.system_instruction if llm_request.config else ""
+        scope = self.scope(callback_context.agent_name, system)
+        match = self.lookup(scope, query)
+        if match is None:
+            self._pending[callback_context.invocation_id] = (scope, query)
+            if len(self._pending) > 1024:
+                self._pending.pop(next(iter(self._pending)))
+            return None
+        answer, similarity = match
+        return LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=answer)]),
+            custom_metadata={"semantic_cache": {"similarity": round(similarity, 4)}},
+        )
+
+    def after_model(self, callback_context, llm_response):
+        """Stores the final text answer for the query registered by before_model."""
+        content = llm_response.content
+        if llm_response.partial or content is None or not content.parts:
+            return None
+        if any(p.function_call for p in content.parts):
+            return None  # A tool round-trip; the final answer comes on a later call.
+        pending = self._pending.pop(callback_context.invocation_id, None)
+        answer = "".join(p.text or "" for p in content.parts).strip()
+        if pending is not None and answer:
+            self.add(pending[0], pending[1], answer)
+        return None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        entries = sum(len(s) for s in self._segments.values())
+        return {
+            "entries": entries,
+            "scopes": len(self._segments),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "subject_rejects": self.subject_rejects,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "threshold": self.threshold,
+        }
+
+
+# --- BENCHMARK: top-1 lookup latency as the cache grows ---
+
+def _benchmark(sizes=(10_000, 100_000, 1_000_000), lookups=50, dim=256):
+    import time
+
+    phrasings = [
+        ("Assess the 2026 Sovereign Cloud compliance risks for our North Atlantic data clusters.",
+         "What are the sovereign cloud compliance risks for our North Atlantic data clusters in 2026?"),
+        ("What is the primary technical differentiator in the Banking sector for 2026 AI roadmaps?",
+         "In 2026 AI roadmaps, what's the main technical differentiator for the banking sector?"),
+        ("Assess the 2026 Sovereign Cloud compliance risks for our North Atlantic data clusters.",
+         "Draft a 5-year roadmap for migrating our legacy ERP."),
+    ]
+    # Lexically close, but about a different sector / region / year / polarity: must never be served.
+    negatives = [
+        ("What is the primary technical differentiator in the banking sector for 2026 AI roadmaps?",
+         "What is the primary technical differentiator in the healthcare sector for 2026 AI roadmaps?"),
+        ("What are the risks of migrating to the cloud?",
+         "What are the risks of not migrating to the cloud?"),
+        ("What are the risks of migrating to the cloud?",
+         "What are the risks of migrating without the cloud?"),
+        ("What is the primary technical differentiator in the Banking sector for 2026 AI roadmaps?",
+         "What is the primary technical differentiator in the Healthcare sector for 2026 AI roadmaps?"),
+        ("Assess the 2026 Sovereign Cloud compliance risks for our North Atlantic data clusters.",
+         "Assess the 2026 Sovereign Cloud compliance risks for our South Pacific data clusters."),
+        ("What is the primary technical differentiator in the Banking sector for 2026 AI roadmaps?",
+         "What is the primary technical differentiator in the Banking sector for 2027 AI roadmaps?"),
+    ]
+    print("--- [BENCHMARK] hashed-embedding similarity and cache decision (threshold 0.88) ---")
+    for expected, pairs in (("hit", phrasings[:2]), ("miss", phrasings[2:] + negatives)):
+        for a, b in pairs:
+            cache = SemanticCache(dim=dim)
+            cache.add("bench", a, "cached answer")
+            va, vb = hashed_embedding([a, b], dim)
+            served = cache.lookup("bench", b) is not None
+            assert served == (expected == "hit"), (a, b)
+            shared = len(os.path.commonprefix([a, b]))
+            print(f"{float(va @ vb):.3f}  {'HIT ' if served else 'miss'}  {a[shared:][:40]!r} vs {b[shared:][:40]!r}")
+
+    rng = np.random.default_rng(7)
+    query = "Assess the 2026 Sovereign Cloud compliance risks for our North Atlantic data clusters."
+    print(f"\n--- [BENCHMARK] cosine top-1 lookup, dim={dim}, {lookups} lookups per size ---")
+    for size in sizes:
+        cache = SemanticCache(capacity=size, dim=dim)
+        for start in range(0, size, 100_000):
+            n = min(100_000, size - start)
+            block = rng.standard_normal((n, dim), dtype=np.float32)
+            block /= np.linalg.norm(block, axis=1, keepdims=True)
+            cache.add_vectors("FinOps_Analyst:bench", block, [""] * n, [""] * n)
+        cache.add("FinOps_Analyst:bench", query, "cached answer")
+        timings = []
+        for _ in range(lookups):
+            started = time.perf_counter()
+            cache.lookup("FinOps_Analyst:bench", query)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        print(f"{size:>9,} entries: p50 {timings[len(timings) // 2] * 1000:8.2f} ms | "
+              f"p99 {timings[int(len(timings) * 0.99) - 1] * 1000:8.2f} ms | "
+              f"index {cache._segments['FinOps_Analyst:bench'].vectors.nbytes / 2**20:7.1f} MiB")
+        del cache
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,269 @@
+"""
+FILE: config/session_ledger.py
+DESCRIPTION: Typed session ledger: declared budgets, deadlines and splits live in ADK state.
+ARCHITECT'S NOTE: "Maintain an internal ledger" should not mean re-tokenizing the whole
+chat every turn. Declared variables are pulled out of each user turn, stored as typed
+values under `ledger:<name>` session-state keys (O(1) lookup, durable with the SQLite
+backend) and rendered into a compact ledger block on every prompt. Because declared
+values no longer depend on the transcript, the context compactor that runs after it
+can fold old turns away without losing a budget. For the same reason the ledger only
+replays the last few turns of prose (`keep_turns`); callers that want the whole
+transcript opt in with keep_turns=0. Placed after a ContextCompactor, the ledger keeps
+the compactor's summary header, and the compactor still sees (and folds) full history.
+
+DEMO: python -m config.session_ledger   (lesson 04's turns against a capturing model, prompt sizes)
+"""
+import re
+
+LEDGER_PREFIX = "ledger:"
+TURN_KEY = "ledger_turn"
+INVOCATION_KEY = "ledger_invocation"
+
+_SCALE = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "million": 1e6, "b": 1e9, "bn": 1e9, "billion": 1e9}
+_MONEY = re.compile(r"\$\s?(\d[\d,]*(?:\.\d+)?)\s*(thousand|million|billion|mm|bn|[kmb])?\b", re.I)
+_MONTHS = "January|February|March|April|May|June|July|August|September|October|November|December"
+_DEADLINE = re.compile(
+    r"\b(?:by|before|no later than|deadline(?: of| is)?)\s+"
+    rf"(Q[1-4]\s+\d{{4}}|\d{{4}}-\d{{2}}-\d{{2}}|(?:{_MONTHS})\s+\d{{4}}|(?:FY)?\d{{4}})\b",
+    re.I,
+)
+_SPLIT = re.compile(r"\b(\d{1,3}(?:\s*/\s*\d{1,3}){1,7})\s*(?:%\s*)?split\b", re.I)
+# The noun phrase that names a value: "2026 AI Innovation Budget at $4.5M" -> 2026_ai_innovation_budget.
+_KEYWORD = re.compile(
+    r"\b(?:budget|cap|cost|spend|reserve|allocation|target|ceiling|limit|fund|funding|investment|"
+    r"deadline|go-live|launch|cutover|milestone)\b",
+    re.I,
+)
+_CLAUSE_BREAK = re.compile(r"[.;:,!?$]|\band\b", re.I)
+_STOPWORDS = {"the", "a", "an", "our", "this", "that", "establish", "set", "at", "of", "is", "to", "and"}
+
+
+def _slug(phrase, fallback):
+    words = [w for w in re.findall(r"[a-z0-9]+", phrase.lower()) if w not in _STOPWORDS]
+    return "_".join(words) or fallback
+
+
+def _label(text, start, fallback):
+    """Up to four words ending at the last naming keyword of the clause before `start`."""
+    clause = _CLAUSE_BREAK.split(text[max(0, start - 80):start])[-1]
+    keywords = list(_KEYWORD.finditer(clause))
+    if not keywords:
+        return fallback
+    return _slug(" ".join(clause[:keywords[-1].end()].split()[-4:]), fallback)
+
+
+def extract_facts(text):
+    """Returns {name: fact} for money amounts, deadlines and percentage splits declared in text."""
+    facts = {}
+    for i, m in enumerate(_MONEY.finditer(text)):
+        value = float(m.group(1).replace(",", "")) * _SCALE.get((m.group(2) or "").lower(), 1.0)
+        name = _label(text, m.start(), f"amount_{i + 1}")
+        facts[name] = {"type": "money", "value": value, "unit": "USD", "text": m.group(0).strip()}
+    for m in _DEADLINE.finditer(text):
+        facts[_label(text, m.start(), "deadline")] = {
+            "type": "deadline", "value": m.group(1).upper() if m.group(1)[0] in "qQfF" else m.group(1),
+            "text": m.group(0).strip(),
+        }
+    for m in _SPLIT.finditer(text):
+        shares = [int(s) for s in re.split(r"\s*/\s*", m.group(1))]
+        if sum(shares) == 100:
+            facts["split"] = {"type": "split", "value": shares, "unit": "%", "text": m.group(0).strip()}
+    return facts
+
+
+def _format(fact):
+    if fact["type"] == "money":
+        return f"${fact['value']:,.0f}"
+    if fact["type"] == "split":
+        return "/".join(str(s) for s in fact["value"]) + " %"
+    return str(fact["value"])
+
+
+class SessionLedger:
+    """Typed facts over a state mapping (session.state or callback_context.state)."""
+
+    def __init__(self, state):
+        self.state = state
+
+    def get(self, name):
+        return self.state.get(LEDGER_PREFIX + name)
+
+    def set(self, name, fact):
+        self.state[LEDGER_PREFIX + name] = fact
+
+    def facts(self):
+        items = self.state.to_dict().items() if hasattr(self.state, "to_dict") else self.state.items()
+        return {k[len(LEDGER_PREFIX):]: v for k, v in items if k.startswith(LEDGER_PREFIX)}
+
+    def record(self, text, turn):
+        extracted = extract_facts(text)
+        for name, fact in extracted.items():
+            self.set(name, dict(fact, turn=turn))
+        return extracted
+
+    def budget(self):
+        """Most recently declared money fact whose name marks it as a budget (or any money fact)."""
+        money = [(n, f) for n, f in self.facts().items() if f["type"] == "money"]
+        budgets = [(n, f) for n, f in money if "budget" in n] or money
+        return max(budgets, key=lambda nf: nf[1].get("turn", 0)) if budgets else None
+
+    def render(self, max_facts=50):
+        facts = sorted(self.facts().items(), key=lambda nf: nf[1].get("turn", 0))[-max_facts:]
+        if not facts:
+            return ""
+        lines = [f"- {name} = {_format(fact)} ({fact['type']}, turn {fact.get('turn', '?')})" for name, fact in facts]
+        split, budget = self.get("split"), self.budget()
+        if split and budget:
+            # Deterministic arithmetic belongs in the ledger, not in the model's head.
+            name, fact = budget
+            parts = " / ".join(f"{s}% = ${fact['value'] * s / 100:,.0f}" for s in split["value"])
+            lines.append(f"- derived: split of {name} -> {parts}")
+        return "[SESSION LEDGER: authoritative values declared earlier in this session]\n" + "\n".join(lines)
+
+
+class LedgerCallback:
+    """before_model_callback: records declared facts and injects the ledger block.
+
+    Once the ledger holds facts, the history is cut to the last `keep_turns` turns (0 or
+    None keeps it all). Run it after a ContextCompactor: the compactor's summary header
+    survives the cut, and the compactor folds turns before the ledger drops them.
+    """
+
+    def __init__(self, keep_turns=3, max_facts=50):
+        self.keep_turns = keep_turns
+        self.max_facts = max_facts
+        self.facts_recorded = 0
+
+    def __call__(self, callback_context, llm_request):
+        from config.context_compaction import SUMMARY_HEADER, split_turns
+
+        state = callback_context.state
+        ledger = SessionLedger(state)
+        if state.get(INVOCATION_KEY) != callback_context.invocation_id:
+            turn = state.get(TURN_KEY, 0) + 1
+            state[TURN_KEY] = turn
+            state[INVOCATION_KEY] = callback_context.invocation_id
+            user_content = callback_context.user_content
+            text = " ".join(p.text or "" for p in (user_content.parts if user_content else ()))
+            self.facts_recorded += len(ledger.record(text, turn))
+
+        block = ledger.render(self.max_facts)
+        if block:
+            llm_request.append_instructions([block])
+            if self.keep_turns:
+                contents = llm_request.contents
+                opening = contents[0].parts[0].text if contents and contents[0].parts else None
+                header = contents[:1] if (opening or "").startswith(SUMMARY_HEADER) else []
+                turns = split_turns(contents[len(header):])
+                llm_request.contents = header + [c for t in turns[-self.keep_turns:] for c in t]
+        return None
+
+
+# --- DEMO: lesson 04's two turns; turn 2 must resolve the budget from the ledger alone ---
+
+async def _demo(facts_at_scale=500):
+    import time
+
+    from google.adk.agents import Agent
+
+    from config.context_compaction import SUMMARY_KEY, ContextCompactor
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    captured = []
+    compactor = ContextCompactor(max_tokens=40, keep_last=1)
+    ledger = LedgerCallback()
+
+    class CapturingLlm(BaseLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            captured.append(llm_request)
+            yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="Acknowledged.")]))
+
+    agent = Agent(
+        name="Cognitive_Strategy_Partner",
+        instruction="You are a Senior Strategy Partner.",
+        model=CapturingLlm(model="capture"),
+        before_model_callback=[compactor, ledger],
+    )
+    service = InMemorySessionService()
+    runner = Runner(agent=agent, app_name="ledger_demo", session_service=service)
+    await service.create_session(app_name="ledger_demo", user_id="u", session_id="s")
+    turns = [
+        "Establish the 2026 AI Innovation Budget at $4.5 Million. Acknowledge and store this constraint.",
+        "Based on that specific budget, propose a 40/30/30 split across three high-impact Pilot Projects. "
+        "Detail the ROI for each.",
+    ]
+    for text in turns:
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        async for _ in runner.run_async(user_id="u", session_id="s", new_message=message):
+            pass
+
+    session = await service.get_session(app_name="ledger_demo", user_id="u", session_id="s")
+    turn_2 = captured[-1]
+    system = str(turn_2.config.system_instruction)
+    history = " ".join(p.text or "" for c in turn_2.contents for p in c.parts or ())
+    print("--- [DEMO] Ledger state after 2 turns ---")
+    for name, fact in SessionLedger(session.state).facts().items():
+        print(f"  {name}: {fact}")
+    print("--- [DEMO] Ledger block injected into turn 2 ---")
+    print(system[system.index("[SESSION LEDGER"):])
+    assert "$4,500,000" in system and "$1,800,000" in system, "turn 2 did not resolve the budget"
+    assert compactor.compactions == 1 and "model: Acknowledged." in session.state[SUMMARY_KEY], \
+        "the compactor behind the ledger should fold turn 1, model answer included"
+    assert "[CONTEXT SUMMARY of 1 earlier turns]" in history
+    print("PASS: turn 2 resolves the $4.5M budget from the ledger; the compactor folded turn 1 "
+          "(question and answer) into its summary.")
+
+    # Prompt size over a longer workshop: full replayed history vs the ledger's default window.
+    from config.context_compaction import _scripted_turns, estimate_tokens
+
+    def prompt_tokens(request):
+        text = str(request.config.system_instruction) + " ".join(
+            p.text or "" for c in request.contents for p in c.parts or ())
+        return estimate_tokens(text)
+
+    sizes = {}
+    for label, callback in (("full history (keep_turns=0)", LedgerCallback(keep_turns=0)),
+                            (f"ledger window (keep_turns={ledger.keep_turns})", LedgerCallback())):
+        captured.clear()
+        agent = Agent(name="Cognitive_Strategy_Partner", instruction="You are a Senior Strategy Partner.",
+                      model=CapturingLlm(model="capture"), before_model_callback=callback)
+        runner = Runner(agent=agent, app_name="ledger_demo", session_service=service)
+        await service.create_session(app_name="ledger_demo", user_id="u", session_id=label)
+        for text in _scripted_turns(12):
+            message = types.Content(role="user", parts=[types.Part(text=text)])
+            async for _ in runner.run_async(user_id="u", session_id=label, new_message=message):
+                pass
+        sizes[label] = [prompt_tokens(r) for r in captured]
+        assert "$4,500,000" in str(captured[-1].config.system_instruction), label
+    print("--- [DEMO] Prompt tokens per turn over a 12-turn workshop ---")
+    for label, tokens in sizes.items():
+        print(f"  {label:<30} turn 1: {tokens[0]:>4} | turn 6: {tokens[5]:>4} | turn 12: {tokens[-1]:>4} "
+              f"| total {sum(tokens):>5}")
+    full, windowed = sizes.values()
+    assert windowed[-1] < full[-1] / 2, "the ledger window should cut the prompt"
+    print(f"PASS: turn 12 prompt {full[-1]} -> {windowed[-1]} tokens "
+          f"({1 - windowed[-1] / full[-1]:.0%} smaller), budget still resolved from the ledger.")
+
+    # Scale: hundreds of facts, O(1) access by name.
+    state = {}
+    ledger = SessionLedger(state)
+    for i in range(facts_at_scale):
+        ledger.set(f"project_{i}_budget", {"type": "money", "value": 1e5 + i, "unit": "USD", "turn": i})
+    start = time.perf_counter()
+    for i in range(10_000):
+        ledger.get(f"project_{i % facts_at_scale}_budget")
+    lookup_us = (time.perf_counter() - start) / 10_000 * 1e6
+    start = time.perf_counter()
+    block = ledger.render()
+    render_us = (time.perf_counter() - start) * 1e6
+    print(f"{facts_at_scale} facts: lookup {lookup_us:.2f} us | render (last 50) {render_us:.0f} us, {len(block)} chars")
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    asyncio.run(_demo())
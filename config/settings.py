@@ -1,61 +1,354 @@
 """
 FILE: config/settings.py
 DESCRIPTION: Centralized configuration and service provider for the Strategy Suite.
+ARCHITECT'S NOTE: Importing this module is deliberately cheap. litellm, the ADK model /
+session / runner stack and dotenv are only imported the first time a provider needs
+them. Audit with: python -m config.startup_report
 """
 import os
+import sys
 import uuid
 import logging
 import warnings
-import litellm  # Added for explicit cleanup
 
 # Silence the Pydantic noise
 os.environ["PYDANTIC_SKIP_VALIDATION"] = "1"
 warnings.filterwarnings("ignore", category=UserWarning, module="pydantic")
 
-from google.adk.models.lite_llm import LiteLlm 
-from google.adk.sessions import InMemorySessionService
-from google.adk.runners import Runner
+APP_NAME = "CIO_Strategy_Accelerator_2026"
 
-from dotenv import load_dotenv
-load_dotenv()
+# Public name -> (environment variable, default, converter). Resolved on first access.
+_ENV_SETTINGS = {
+    # A comma-separated list enables least-outstanding-requests load balancing.
+    "OLLAMA_BASE_URL": ("OLLAMA_API_BASE", "http://localhost:11434", str),
+    "MODEL_ID": ("MODEL_NAME", "ollama_chat/llama3.2:latest", str),
+    "OLLAMA_POOL_SIZE": ("OLLAMA_POOL_SIZE", "10", int),
+    # 'memory' (default) or 'sqlite' for durable sessions shared across worker processes.
+    "SESSION_BACKEND": ("SESSION_BACKEND", "memory", str.lower),
+    "SESSION_DB_PATH": ("SESSION_DB_PATH", "strategy_sessions.db", str),
+    "AGENT_CACHE_SIZE": ("AGENT_CACHE_SIZE", "64", int),
+    # Exact-match response cache for agents built with cache_responses=True.
+    "RESPONSE_CACHE_SIZE": ("RESPONSE_CACHE_SIZE", "512", int),
+    "RESPONSE_CACHE_PATH": ("RESPONSE_CACHE_PATH", "strategy_response_cache.db", str),
+    # Semantic (paraphrase-tolerant) cache of final answers; the path is a .npy/.json prefix.
+    "SEMANTIC_CACHE_THRESHOLD": ("SEMANTIC_CACHE_THRESHOLD", "0.88", float),
+    "SEMANTIC_CACHE_SIZE": ("SEMANTIC_CACHE_SIZE", "10000", int),
+    "SEMANTIC_CACHE_PATH": ("SEMANTIC_CACHE_PATH", "strategy_semantic_cache", str),
+    # Rolling compaction: fold older turns into a summary past this many prompt tokens.
+    "CONTEXT_MAX_TOKENS": ("CONTEXT_MAX_TOKENS", "2000", int),
+    "CONTEXT_KEEP_TURNS": ("CONTEXT_KEEP_TURNS", "4", int),
+    # Verbatim turns the session ledger replays once it holds facts; 0 keeps the full history.
+    "LEDGER_KEEP_TURNS": ("LEDGER_KEEP_TURNS", "3", int),
+    # Optional JSON file of extra guardrail rules ({name: {policy, alternative, patterns}}).
+    "GUARDRAIL_RULES_PATH": ("GUARDRAIL_RULES_PATH", "", str),
+    # Comma-separated names masked in agent output alongside emails, phones and account IDs.
+    "REDACT_NAMES": ("REDACT_NAMES", "", str),
+    # Per-call tool deadline (seconds) and thread-pool size for blocking tools.
+    "TOOL_TIMEOUT_S": ("TOOL_TIMEOUT_S", "30", float),
+    "TOOL_WORKERS": ("TOOL_WORKERS", "8", int),
+    # Results kept for tools marked @deterministic_tool (shared across sessions).
+    "TOOL_MEMO_SIZE": ("TOOL_MEMO_SIZE", "1024", int),
+    # Default TTL (seconds) and per-tool capacity for cached I/O tools; stale entries are
+    # served for another TTL while one background refresh runs.
+    "IO_CACHE_TTL_S": ("IO_CACHE_TTL_S", "300", float),
+    "IO_CACHE_SIZE": ("IO_CACHE_SIZE", "256", int),
+    # Strategy Knowledge Base: 'sqlite' (default, FTS5-indexed file) or 'memory'.
+    "SKB_BACKEND": ("SKB_BACKEND", "sqlite", str.lower),
+    "SKB_DB_PATH": ("SKB_DB_PATH", "strategy_skb.db", str),
+    # IAM decision audit trail (JSONL, appended in batches) and decision-cache bound.
+    "IAM_AUDIT_PATH": ("IAM_AUDIT_PATH", "strategy_iam_audit.jsonl", str),
+    "IAM_DECISION_CACHE_SIZE": ("IAM_DECISION_CACHE_SIZE", "1000000", int),
+    # Stages of a multi-agent workflow allowed to generate at the same time.
+    "WORKFLOW_MAX_CONCURRENCY": ("WORKFLOW_MAX_CONCURRENCY", "4", int),
+}
 
-APP_NAME = "CIO_Strategy_Accelerator_2026"
-OLLAMA_BASE_URL = os.getenv("OLLAMA_API_BASE", "http://localhost:11434")
-MODEL_ID = os.getenv("MODEL_NAME", "ollama_chat/llama3.2:latest")
+_ENV_LOADED = False
+_SESSION_SERVICE = None
+_MODEL_REGISTRY = None
+_AGENT_REGISTRY = None
+_SEMANTIC_CACHE = None
+_STRUCTURED_OUTPUTS = {}
+_CONTEXT_COMPACTOR = None
+_LEDGER_CALLBACK = None
+_POLICY_GUARDRAIL = None
+_REDACTION_POLICY = None
+_TOOL_RUNTIME = None
+_TOOL_MEMO = None
+_IO_CACHES = {}
+_SKB_STORE = None
+_POLICY_ENGINE = None
+
+def _setting(name):
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _ENV_LOADED = True
+    env_var, default, convert = _ENV_SETTINGS[name]
+    return convert(os.getenv(env_var, default))
+
+def __getattr__(name):
+    # PEP 562: keeps `settings.MODEL_ID` style access working without eager dotenv.
+    if name in _ENV_SETTINGS:
+        return _setting(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _session_service():
+    global _SESSION_SERVICE
+    if _SESSION_SERVICE is None:
+        if _setting("SESSION_BACKEND") == "sqlite":
+            from config.sqlite_sessions import SqliteSessionService
+            _SESSION_SERVICE = SqliteSessionService(_setting("SESSION_DB_PATH"))
+        else:
+            from google.adk.sessions import InMemorySessionService
+            _SESSION_SERVICE = InMemorySessionService()
+    return _SESSION_SERVICE
 
-_SESSION_SERVICE = InMemorySessionService()
+def _model_registry():
+    global _MODEL_REGISTRY
+    if _MODEL_REGISTRY is None:
+        from config.model_pool import PooledHttpSession, ModelClientRegistry
+        _MODEL_REGISTRY = ModelClientRegistry(
+            PooledHttpSession(pool_size=_setting("OLLAMA_POOL_SIZE")),
+            response_cache_factory=_response_cache,
+        )
+    return _MODEL_REGISTRY
 
-def get_model():
-    return LiteLlm(model=MODEL_ID, api_base=OLLAMA_BASE_URL)
+def _response_cache():
+    from config.response_cache import ResponseCache
+    return ResponseCache(max_entries=_setting("RESPONSE_CACHE_SIZE"), disk_path=_setting("RESPONSE_CACHE_PATH") or None)
 
-def get_model_json():
-    return LiteLlm(
-        model=MODEL_ID, 
-        api_base=OLLAMA_BASE_URL,
+def _agent_registry():
+    global _AGENT_REGISTRY
+    if _AGENT_REGISTRY is None:
+        from config.agent_registry import AgentRegistry
+        _AGENT_REGISTRY = AgentRegistry(maxsize=_setting("AGENT_CACHE_SIZE"))
+    return _AGENT_REGISTRY
+
+def _api_base(endpoints=None):
+    """One URL, or a tuple of URLs for the balanced client."""
+    if endpoints is None:
+        endpoints = [u.strip() for u in _setting("OLLAMA_BASE_URL").split(",") if u.strip()]
+    elif isinstance(endpoints, str):
+        endpoints = [endpoints]
+    return endpoints[0] if len(endpoints) == 1 else tuple(endpoints)
+
+def get_model(endpoints=None, cache_responses=False):
+    return _model_registry().get(_setting("MODEL_ID"), _api_base(endpoints), cache_responses=cache_responses)
+
+def get_model_json(endpoints=None, cache_responses=False):
+    return _model_registry().get(
+        _setting("MODEL_ID"),
+        _api_base(endpoints),
         # This sends the 'format: json' flag specifically to Ollama
         config={
             "response_format": {"type": "json_object"},
             "temperature": 0  # Highly recommended for JSON to prevent syntax errors
-        }
+        },
+        cache_responses=cache_responses,
     )
 
-def get_model_tool():
-    return LiteLlm(model=MODEL_ID, api_base=OLLAMA_BASE_URL)
+def get_model_tool(endpoints=None, cache_responses=False):
+    return _model_registry().get(_setting("MODEL_ID"), _api_base(endpoints), cache_responses=cache_responses)
+
+def get_model_pool_stats():
+    """Registry hit/miss plus keep-alive connection reuse counters."""
+    return _model_registry().stats()
+
+def get_endpoint_metrics():
+    """Per-endpoint in-flight, latency and error counters for balanced models."""
+    return _model_registry().endpoint_metrics()
+
+def get_response_cache_stats():
+    """Hit rate, coalesced calls, memory / disk bytes and latency saved."""
+    return _model_registry().response_cache_stats()
+
+def get_semantic_cache():
+    """Shared SemanticCache; wire it with before_model_callback / after_model_callback."""
+    global _SEMANTIC_CACHE
+    if _SEMANTIC_CACHE is None:
+        from config.semantic_cache import SemanticCache
+        _SEMANTIC_CACHE = SemanticCache(
+            threshold=_setting("SEMANTIC_CACHE_THRESHOLD"),
+            capacity=_setting("SEMANTIC_CACHE_SIZE"),
+            path=_setting("SEMANTIC_CACHE_PATH") or None,
+        )
+    return _SEMANTIC_CACHE
+
+
+def get_context_compactor():
+    """Shared before_model_callback that keeps long sessions under CONTEXT_MAX_TOKENS."""
+    global _CONTEXT_COMPACTOR
+    if _CONTEXT_COMPACTOR is None:
+        from config.context_compaction import ContextCompactor
+        _CONTEXT_COMPACTOR = ContextCompactor(
+            max_tokens=_setting("CONTEXT_MAX_TOKENS"), keep_last=_setting("CONTEXT_KEEP_TURNS")
+        )
+    return _CONTEXT_COMPACTOR
+
+def get_session_ledger():
+    """Shared before_model_callback that stores declared facts as typed `ledger:` session state."""
+    global _LEDGER_CALLBACK
+    if _LEDGER_CALLBACK is None:
+        from config.session_ledger import LedgerCallback
+        _LEDGER_CALLBACK = LedgerCallback(keep_turns=_setting("LEDGER_KEEP_TURNS"))
+    return _LEDGER_CALLBACK
+
+def get_policy_guardrail():
+    """Shared compiled policy prefilter; wire `.before_model` as a before_model_callback."""
+    global _POLICY_GUARDRAIL
+    if _POLICY_GUARDRAIL is None:
+        from config.guardrails import PolicyGuardrail
+        rules_path = _setting("GUARDRAIL_RULES_PATH")
+        _POLICY_GUARDRAIL = PolicyGuardrail.from_json(rules_path) if rules_path else PolicyGuardrail()
+    return _POLICY_GUARDRAIL
+
+def get_redaction_policy():
+    """Compiled output-redaction patterns shared by every stream (counters included)."""
+    global _REDACTION_POLICY
+    if _REDACTION_POLICY is None:
+        from config.redaction import RedactionPolicy
+        _REDACTION_POLICY = RedactionPolicy(names=_setting("REDACT_NAMES").split(","))
+    return _REDACTION_POLICY
+
+def redact_stream(events):
+    """Wraps runner.run_async(...) so PII is masked in flight with a bounded lookahead."""
+    from config.redaction import redact_events
+    return redact_events(events, get_redaction_policy())
 
+def get_tool_runtime():
+    """Shared concurrent tool executor: `execute()` for hand-written loops, `wrap_all()` for agents."""
+    global _TOOL_RUNTIME
+    if _TOOL_RUNTIME is None:
+        from config.tool_runtime import ToolRuntime
+        _TOOL_RUNTIME = ToolRuntime(default_timeout=_setting("TOOL_TIMEOUT_S"), max_workers=_setting("TOOL_WORKERS"))
+    return _TOOL_RUNTIME
+
+def get_tool_memo():
+    """Shared LRU of deterministic tool results (thread-safe, bounded by TOOL_MEMO_SIZE)."""
+    global _TOOL_MEMO
+    if _TOOL_MEMO is None:
+        from config.tool_memo import ToolMemo
+        _TOOL_MEMO = ToolMemo(capacity=_setting("TOOL_MEMO_SIZE"))
+    return _TOOL_MEMO
+
+def deterministic_tool(func):
+    """Decorator for pure tools: repeated calls with equivalent arguments skip execution."""
+    return get_tool_memo().wrap(func)
+
+def get_tool_memo_stats():
+    return get_tool_memo().stats()
+
+def cached_io_tool(ttl=None, stale_ttl=None, key=None):
+    """Decorator for async I/O tools: per-tool TTL cache, stale-while-revalidate, coalesced fetches."""
+    def decorate(func):
+        from config.ttl_cache import AsyncTTLCache
+        cache = AsyncTTLCache(ttl=ttl or _setting("IO_CACHE_TTL_S"), stale_ttl=stale_ttl,
+                              capacity=_setting("IO_CACHE_SIZE"))
+        _IO_CACHES[func.__name__] = cache
+        return cache.wrap(func, key)
+    return decorate
+
+def get_io_cache_stats():
+    return {name: cache.stats() for name, cache in _IO_CACHES.items()}
+
+def get_skb_store():
+    """Strategy Knowledge Base backend: get/get_many/prefix/search plus CSV/JSONL bulk loaders."""
+    global _SKB_STORE
+    if _SKB_STORE is None:
+        if _setting("SKB_BACKEND") == "sqlite":
+            from config.skb_store import SqliteSKB
+            _SKB_STORE = SqliteSKB(_setting("SKB_DB_PATH"))
+        else:
+            from config.skb_store import DictSKB
+            _SKB_STORE = DictSKB()
+    return _SKB_STORE
+
+def get_policy_engine():
+    """Shared compiled IAM engine; call `.load(registry, roles)` to (re)compile the policy."""
+    global _POLICY_ENGINE
+    if _POLICY_ENGINE is None:
+        from config.iam_policy import AuditAppender, PolicyEngine
+        _POLICY_ENGINE = PolicyEngine(audit=AuditAppender(_setting("IAM_AUDIT_PATH")),
+                                      cache_size=_setting("IAM_DECISION_CACHE_SIZE"))
+    import asyncio
+    try:
+        asyncio.get_running_loop()
+        _POLICY_ENGINE.audit.start()
+    except RuntimeError:
+        pass  # Called off the loop (tool thread): records buffer until the next flush.
+    return _POLICY_ENGINE
+
+def get_workflow():
+    """New DAG workflow capped at WORKFLOW_MAX_CONCURRENCY; add stages with config.workflow.agent_stage."""
+    from config.workflow import Workflow
+    return Workflow(max_concurrency=_setting("WORKFLOW_MAX_CONCURRENCY"))
+
+def get_session_scope(user_id, session_id):
+    """Per-agent sub-sessions under `session_id`; stage outputs land in its state as hand-offs."""
+    from config.scoped_sessions import SessionScope
+    return SessionScope(_session_service(), APP_NAME, user_id, session_id)
+
+def get_structured_output(agent_name, schema, max_reprompts=1):
+    """Per-agent compiled validator with local repair and bounded re-prompts (JSON-mode agents)."""
+    guard = _STRUCTURED_OUTPUTS.get(agent_name)
+    if guard is None or guard.schema is not schema:
+        from config.structured_output import StructuredOutput
+        guard = _STRUCTURED_OUTPUTS[agent_name] = StructuredOutput(agent_name, schema, max_reprompts)
+    return guard
+
+def get_structured_output_stats():
+    """First-pass validity, local-repair saves and re-prompt counts per agent."""
+    return {name: guard.stats() for name, guard in _STRUCTURED_OUTPUTS.items()}
+
+
+def get_agent(name, instruction, model=None, tools=None, **agent_kwargs):
+    """Returns a shared Agent for identical (name, instruction, tools, model config)."""
+    return _agent_registry().get_agent(name, instruction, model or get_model(), tools, **agent_kwargs)
+
+def _build_runner(agent):
+    from google.adk.runners import Runner
+    return Runner(agent=agent, app_name=APP_NAME, session_service=_session_service())
 
 def get_runner(agent):
-    return Runner(agent=agent, app_name=APP_NAME, session_service=_SESSION_SERVICE)
+    return _agent_registry().get_runner(agent, _build_runner)
+
+def get_agent_registry_stats():
+    return _agent_registry().stats()
 
 
 async def initialize_session(user_id="strategy_pro"):
     session_id = str(uuid.uuid4())
-    await _SESSION_SERVICE.create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    await _session_service().create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
     return user_id, session_id
 
 async def cleanup():
     """FIX: Manually awaits the LiteLLM cleanup coroutine to stop the warning."""
-    try:
-        await litellm.close_litellm_async_clients()
-    except Exception:
+    # If litellm was never imported there are no async clients to close.
+    if "litellm" in sys.modules:
+        try:
+            await sys.modules["litellm"].close_litellm_async_clients()
+        except Exception:
 
-        pass
+            pass
+    # Pooled sockets belong to the current event loop; release them with it.
+    if _MODEL_REGISTRY is not None:
+        await _MODEL_REGISTRY.reset()
+    # Cached agents hold those model clients, so they go with them.
+    if _AGENT_REGISTRY is not None:
+        _AGENT_REGISTRY.clear()
+    # Drain the write-behind queue so no session events are lost on exit.
+    if _SESSION_SERVICE is not None and hasattr(_SESSION_SERVICE, "flush"):
+        await _SESSION_SERVICE.flush()
+    # Persist the semantic index so the next run starts warm.
+    if _SEMANTIC_CACHE is not None and _SEMANTIC_CACHE.path:
+        _SEMANTIC_CACHE.save()
+    # Background refreshes belong to this event loop: let them land before it closes.
+    for cache in _IO_CACHES.values():
+        await cache.drain()
+    # Audit records are never dropped: the writer stops after writing everything buffered.
+    if _POLICY_ENGINE is not None:
+        await _POLICY_ENGINE.audit.close()
+    # Queued blocking tool calls are dropped; the pool is rebuilt on next use.
+    if _TOOL_RUNTIME is not None:
+        _TOOL_RUNTIME.shutdown()
@@ -0,0 +1,176 @@
+"""
+FILE: config/skb_prefetch.py
+DESCRIPTION: Speculative SKB prefetch: ground the user message before the first model call.
+ARCHITECT'S NOTE: "Shift resources from Project Alpha to Cloud Migration" already names
+both records, yet the tool path spends a full model pass just to ask for them. Before
+dispatch, every 1-4 word span of the message is normalized into an SKB key and
+checked in one batch lookup against the store's key index; the longest non-overlapping
+matches are fetched concurrently (through the SKB tool itself, so its TTL cache is
+warm) and appended to the message as a grounded context block. Anything the scan
+misses, such as a paraphrase or a KPI named loosely, still goes through the tool.
+
+DEMO: python -m config.skb_prefetch   (scripted query set: model passes and wall time, tool path vs prefetch)
+"""
+import asyncio
+import re
+import time
+
+from config.skb_store import normalize_key
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+CONTEXT_HEADER = ("[PREFETCHED INTERNAL CONTEXT: authoritative SKB records for the resources named above; "
+                  "do not query them again]")
+
+
+class SkbPrefetcher:
+    """Scans text for SKB keys (one get_many per message) and fetches the matches concurrently."""
+
+    def __init__(self, store, fetch=None, max_words=4, max_records=8):
+        self.store = store
+        self.fetch = fetch
+        self.max_words = max_words
+        self.max_records = max_records
+        self.counters = {"messages": 0, "grounded": 0, "records": 0, "fetch_ms": 0.0}
+
+    def match(self, text):
+        """SKB keys named in `text`, in order of appearance; longer spans win over their parts."""
+        words = _WORD.findall(text)
+        spans = [(start, size, normalize_key(" ".join(words[start:start + size])))
+                 for size in range(min(self.max_words, len(words)), 0, -1)
+                 for start in range(len(words) - size + 1)]
+        if not spans:
+            return []
+        found = self.store.get_many({key for _, _, key in spans})
+        taken = set()
+        matches = []
+        for start, size, key in spans:
+            covered = set(range(start, start + size))
+            if found.get(key) is not None and not covered & taken:
+                taken |= covered
+                matches.append((start, key))
+        return [key for _, key in sorted(matches)][:self.max_records]
+
+    async def prefetch(self, text):
+        """{key: record text} for every key named in `text`, fetched concurrently."""
+        keys = list(dict.fromkeys(self.match(text)))
+        if not keys:
+            return {}
+        if self.fetch is None:
+            found = self.store.get_many(keys)
+            return {key: f"{key}: {found[key]}" for key in keys}
+        results = await asyncio.gather(*(self.fetch(resource_key=key) for key in keys), return_exceptions=True)
+        return {key: result for key, result in zip(keys, results) if not isinstance(result, BaseException)}
+
+    async def ground(self, content):
+        """Returns `content` with a prefetched-records part appended (unchanged if nothing matched)."""
+        from google.genai import types
+
+        self.counters["messages"] += 1
+        text = " ".join(part.text or "" for part in content.parts or ())
+        started = time.perf_counter()
+        records = await self.prefetch(text)
+        self.counters["fetch_ms"] += (time.perf_counter() - started) * 1000
+        if not records:
+            return content
+        self.counters["grounded"] += 1
+        self.counters["records"] += len(records)
+        block = CONTEXT_HEADER + "\n" + "\n".join(f"- {record}" for record in records.values())
+        return types.Content(role=content.role, parts=[*content.parts, types.Part(text=block)])
+
+    def stats(self):
+        return {**self.counters, "fetch_ms": round(self.counters["fetch_ms"], 1)}
+
+
+# --- DEMO: lesson 08's auditor on a scripted query set, with and without prefetch ---
+
+_QUERIES = [
+    "Assess the viability of shifting senior engineering resources from Project Alpha to the Cloud Migration initiative.",
+    "Is Cyber Shield on track for its Q3 launch?",
+    "Compare Project Alpha, Cloud Migration and Cyber Shield for the board pack.",
+    "What is our exposure on the legacy API bottleneck?",
+    "Should Project Zeta receive Q4 funding?",
+    "Summarize cloud migration savings for the CFO.",
+]
+_MODEL_S = 0.4    # One model pass (simulated).
+_GATEWAY_S = 0.08  # One SKB round trip through the secure gateway (simulated).
+
+
+async def _run(queries, prefetch):
+    from google.adk.agents import Agent
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    from config.skb_store import DictSKB
+
+    store = DictSKB({
+        "Project_Alpha": "Status: CRITICAL/DELAYED. Risk: Legacy API bottleneck. Budget: $1.2M utilized.",
+        "Cloud_Migration": "Status: OPTIMIZED. Savings: $300k YTD. Infrastructure: 65% Serverless transition.",
+        "Cyber_Shield": "Status: PROTOTYPING. Priority: P0 (Executive Mandate). Launch: Q3 2026.",
+    })
+    named = ["Project Alpha", "Cloud Migration", "Cyber Shield", "Project Zeta", "Legacy Api"]
+    model_passes = []
+
+    async def query_internal_strategy_skb(resource_key: str) -> str:
+        """Queries the private Strategy Knowledge Base."""
+        await asyncio.sleep(_GATEWAY_S)
+        lookup = normalize_key(resource_key)
+        return f"[INTERNAL DATA SOURCE - SECURE] {lookup}: {store.get(lookup) or 'NULL: No internal record found.'}"
+
+    class ScriptedAuditor(BaseLlm):
+        """Calls the SKB tool for every resource the conversation names but has no record for."""
+
+        async def generate_content_async(self, llm_request, stream=False):
+            model_passes.append(1)
+            await asyncio.sleep(_MODEL_S)
+            texts = [p.text or str(p.function_response.response if p.function_response else "")
+                     for c in llm_request.contents for p in c.parts or ()]
+            seen = " ".join(texts).title()
+            last = llm_request.contents[-1].parts or ()
+            asked = (last[0].text or "").title() if last else ""  # The user's own words, not the records.
+            missing = [n for n in named if n.title() in asked and f"{normalize_key(n)}:" not in seen]
+            if missing and not any(p.function_response for p in llm_request.contents[-1].parts or ()):
+                parts = [types.Part(function_call=types.FunctionCall(id=f"c{i}", name="query_internal_strategy_skb",
+                                                                     args={"resource_key": n}))
+                         for i, n in enumerate(missing)]
+            else:
+                parts = [types.Part(text="RECOMMENDATION: grounded in internal telemetry.")]
+            yield LlmResponse(content=types.Content(role="model", parts=parts))
+
+    agent = Agent(name="Internal_Resource_Auditor", instruction="Ground every answer in the SKB.",
+                  model=ScriptedAuditor(model="scripted"), tools=[query_internal_strategy_skb])
+    service = InMemorySessionService()
+    runner = Runner(agent=agent, app_name="skb_prefetch_demo", session_service=service)
+    prefetcher = SkbPrefetcher(store, fetch=query_internal_strategy_skb)
+    latencies = []
+    for i, query in enumerate(queries):
+        await service.create_session(app_name="skb_prefetch_demo", user_id="u", session_id=f"s{i}")
+        message = types.Content(role="user", parts=[types.Part(text=query)])
+        started = time.perf_counter()
+        if prefetch:
+            message = await prefetcher.ground(message)
+        async for _ in runner.run_async(user_id="u", session_id=f"s{i}", new_message=message):
+            pass
+        latencies.append(time.perf_counter() - started)
+    return len(model_passes), latencies, prefetcher.stats()
+
+
+async def _demo():
+    await _run(_QUERIES[:1], prefetch=True)  # Warm-up: imports, first runner.
+    base_passes, base_lat, _ = await _run(_QUERIES, prefetch=False)
+    pre_passes, pre_lat, stats = await _run(_QUERIES, prefetch=True)
+    print(f"--- [DEMO] {len(_QUERIES)} auditor queries | model pass {_MODEL_S * 1000:.0f} ms | "
+          f"SKB round trip {_GATEWAY_S * 1000:.0f} ms ---")
+    for query, before, after in zip(_QUERIES, base_lat, pre_lat):
+        print(f"  {before:5.2f} s -> {after:5.2f} s  {query[:70]}")
+    print(f"Tool path:  {base_passes} model passes | {sum(base_lat):.2f} s")
+    print(f"Prefetch:   {pre_passes} model passes | {sum(pre_lat):.2f} s")
+    print(f"Saved: {base_passes - pre_passes} model passes, {sum(base_lat) - sum(pre_lat):.2f} s "
+          f"({(1 - sum(pre_lat) / sum(base_lat)) * 100:.0f}% wall time)")
+    print(f"Prefetcher: {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
@@ -0,0 +1,304 @@
+"""
+FILE: config/skb_store.py
+DESCRIPTION: Strategy Knowledge Base backends: in-memory dict and indexed SQLite + FTS5.
+ARCHITECT'S NOTE: Lesson 08's SKB was a three-entry dict, so a real knowledge base
+would have been a linear scan or a miss. Both backends share one small interface:
+`get` (exact key), `get_many` (batch), `prefix` and `search` (full text). The SQLite
+backend keeps records in a rowid table with a unique normalized key (B-tree lookups
+and prefix range scans) and an external-content FTS5 index over key and body for
+BM25-ranked search. Bulk loads write records in large transactions and rebuild the
+FTS index once at the end; small upserts keep it in sync row by row.
+
+BENCHMARK: python -m config.skb_store   (1M-record synthetic SKB; CSV/JSONL loader check)
+"""
+import csv
+import json
+import re
+import sqlite3
+import threading
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    key_norm TEXT NOT NULL UNIQUE,
+    key TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'project',
+    body TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+    key, body, content='records', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_key(key):
+    """Lesson 08's convention: 'project alpha' / 'Project-Alpha' -> 'Project_Alpha'."""
+    return "_".join(_TOKEN.findall(str(key))).title()
+
+
+def record_from_row(row, key_field="key", kind_field="kind", body_field="body"):
+    """Export row (CSV dict or JSON object) -> (key, kind, body); extra fields fold into the body."""
+    row = {k: v for k, v in row.items() if v not in (None, "")}
+    key = normalize_key(row.pop(key_field))
+    kind = str(row.pop(kind_field, "project"))
+    body = row.pop(body_field, None)
+    if body is None:
+        body = " ".join(f"{field.replace('_', ' ').title()}: {value}." for field, value in row.items())
+    return key, kind, str(body)
+
+
+class DictSKB:
+    """In-memory backend (lesson defaults, tests): exact and prefix by key, substring search."""
+
+    def __init__(self, records=None):
+        self._records = {}
+        self.upsert(records or {})
+
+    def upsert(self, records, kind="project"):
+        rows = records.items() if isinstance(records, dict) else records
+        for row in rows:
+            self._records[normalize_key(row[0])] = row[-1]
+
+    def get(self, key):
+        return self._records.get(normalize_key(key))
+
+    def get_many(self, keys):
+        return {normalize_key(k): self._records.get(normalize_key(k)) for k in keys}
+
+    def prefix(self, prefix, limit=10):
+        prefix = normalize_key(prefix).lower()
+        return [(k, v) for k, v in self._records.items() if k.lower().startswith(prefix)][:limit]
+
+    def search(self, text, limit=5, ranked=True):
+        terms = [t.lower() for t in _TOKEN.findall(text)]
+        hits = [(k, v) for k, v in self._records.items() if all(t in f"{k} {v}".lower() for t in terms)]
+        return hits[:limit]
+
+    def __len__(self):
+        return len(self._records)
+
+
+class SqliteSKB:
+    """SQLite backend: unique-key B-tree for exact/prefix/batch, FTS5 (BM25) for full text."""
+
+    def __init__(self, db_path="strategy_skb.db"):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def upsert(self, records, kind="project"):
+        """Small, incremental writes ({key: body} or (key, kind, body) rows); FTS kept in sync."""
+        rows = records.items() if isinstance(records, dict) else records
+        with self._lock:
+            self._conn.execute("BEGIN")
+            for row in rows:
+                key, row_kind, body = (row[0], kind, row[1]) if len(row) == 2 else row
+                key = normalize_key(key)
+                old = self._conn.execute(
+                    "SELECT id, key, body FROM records WHERE key_norm = ?", (key.lower(),)
+                ).fetchone()
+                if old:
+                    self._conn.execute("INSERT INTO records_fts(records_fts, rowid, key, body) VALUES('delete', ?, ?, ?)", old)
+                    self._conn.execute("UPDATE records SET key = ?, kind = ?, body = ? WHERE id = ?", (key, row_kind, body, old[0]))
+                    rowid = old[0]
+                else:
+                    rowid = self._conn.execute(
+                        "INSERT INTO records (key_norm, key, kind, body) VALUES (?, ?, ?, ?)",
+                        (key.lower(), key, row_kind, body),
+                    ).lastrowid
+                self._conn.execute("INSERT INTO records_fts(rowid, key, body) VALUES (?, ?, ?)", (rowid, key, body))
+            self._conn.execute("COMMIT")
+
+    def bulk_load(self, rows, batch_size=50_000):
+        """(key, kind, body) rows in large transactions, then one FTS rebuild. Returns rows written."""
+        written = 0
+        batch = []
+        sql = ("INSERT INTO records (key_norm, key, kind, body) VALUES (?, ?, ?, ?) "
+               "ON CONFLICT(key_norm) DO UPDATE SET key = excluded.key, kind = excluded.kind, body = excluded.body")
+        with self._lock:
+            for key, kind, body in rows:
+                key = normalize_key(key)
+                batch.append((key.lower(), key, kind, body))
+                if len(batch) >= batch_size:
+                    self._conn.execute("BEGIN")
+                    self._conn.executemany(sql, batch)
+                    self._conn.execute("COMMIT")
+                    written += len(batch)
+                    batch = []
+            if batch:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(sql, batch)
+                self._conn.execute("COMMIT")
+                written += len(batch)
+            self._conn.execute("INSERT INTO records_fts(records_fts) VALUES('rebuild')")
+            self._conn.execute("INSERT INTO records_fts(records_fts) VALUES('optimize')")
+        return written
+
+    def load_csv(self, path, **fields):
+        with open(path, newline="", encoding="utf-8") as handle:
+            return self.bulk_load(record_from_row(row, **fields) for row in csv.DictReader(handle))
+
+    def load_jsonl(self, path, **fields):
+        with open(path, encoding="utf-8") as handle:
+            return self.bulk_load(record_from_row(json.loads(line), **fields) for line in handle if line.strip())
+
+    def get(self, key):
+        row = self._query("SELECT body FROM records WHERE key_norm = ?", (normalize_key(key).lower(),))
+        return row[0][0] if row else None
+
+    def get_many(self, keys):
+        """One indexed query per 500 keys; missing keys map to None."""
+        wanted = {normalize_key(k): None for k in keys}
+        norms = [k.lower() for k in wanted]
+        by_norm = {}
+        for start in range(0, len(norms), 500):
+            chunk = norms[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            by_norm.update(self._query(f"SELECT key_norm, body FROM records WHERE key_norm IN ({marks})", chunk))
+        return {key: by_norm.get(key.lower()) for key in wanted}
+
+    def prefix(self, prefix, limit=10):
+        """Range scan on the unique key index: 'Project_Al' -> Project_Alpha, Project_Alps_..."""
+        low = normalize_key(prefix).lower()
+        return self._query(
+            "SELECT key, body FROM records WHERE key_norm >= ? AND key_norm < ? ORDER BY key_norm LIMIT ?",
+            (low, low + "\U0010ffff", limit),
+        )
+
+    def search(self, text, limit=5, ranked=True):
+        """Full text: every term must match; falls back to any term.
+
+        `ranked` orders by BM25, which scores every match; `ranked=False` returns the first
+        matches in index order and stays sub-millisecond however broad the terms are.
+        """
+        terms = [f'"{t}"' for t in _TOKEN.findall(text)]
+        if not terms:
+            return []
+        sql = ("SELECT r.key, r.body FROM records_fts JOIN records r ON r.id = records_fts.rowid "
+               f"WHERE records_fts MATCH ? {'ORDER BY rank ' if ranked else ''}LIMIT ?")
+        hits = self._query(sql, (" AND ".join(terms), limit))
+        if not hits and len(terms) > 1:
+            hits = self._query(sql, (" OR ".join(terms), limit))
+        return hits
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM records")[0][0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# --- BENCHMARK: 1M synthetic records; exact, batch, prefix and full-text latency ---
+
+_PROGRAMS = ["Alpha", "Atlas", "Aurora", "Beacon", "Cyber", "Delta", "Ember", "Falcon", "Helix", "Horizon",
+             "Lumen", "Meridian", "Nimbus", "Orion", "Phoenix", "Quasar", "Sentinel", "Summit", "Titan", "Vector"]
+_DOMAINS = ["Cloud Migration", "Data Residency", "Zero Trust", "ERP Consolidation", "Agent Platform",
+            "Payments Modernization", "Network Refresh", "Observability", "Identity", "Workplace"]
+_STATUSES = ["ON TRACK", "AT RISK", "CRITICAL/DELAYED", "OPTIMIZED", "PROTOTYPING", "CLOSED"]
+_RISKS = ["Legacy API bottleneck", "Vendor lock-in", "Skills gap", "Latency budget overrun",
+          "Data sovereignty review", "Licensing renegotiation", "Change fatigue", "Capacity shortfall"]
+
+
+def _synthetic_rows(count, seed=8):
+    import random
+
+    rng = random.Random(seed)
+    for i in range(count):
+        program = rng.choice(_PROGRAMS)
+        domain = rng.choice(_DOMAINS)
+        if i % 5 == 4:
+            yield (f"Kpi_{program}_{domain}_{i}", "kpi",
+                   f"Metric: {domain} {rng.choice(['uptime', 'cost per user', 'lead time', 'adoption'])}. "
+                   f"Value: {rng.uniform(1, 99):.1f}. Owner: {program} office.")
+        else:
+            yield (f"Project_{program}_{i}", "project",
+                   f"Status: {rng.choice(_STATUSES)}. Domain: {domain}. Risk: {rng.choice(_RISKS)}. "
+                   f"Budget: ${rng.randint(1, 90) * 100}k utilized.")
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2] * 1e6, samples[int(len(samples) * 0.99)] * 1e6
+
+
+def _benchmark(records=1_000_000, queries=2_000):
+    import os
+    import random
+    import shutil
+    import tempfile
+    import time
+
+    workdir = tempfile.mkdtemp(prefix="skb_bench_")
+    skb = SqliteSKB(os.path.join(workdir, "skb.db"))
+    started = time.perf_counter()
+    skb.bulk_load(_synthetic_rows(records))
+    load_s = time.perf_counter() - started
+    size_mb = sum(os.path.getsize(os.path.join(workdir, f)) for f in os.listdir(workdir)) / 1e6
+    print(f"--- [BENCHMARK] {len(skb):,} records | bulk load + FTS build {load_s:.1f} s | {size_mb:.0f} MB on disk ---")
+
+    rng = random.Random(1)
+    keys = [key for key, _, _ in _synthetic_rows(records) if rng.random() < queries / records]
+
+    def timed(label, calls, per_call=1):
+        samples = []
+        results = 0
+        for call in calls:
+            t0 = time.perf_counter()
+            out = call()
+            samples.append(time.perf_counter() - t0)
+            results += len(out) if isinstance(out, (list, dict)) else out is not None
+        p50, p99 = _percentiles(samples)
+        print(f"{label:>30}: p50 {p50:8.1f} us | p99 {p99:8.1f} us | {results / len(samples) / per_call:5.2f} results/lookup")
+
+    timed("exact key", [lambda k=k: skb.get(k.lower().replace("_", " ")) for k in keys])
+    timed("exact key (miss)", [lambda i=i: skb.get(f"Project_Missing_{i}") for i in range(len(keys))])
+    batches = [keys[i:i + 50] for i in range(0, len(keys) - 50, 50)]
+    timed("batch of 50 keys", [lambda b=b: skb.get_many(b) for b in batches], per_call=50)
+    timed("prefix 'Project_Orion_12'", [lambda i=i: skb.prefix(f"Project_{_PROGRAMS[i % 20]}_{i % 90 + 10}") for i in range(500)])
+    timed("full text (2 terms)", [lambda i=i: skb.search(f"{_DOMAINS[i % 10].split()[0]} {_RISKS[i % 8].split()[0]}")
+                                  for i in range(500)])
+    timed("full text (3 terms, rare)", [lambda i=i: skb.search(f"critical {_PROGRAMS[i % 20]} {_RISKS[i % 8].split()[-1]}")
+                                        for i in range(500)])
+    timed("full text (2 terms, unranked)", [lambda i=i: skb.search(f"{_DOMAINS[i % 10].split()[0]} {_RISKS[i % 8].split()[0]}",
+                                                                    ranked=False) for i in range(500)])
+
+    # Baseline for full text: what a dict-backed SKB has to do (scan every record).
+    in_memory = DictSKB({key: body for key, _, body in _synthetic_rows(records)})
+    t0 = time.perf_counter()
+    for i in range(5):
+        in_memory.search(f"critical {_PROGRAMS[i]} bottleneck")
+    print(f"{'dict scan (3 terms)':>30}: {(time.perf_counter() - t0) / 5 * 1e6:10.1f} us per query")
+    skb.close()
+
+    # Loader check: CSV and JSONL exports round-trip through bulk_load.
+    sample = list(_synthetic_rows(10_000, seed=2))
+    csv_path, jsonl_path = os.path.join(workdir, "skb.csv"), os.path.join(workdir, "skb.jsonl")
+    with open(csv_path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["key", "kind", "body"])
+        writer.writerows(sample)
+    with open(jsonl_path, "w", encoding="utf-8") as handle:
+        for key, kind, body in sample:
+            status, _, rest = body.partition(". ")
+            handle.write(json.dumps({"key": key, "kind": kind, "status": status.split(": ")[-1], "notes": rest}) + "\n")
+    for path, loader in ((csv_path, "load_csv"), (jsonl_path, "load_jsonl")):
+        target = SqliteSKB(path + ".db")
+        t0 = time.perf_counter()
+        written = getattr(target, loader)(path)
+        print(f"{loader:>30}: {written:,} rows in {time.perf_counter() - t0:.2f} s | "
+              f"{sample[0][0]} -> {target.get(sample[0][0])[:60]}...")
+        target.close()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    _benchmark()
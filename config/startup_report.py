@@ -0,0 +1,98 @@
+"""
+FILE: config/startup_report.py
+DESCRIPTION: Startup-cost audit for the Strategy Suite (a readable `-X importtime`).
+ARCHITECT'S NOTE: Every lesson is a short CLI invocation, so import cost is paid on
+every run. This report imports a target in a fresh interpreter, aggregates the
+cumulative cost per module and enforces a cold-import budget for config.settings.
+
+USAGE:
+    python -m config.startup_report                      # report for `import config.settings`
+    python -m config.startup_report --target "config.settings:get_model"   # include first use
+    python -m config.startup_report --budget-ms 150      # exit 1 when the cold import is over budget
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "150"))
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _snippet(target):
+    """'pkg.mod' imports the module; 'pkg.mod:func' also calls func() to price first use."""
+    module, _, attr = target.partition(":")
+    code = f"import {module}"
+    if attr:
+        code += f"; {module}.{attr}()"
+    return code
+
+
+def _run(args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=_REPO_ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def collect_import_times(target="config.settings"):
+    """Returns [(module, self_us, cumulative_us)] parsed from `-X importtime`."""
+    result = _run(["-X", "importtime", "-c", _snippet(target)])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure_cold_import_ms(target="config.settings", runs=3):
+    """Best-of-N wall time for the target in a fresh interpreter (no warm module cache)."""
+    probe = (
+        "import time; _t = time.perf_counter(); "
+        f"{_snippet(target)}; "
+        "print((time.perf_counter() - _t) * 1000)"
+    )
+    return min(float(_run(["-c", probe]).stdout.strip().splitlines()[-1]) for _ in range(runs))
+
+
+def print_report(target="config.settings", top=15):
+    rows = collect_import_times(target)
+    by_package = {}
+    for name, self_us, _ in rows:
+        root = name.split(".")[0]
+        by_package[root] = by_package.get(root, 0) + self_us
+    total_us = sum(self_us for _, self_us, _ in rows)
+
+    print(f"--- [STARTUP REPORT] {target} | {len(rows)} modules | {total_us / 1000:.1f} ms ---")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+    print(f"\n{'package ms':>14}  top-level package")
+    for root, self_us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"{self_us / 1000:>14.1f}  {root}")
+
+
+def check_budget(budget_ms=DEFAULT_BUDGET_MS, target="config.settings"):
+    cold_ms = measure_cold_import_ms(target)
+    within = cold_ms <= budget_ms
+    status = "WITHIN BUDGET" if within else "OVER BUDGET"
+    print(f"--- [STARTUP BUDGET] {target}: {cold_ms:.1f} ms / {budget_ms:.0f} ms | {status} ---")
+    return within
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-module startup cost report and cold-import budget gate.")
+    parser.add_argument("--target", default="config.settings", help="module, or module:function to include first use")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail when the cold import exceeds this")
+    args = parser.parse_args(argv)
+
+    if args.budget_ms is not None:
+        return 0 if check_budget(args.budget_ms, args.target) else 1
+    print_report(args.target, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+FILE: config/structured_output.py
+DESCRIPTION: Schema-validated output for JSON-mode agents with a bounded repair path.
+ARCHITECT'S NOTE: A JSON-mode agent that returns almost-JSON should not cost a second
+generation. Output is validated against a pydantic model compiled once per agent; a
+failure first goes through a cheap local fix-up (fences, trailing commas, truncated
+brackets) and only then through a targeted re-prompt, capped at `max_reprompts`. The
+counters put a number on wasted generations.
+
+DEMO: python -m config.structured_output
+"""
+import json
+
+from pydantic import TypeAdapter, ValidationError
+
+from config.stream_json import strip_code_fence
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class StructuredOutputError(ValueError):
+    """Output still invalid after local repair and every allowed re-prompt."""
+
+    def __init__(self, agent_name, raw, errors):
+        super().__init__(f"{agent_name}: structured output invalid after repair ({len(errors)} errors)")
+        self.raw = raw
+        self.errors = errors
+
+
+def local_repair(text):
+    """Cheap syntactic fix-up: fences, leading prose, trailing commas, truncated strings/brackets."""
+    text = strip_code_fence(text)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return text
+    out = []
+    stack = []
+    in_string = escape = False
+    for ch in text[min(starts):]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]":
+            _drop_dangling(out)
+            if stack:
+                stack.pop()
+        out.append(ch)
+        if not stack:
+            break  # Top-level value closed; anything after it is chatter.
+    if in_string:
+        out.append('"')
+    _drop_dangling(out)
+    if out and out[-1] == ":":
+        out.append("null")
+    out.extend(reversed(stack))
+    return "".join(out)
+
+
+def _drop_dangling(out):
+    while out and out[-1] in " \t\r\n":
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+class StructuredOutput:
+    """Compiled validator + repair policy + counters for one agent."""
+
+    def __init__(self, agent_name, schema, max_reprompts=1):
+        self.agent_name = agent_name
+        self.schema = schema
+        self.max_reprompts = max_reprompts
+        self._adapter = TypeAdapter(schema)  # Core schema is built here, once.
+        self._item_adapters = {}
+        self.outputs = 0
+        self.first_pass_valid = 0
+        self.local_repairs = 0
+        self.reprompts = 0
+        self.reprompt_saves = 0
+        self.failures = 0
+
+    def _validate(self, text):
+        try:
+            return self._adapter.validate_json(text), None
+        except ValidationError as exc:
+            return None, exc.errors(include_url=False)
+
+    def validate_item(self, field, item):
+        """Validates one streamed element of a list field (e.g. a single roadmap phase)."""
+        adapter = self._item_adapters.get(field)
+        if adapter is None:
+            annotation = self.schema.model_fields[field].annotation
+            adapter = self._item_adapters[field] = TypeAdapter(annotation.__args__[0])
+        return adapter.validate_python(item)
+
+    def check(self, text, first_pass=True):
+        """Returns (value, errors): strict parse first, then the local fix-up."""
+        if first_pass:
+            self.outputs += 1
+        value, errors = self._validate(text)
+        if value is not None:
+            if first_pass:
+                self.first_pass_valid += 1
+            return value, None
+        repaired = local_repair(text)
+        if repaired != text:
+            value, _ = self._validate(repaired)
+            if value is not None:
+                self.local_repairs += 1
+                return value, None
+        return None, errors
+
+    def reprompt_message(self, errors):
+        problems = "; ".join(f"{'.'.join(str(p) for p in e['loc']) or '<root>'}: {e['msg']}" for e in errors[:10])
+        return (
+            "Your previous output failed schema validation: "
+            f"{problems}. Return ONLY the corrected JSON matching this schema, with no prose or code fences: "
+            f"{json.dumps(self._adapter.json_schema(), separators=(',', ':'))}"
+        )
+
+    async def finalize(self, text, runner, user_id, session_id):
+        """Validates final output; repairs locally, then re-prompts at most max_reprompts times."""
+        from google.genai import types
+
+        value, errors = self.check(text)
+        attempt = 0
+        while value is None and attempt < self.max_reprompts:
+            attempt += 1
+            self.reprompts += 1
+            message = types.Content(role="user", parts=[types.Part(text=self.reprompt_message(errors))])
+            text = ""
+            async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+                if event.is_final_response() and event.content and event.content.parts:
+                    text = event.content.parts[0].text or ""
+            value, errors = self.check(text, first_pass=False)
+            if value is not None:
+                self.reprompt_saves += 1
+        if value is None:
+            self.failures += 1
+            raise StructuredOutputError(self.agent_name, text, errors)
+        return value
+
+    def stats(self):
+        return {
+            "outputs": self.outputs,
+            "first_pass_valid": self.first_pass_valid,
+            "first_pass_rate": round(self.first_pass_valid / self.outputs, 4) if self.outputs else 0.0,
+            "local_repair_saves": self.local_repairs,
+            "reprompts": self.reprompts,
+            "reprompt_saves": self.reprompt_saves,
+            "failures": self.failures,
+        }
+
+
+# --- DEMO: typical near-miss outputs from a local JSON-mode model ---
+
+def _demo():
+    from typing import List
+
+    from pydantic import BaseModel
+
+    class Phase(BaseModel):
+        phase: str
+        dependency: str
+        outcome: str
+
+    class Roadmap(BaseModel):
+        roadmap: List[Phase]
+
+    guard = StructuredOutput("Principal_Roadmap_Architect", Roadmap)
+    phase = '{"phase": "Tactical (6mo)", "dependency": "API facade", "outcome": "20% faster close"}'
+    samples = {
+        "clean": '{"roadmap": [%s]}' % phase,
+        "fenced + prose": 'Here you go:\n```json\n{"roadmap": [%s]}\n```' % phase,
+        "trailing commas": '{"roadmap": [%s,],}' % phase,
+        "truncated": '{"roadmap": [%s, {"phase": "Operational (2yr)", "dependency": "Event mesh", "outcome": "Real-ti' % phase,
+        "wrong shape": '{"phases": [%s]}' % phase,
+    }
+    for label, text in samples.items():
+        value, errors = guard.check(text)
+        outcome = f"{len(value.roadmap)} phases" if value else f"needs re-prompt: {errors[0]['msg']}"
+        print(f"{label:>16}: {outcome}")
+    print(f"Counters: {guard.stats()}")
+
+
+if __name__ == "__main__":
+    _demo()
@@ -0,0 +1,179 @@
+"""
+FILE: config/tool_memo.py
+DESCRIPTION: Bounded, thread-safe memoization for deterministic (pure) agent tools.
+ARCHITECT'S NOTE: Models repeat tool calls: lesson 06's retry loop re-sends the same
+ROI request, and permission checks recur on every authorization attempt. A tool
+marked deterministic is looked up in a shared LRU keyed on its normalized arguments
+(bound to the signature, defaults applied, 250000 == 250000.0, strings stripped)
+before it runs. A hit skips execution but returns the same value, so ADK and the tool
+runtime still emit an ordinary FunctionResponse. One lock guards the LRU, so sessions
+on the event loop and sync tools on the tool thread pool can share it; exceptions are
+never cached and mutable results are handed out as copies.
+
+Only mark tools whose result depends on nothing but their arguments: no clock, no
+I/O, no side effects.
+
+DEMO: python -m config.tool_memo   (lesson 06 retry pattern + concurrent sessions)
+"""
+import copy
+import functools
+import inspect
+import json
+import threading
+from collections import OrderedDict
+
+_MISS = object()
+
+
+def _normalize(value):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return repr(value)
+
+
+class ToolMemo:
+    """Shared LRU of deterministic tool results with per-tool hit/miss counters."""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self.evictions = 0
+
+    @staticmethod
+    def key(func, signature, args, kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return (func.__module__, func.__qualname__,
+                tuple((name, _normalize(value)) for name, value in bound.arguments.items()))
+
+    def _count(self, name, field):
+        counters = self._counters.setdefault(name, {"hits": 0, "misses": 0})
+        counters[field] += 1
+
+    def get(self, key, name):
+        with self._lock:
+            value = self._entries.get(key, _MISS)
+            if value is _MISS:
+                self._count(name, "misses")
+                return _MISS
+            self._entries.move_to_end(key)
+            self._count(name, "hits")
+        return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    def put(self, key, value):
+        stored = copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+        with self._lock:
+            self._entries[key] = stored
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def wrap(self, func):
+        """Decorator: same name, docstring and signature; results cached by normalized arguments.
+
+        Two sessions missing on the same key at once both execute; the results are identical
+        by definition, so the second write is harmless.
+        """
+        signature = inspect.signature(func)
+        name = func.__name__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def tool(*args, **kwargs):
+                key = self.key(func, signature, args, kwargs)
+                value = self.get(key, name)
+                if value is _MISS:
+                    value = await func(*args, **kwargs)
+                    self.put(key, value)
+                return value
+        else:
+            @functools.wraps(func)
+            def tool(*args, **kwargs):
+                key = self.key(func, signature, args, kwargs)
+                value = self.get(key, name)
+                if value is _MISS:
+                    value = func(*args, **kwargs)
+                    self.put(key, value)
+                return value
+
+        tool.deterministic = True
+        tool.memo = self
+        return tool
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            per_tool = {name: dict(c) for name, c in self._counters.items()}
+            size = len(self._entries)
+        hits = sum(c["hits"] for c in per_tool.values())
+        calls = hits + sum(c["misses"] for c in per_tool.values())
+        return {
+            "entries": size,
+            "capacity": self.capacity,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / calls, 3) if calls else 0.0,
+            "tools": per_tool,
+        }
+
+
+# --- DEMO: lesson 06's retry pattern, then many sessions sharing one memo ---
+
+def _demo(sessions=16, calls_per_session=2_000):
+    import random
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    memo = ToolMemo(capacity=256)
+    executions = []
+
+    def run_math_calculation(cap_ex: float, annual_opex_savings: float) -> dict:
+        executions.append(1)
+        time.sleep(0.002)  # Stand-in for a pricing lookup behind the formula.
+        roi = ((annual_opex_savings - cap_ex) / cap_ex) * 100
+        payback = cap_ex / annual_opex_savings if annual_opex_savings > 0 else 0
+        return {"roi_percent": round(roi, 2), "payback_years": round(payback, 2)}
+
+    cached = memo.wrap(run_math_calculation)
+
+    # Retry loop: the model re-sends the same request with cosmetic differences.
+    first = cached(250000, 400000)
+    first["roi_percent"] = -1  # Callers mutating a result must not poison the cache.
+    assert cached(cap_ex=250000.0, annual_opex_savings=400000) == {"roi_percent": 60.0, "payback_years": 0.62}
+    assert len(executions) == 1
+    print("--- [DEMO] Retry loop: 2 equivalent calls -> 1 execution, cached result isolated from mutation ---")
+
+    # Concurrent sessions on a thread pool drawing from a small set of hot projects.
+    projects = [(random.Random(i).randint(1, 50) * 10_000, random.Random(-i).randint(1, 80) * 10_000) for i in range(64)]
+
+    def session(seed):
+        rng = random.Random(seed)
+        for _ in range(calls_per_session):
+            cap_ex, savings = rng.choice(projects)
+            result = cached(cap_ex, savings)
+            assert result["roi_percent"] == round((savings - cap_ex) / cap_ex * 100, 2)
+
+    executions.clear()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(session, range(sessions)))
+    elapsed = time.perf_counter() - start
+    total = sessions * calls_per_session
+    print(f"--- [DEMO] {sessions} concurrent sessions x {calls_per_session:,} calls ---")
+    print(f"Executions: {len(executions):,} of {total:,} calls | wall {elapsed:.2f} s "
+          f"(uncached: ~{total * 0.002 / sessions:.1f} s across {sessions} threads)")
+    print(f"Stats: {memo.stats()}")
+
+
+if __name__ == "__main__":
+    _demo()
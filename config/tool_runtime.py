@@ -0,0 +1,250 @@
+"""
+FILE: config/tool_runtime.py
+DESCRIPTION: Concurrent tool execution with per-tool timeouts, cancellation and latency telemetry.
+ARCHITECT'S NOTE: A model turn that asks for an ROI audit and an archive lookup should
+cost max(latencies), not their sum. The runtime runs every function call of a turn at
+once: coroutine tools on the event loop, blocking tools on a bounded thread pool (a
+sync tool called inline stalls every other call in the turn). Each call gets its own
+timeout; a call that overruns is cancelled and answered with an error payload so the
+model still receives one FunctionResponse per call, in call order, in one message.
+
+Two ways in:
+  * Hand-written loops (lesson 06): `await runtime.execute(event.get_function_calls())`.
+  * ADK-managed agents (lesson 21): `tools=runtime.wrap_all([...])`; ADK already gathers
+    the calls of a turn, the wrappers add the thread pool, timeouts and telemetry.
+
+A timed-out sync tool cannot be interrupted inside its thread; its result is discarded
+and the worker frees itself when the call returns.
+
+DEMO: python -m config.tool_runtime   (multi-tool dossier: serial vs concurrent turn latency)
+"""
+import asyncio
+import functools
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ToolRuntime:
+    """Registry of callable tools plus the executor, timeouts and per-tool counters."""
+
+    def __init__(self, tools=(), default_timeout=30.0, timeouts=None, max_workers=8):
+        self.tools = {}
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+        self.max_workers = max_workers
+        self._pool = None
+        self._metrics = {}
+        for func in tools:
+            self.register(func)
+
+    def register(self, func, name=None, timeout=None):
+        name = name or func.__name__
+        self.tools[name] = func
+        if timeout is not None:
+            self.timeouts[name] = timeout
+        return func
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool")
+        return self._pool
+
+    def _record(self, name, seconds, outcome):
+        metrics = self._metrics.setdefault(name, {"calls": 0, "timeouts": 0, "errors": 0, "latencies": []})
+        metrics["calls"] += 1
+        metrics["latencies"].append(seconds)
+        if outcome != "ok":
+            metrics[outcome] += 1
+
+    async def call(self, func, args=None, name=None):
+        """Runs one tool under its timeout; returns {'result': ...} or {'error': ...}, never raises."""
+        name = name or func.__name__
+        timeout = self.timeouts.get(name, self.default_timeout)
+        args = dict(args or {})
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            if inspect.iscoroutinefunction(func):
+                awaitable = func(**args)
+            else:
+                loop = asyncio.get_running_loop()
+                awaitable = loop.run_in_executor(self.pool, functools.partial(func, **args))
+            response = {"result": await asyncio.wait_for(awaitable, timeout)}
+        except asyncio.TimeoutError:
+            outcome = "timeouts"
+            response = {"error": f"Tool '{name}' timed out after {timeout:g}s and was cancelled."}
+        except asyncio.CancelledError:
+            self._record(name, time.perf_counter() - started, "errors")
+            raise  # Caller cancelled the whole turn: propagate, don't answer.
+        except Exception as exc:
+            outcome = "errors"
+            response = {"error": f"Tool '{name}' failed: {type(exc).__name__}: {exc}"}
+        self._record(name, time.perf_counter() - started, outcome)
+        return response
+
+    async def execute(self, function_calls, resolve=None, role="user"):
+        """Runs every function call of a model turn concurrently; returns one Content of responses.
+
+        `resolve(call)` may return (func, args) or a ready response dict (validation errors,
+        circuit breakers); by default calls are looked up in the registry by name.
+        """
+        from google.genai import types
+
+        async def run(call):
+            target = resolve(call) if resolve else self._lookup(call)
+            if isinstance(target, dict):
+                return target
+            func, args = target
+            return await self.call(func, args, call.name)
+
+        responses = await asyncio.gather(*(run(call) for call in function_calls))
+        return types.Content(role=role, parts=[
+            types.Part(function_response=types.FunctionResponse(id=call.id, name=call.name, response=response))
+            for call, response in zip(function_calls, responses)
+        ])
+
+    def _lookup(self, call):
+        func = self.tools.get(call.name)
+        if func is None:
+            return {"error": f"Unknown tool '{call.name}'. Available: {', '.join(sorted(self.tools))}."}
+        return func, call.args
+
+    def wrap(self, func, timeout=None):
+        """ADK tool with the same name, docstring and signature, executed through this runtime."""
+        self.register(func, timeout=timeout)
+
+        @functools.wraps(func)
+        async def tool(**kwargs):
+            response = await self.call(func, kwargs)
+            return response["result"] if "result" in response else response
+
+        return tool
+
+    def wrap_all(self, funcs):
+        return [self.wrap(func) for func in funcs]
+
+    def stats(self):
+        report = {}
+        for name, metrics in self._metrics.items():
+            latencies = sorted(metrics["latencies"])
+            report[name] = {
+                "calls": metrics["calls"],
+                "timeouts": metrics["timeouts"],
+                "errors": metrics["errors"],
+                "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+                "max_ms": round(latencies[-1] * 1000, 1),
+            }
+        return report
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+# --- DEMO: lesson 21's multi-tool dossier, one model turn requesting four tools ---
+
+def _dossier_tools():
+    def calculate_precision_roi(investment: str, projected_savings: str) -> str:
+        """Blocking pricing-service round trip (sync tool)."""
+        time.sleep(0.25)
+        inv, sav = float(investment), float(projected_savings)
+        return f"[FINANCIAL AUDIT] ROI: {(sav - inv) / inv * 100:.2f}% | Net Gain: ${sav - inv:,.2f}"
+
+    async def fetch_institutional_archives(topic: str) -> str:
+        """Archive search (async tool)."""
+        await asyncio.sleep(0.4)
+        return "2024 RETROSPECTIVE: Centralization reduced sprawl by 35% but hit 200ms latency bottlenecks."
+
+    async def fetch_market_signals(topic: str) -> str:
+        """Market feed (async tool)."""
+        await asyncio.sleep(0.3)
+        return f"{topic}: 3 competitors announced gateway products in Q1."
+
+    def query_vendor_registry(vendor: str) -> str:
+        """A hung dependency (sync tool) that only a timeout can rescue."""
+        time.sleep(2.0)
+        return f"{vendor}: approved"
+
+    return [calculate_precision_roi, fetch_institutional_archives, fetch_market_signals, query_vendor_registry]
+
+
+async def _run_dossier(tools):
+    from google.adk.agents import Agent
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    calls = [
+        ("calculate_precision_roi", {"investment": "3000000", "projected_savings": "6500000"}),
+        ("fetch_institutional_archives", {"topic": "AI Gateway"}),
+        ("fetch_market_signals", {"topic": "AI Gateway"}),
+        ("query_vendor_registry", {"vendor": "Northwind"}),
+    ]
+
+    class ScriptedLlm(BaseLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            answered = any(p.function_response for c in llm_request.contents for p in c.parts or ())
+            if answered:
+                parts = [types.Part(text="GO: proceed with a governed pilot.")]
+            else:
+                parts = [types.Part(function_call=types.FunctionCall(id=f"call_{i}", name=n, args=a))
+                         for i, (n, a) in enumerate(calls)]
+            yield LlmResponse(content=types.Content(role="model", parts=parts))
+
+    agent = Agent(name="Global_CIO_Advisor", instruction="Audit, retrieve, reconcile.",
+                  model=ScriptedLlm(model="scripted"), tools=tools)
+    service = InMemorySessionService()
+    runner = Runner(agent=agent, app_name="tool_runtime_demo", session_service=service)
+    await service.create_session(app_name="tool_runtime_demo", user_id="u", session_id="s")
+    message = types.Content(role="user", parts=[types.Part(text="Full-spectrum audit of the AI Gateway.")])
+    responses = []
+    started = time.perf_counter()
+    async for event in runner.run_async(user_id="u", session_id="s", new_message=message):
+        responses += [r.name for r in event.get_function_responses()]
+    return time.perf_counter() - started, responses
+
+
+async def _demo():
+    from google.genai import types
+
+    tools = _dossier_tools()
+    await _run_dossier(ToolRuntime(default_timeout=0.01).wrap_all(tools))  # Warm-up: imports, first run.
+
+    # Hand-written loop path (lesson 06): every call of the turn in one execute().
+    runtime = ToolRuntime(tools, default_timeout=1.0)
+    calls = [types.FunctionCall(id=f"call_{i}", name=t.__name__, args=a) for i, (t, a) in enumerate(zip(tools, [
+        {"investment": "3000000", "projected_savings": "6500000"}, {"topic": "AI Gateway"},
+        {"topic": "AI Gateway"}, {"vendor": "Northwind"},
+    ]))]
+    started = time.perf_counter()
+    for call in calls:
+        await runtime.call(runtime.tools[call.name], call.args)
+    serial_s = time.perf_counter() - started
+    started = time.perf_counter()
+    message = await runtime.execute(calls)
+    execute_s = time.perf_counter() - started
+
+    # ADK-managed path (lesson 21): same turn, raw tools vs runtime-wrapped tools.
+    baseline_s, baseline_names = await _run_dossier(tools)
+    wrapped = ToolRuntime(default_timeout=1.0)
+    concurrent_s, names = await _run_dossier(wrapped.wrap_all(tools))
+
+    print("--- [DEMO] One model turn requesting 4 tools (2 async, 2 sync, one of them hung) ---")
+    print(f"execute(), calls one by one:         {serial_s:6.2f} s")
+    print(f"execute(), all calls concurrently:   {execute_s:6.2f} s | {len(message.parts)} responses in one message")
+    print(f"ADK turn, raw tools (sync inline):   {baseline_s:6.2f} s | responses: {len(baseline_names)}")
+    print(f"ADK turn, runtime-wrapped tools:     {concurrent_s:6.2f} s | responses: {len(names)}")
+    print(f"End-to-end turn latency saved: {baseline_s - concurrent_s:.2f} s ({baseline_s / concurrent_s:.1f}x)")
+    for name, metrics in wrapped.stats().items():
+        print(f"  {name:30} {metrics}")
+    runtime.shutdown()
+    wrapped.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
@@ -0,0 +1,206 @@
+"""
+FILE: config/ttl_cache.py
+DESCRIPTION: Async TTL cache with stale-while-revalidate and request coalescing for I/O tools.
+ARCHITECT'S NOTE: Market feeds, the SKB and the archive stand in for slow external
+lookups, and under load every session paid that latency for the same sector key.
+Each wrapped tool gets its own bounded cache and TTL:
+  * fresh entry     -> returned immediately;
+  * stale entry     -> returned immediately while one background task refreshes it
+                       (until `ttl + stale_ttl`, after which callers wait again);
+  * missing entry   -> fetched once; concurrent callers of the same key await that
+                       single in-flight fetch instead of issuing their own.
+Failed fetches are never cached; a failed background refresh keeps serving the stale
+value until it ages out.
+
+BENCHMARK: python -m config.ttl_cache   (slow local stub backend, p50/p99 before and after)
+"""
+import asyncio
+import functools
+import inspect
+import time
+from collections import OrderedDict
+
+from config.tool_memo import ToolMemo
+
+
+class AsyncTTLCache:
+    """Bounded LRU of (value, fetched_at) with TTL, stale-while-revalidate and single-flight fetches."""
+
+    def __init__(self, ttl=300.0, stale_ttl=None, capacity=1024, clock=time.monotonic):
+        self.ttl = ttl
+        self.stale_ttl = ttl if stale_ttl is None else stale_ttl
+        self.capacity = capacity
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+                         "refreshes": 0, "refresh_errors": 0, "evictions": 0}
+
+    def _store(self, key, value):
+        self._entries[key] = (value, self.clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _fetch(self, key, fetch):
+        """One task per key; every concurrent caller shares it."""
+        task = self._inflight.get(key)
+        if task is None:
+            async def run():
+                try:
+                    value = await fetch()
+                    self._store(key, value)
+                    return value
+                finally:
+                    self._inflight.pop(key, None)
+
+            task = self._inflight[key] = asyncio.ensure_future(run())
+        return task
+
+    def _refresh_done(self, task):
+        if task.cancelled() or task.exception() is not None:
+            self.counters["refresh_errors"] += 1
+
+    async def get(self, key, fetch):
+        """Returns the cached value for `key`, calling the zero-arg coroutine `fetch` when needed."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = self.clock() - fetched_at
+            if age < self.ttl:
+                self.counters["hits"] += 1
+                self._entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.counters["stale_hits"] += 1
+                if key not in self._inflight:
+                    self.counters["refreshes"] += 1
+                    self._fetch(key, fetch).add_done_callback(self._refresh_done)
+                return value
+        if key in self._inflight:
+            self.counters["coalesced"] += 1
+        else:
+            self.counters["misses"] += 1
+        # Shield: one caller being cancelled must not cancel the fetch the others await.
+        return await asyncio.shield(self._fetch(key, fetch))
+
+    async def drain(self):
+        """Waits for in-flight fetches and refreshes (call before closing the backend/loop)."""
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+
+    def wrap(self, func, key=None):
+        """Decorator for an async tool; `key(**kwargs)` overrides the default normalized-argument key."""
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def tool(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else ToolMemo.key(func, signature, args, kwargs)
+            return await self.get(cache_key, lambda: func(*args, **kwargs))
+
+        tool.cache = self
+        return tool
+
+    def stats(self):
+        served = self.counters["hits"] + self.counters["stale_hits"] + self.counters["coalesced"]
+        calls = served + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": len(self._entries),
+            "ttl_s": self.ttl,
+            "stale_ttl_s": self.stale_ttl,
+            "hit_rate": round(served / calls, 3) if calls else 0.0,
+        }
+
+
+# --- BENCHMARK: many sessions against a deliberately slow local HTTP stub ---
+
+async def _slow_backend(delay_s, jitter_s):
+    """Minimal HTTP/1.0 server: sleeps delay +/- jitter, then echoes the path."""
+    import random
+
+    rng = random.Random(7)
+    served = {"requests": 0}
+
+    async def handle(reader, writer):
+        request = await reader.readuntil(b"\r\n\r\n")
+        served["requests"] += 1
+        await asyncio.sleep(max(0.0, delay_s + rng.uniform(-jitter_s, jitter_s)))
+        body = request.split(b" ")[1]
+        writer.write(b"HTTP/1.0 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1], served
+
+
+async def _http_get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.0\r\nHost: stub\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response.split(b"\r\n\r\n", 1)[1].decode()
+
+
+async def _load(tool, sectors, sessions, calls, think_s, seed=3):
+    import random
+
+    latencies = []
+
+    async def session(index):
+        rng = random.Random(seed * 1000 + index)
+        for _ in range(calls):
+            # Skewed demand: a handful of sectors carry most of the traffic.
+            sector = sectors[min(int(rng.expovariate(0.35)), len(sectors) - 1)]
+            started = time.perf_counter()
+            await tool(industry_vector=sector)
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(rng.uniform(0, think_s))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    latencies.sort()
+    return {
+        "wall_s": time.perf_counter() - started,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "calls": len(latencies),
+    }
+
+
+async def _benchmark(sessions=50, calls=40, delay_s=0.12, ttl_s=0.5):
+    server, port, served = await _slow_backend(delay_s, jitter_s=0.04)
+    sectors = ["Banking", "Healthcare", "Supply Chain", "Retail", "Energy", "Telecom", "Insurance", "Public Sector"]
+
+    async def fetch_industry_intelligence(industry_vector: str) -> str:
+        sector = str(industry_vector).strip().title()
+        return "[EXTERNAL DATA SOURCE] " + await _http_get(port, "/" + sector.replace(" ", "_"))
+
+    print(f"--- [BENCHMARK] {sessions} sessions x {calls} calls | backend {delay_s * 1000:.0f} ms +/- 40 ms "
+          f"| TTL {ttl_s} s + {ttl_s} s stale ---")
+    before = await _load(fetch_industry_intelligence, sectors, sessions, calls, think_s=0.05)
+    backend_before = served["requests"]
+
+    cache = AsyncTTLCache(ttl=ttl_s, capacity=64)
+    cached = cache.wrap(fetch_industry_intelligence, key=lambda industry_vector: str(industry_vector).strip().title())
+    after = await _load(cached, sectors, sessions, calls, think_s=0.05)
+    backend_after = served["requests"] - backend_before
+
+    for label, result, requests in (("uncached", before, backend_before), ("TTL + SWR", after, backend_after)):
+        print(f"{label:>10}: p50 {result['p50_ms']:7.1f} ms | p95 {result['p95_ms']:7.1f} ms | p99 {result['p99_ms']:7.1f} ms | "
+              f"wall {result['wall_s']:5.2f} s | backend requests {requests:,} / {result['calls']:,} calls")
+    stats = cache.stats()
+    print(f"Callers that waited on the backend (cold misses + coalesced): {stats['misses'] + stats['coalesced']}"
+          f" of {after['calls']:,}; stale entries served instantly: {stats['stale_hits']}")
+    print(f"Cache: {stats}")
+    await cache.drain()
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(_benchmark())
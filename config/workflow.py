@@ -0,0 +1,255 @@
+"""
+FILE: config/workflow.py
+DESCRIPTION: DAG workflow executor for multi-agent pipelines (war rooms, review boards).
+ARCHITECT'S NOTE: Lesson 10 awaited pitch -> audit -> verdict one after another, so
+independent critiques (legal, security, CFO) queued behind each other. Here each
+stage declares the stages whose outputs it reads. The executor validates the graph
+(unknown inputs and cycles fail before anything runs) and starts every stage as soon
+as its inputs exist, under one global concurrency cap. It yields a completion event
+per stage, so the caller can stream progress. Every event carries a span (start, end,
+latency, prompt and output tokens); a failed stage skips only its dependents.
+
+Wall time therefore approaches the critical path (the slowest chain of dependent
+stages) instead of the sum of all stages.
+
+DEMO: python -m config.workflow   (6-agent war room: serial vs DAG, critical path)
+"""
+import asyncio
+import time
+
+from config.context_compaction import estimate_tokens
+
+
+class Workflow:
+    """Stages with declared inputs; `stream()` runs ready stages concurrently under a cap."""
+
+    def __init__(self, max_concurrency=4):
+        self.max_concurrency = max_concurrency
+        self.stages = {}
+
+    def add(self, name, run, inputs=()):
+        """`run(inputs)` is async and returns text or (text, {'prompt_tokens', 'output_tokens'})."""
+        if name in self.stages:
+            raise ValueError(f"Duplicate workflow stage '{name}'")
+        self.stages[name] = (run, tuple(inputs))
+        return self
+
+    def order(self, provided=()):
+        """Topological order; raises ValueError on unknown inputs or cycles."""
+        known = set(self.stages) | set(provided)
+        for name, (_, inputs) in self.stages.items():
+            missing = [i for i in inputs if i not in known]
+            if missing:
+                raise ValueError(f"Stage '{name}' reads unknown inputs: {missing}")
+        waiting = {name: {i for i in inputs if i in self.stages} for name, (_, inputs) in self.stages.items()}
+        ordered = []
+        ready = [name for name, deps in waiting.items() if not deps]
+        while ready:
+            name = ready.pop(0)
+            ordered.append(name)
+            for other, deps in waiting.items():
+                if name in deps:
+                    deps.discard(name)
+                    if not deps:
+                        ready.append(other)
+        if len(ordered) != len(self.stages):
+            raise ValueError(f"Workflow cycle among: {sorted(set(self.stages) - set(ordered))}")
+        return ordered
+
+    async def _run_stage(self, name, run, inputs, semaphore, origin):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await run(inputs)
+                text, usage = result if isinstance(result, tuple) else (result, {})
+                status, error = "done", None
+            except Exception as exc:
+                text, usage, status, error = None, {}, "failed", f"{type(exc).__name__}: {exc}"
+            finished = time.perf_counter()
+        prompt = "\n".join(str(v) for v in inputs.values())
+        return {
+            "stage": name, "status": status, "output": text, "error": error,
+            "start_s": round(started - origin, 4), "end_s": round(finished - origin, 4),
+            "latency_s": round(finished - started, 4),
+            "prompt_tokens": usage.get("prompt_tokens", estimate_tokens(prompt)),
+            "output_tokens": usage.get("output_tokens", estimate_tokens(text or "")),
+        }
+
+    async def stream(self, provided=None):
+        """Async generator of stage events in completion order ('done', 'failed' or 'skipped')."""
+        provided = dict(provided or {})
+        self.order(provided)
+        outputs = dict(provided)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        origin = time.perf_counter()
+        pending = dict(self.stages)
+        running = {}
+        try:
+            while pending or running:
+                for name, (run, inputs) in list(pending.items()):
+                    if any(i in pending or i in running.values() for i in inputs):
+                        continue
+                    del pending[name]
+                    if any(outputs.get(i) is None for i in inputs):
+                        outputs[name] = None
+                        yield {"stage": name, "status": "skipped", "output": None,
+                               "error": f"upstream failed: {[i for i in inputs if outputs.get(i) is None]}"}
+                        continue
+                    task = asyncio.ensure_future(self._run_stage(
+                        name, run, {i: outputs[i] for i in inputs}, semaphore, origin))
+                    running[task] = name
+                if not running:
+                    continue
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    del running[task]
+                    event = task.result()
+                    outputs[event["stage"]] = event["output"]
+                    yield event
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def run(self, provided=None):
+        """Runs to completion; returns ({stage: output}, [events in completion order])."""
+        events = [event async for event in self.stream(provided)]
+        return {e["stage"]: e["output"] for e in events}, events
+
+    def critical_path(self, events):
+        """(stages, seconds): the slowest chain of dependent stages, from measured latencies."""
+        latency = {e["stage"]: e.get("latency_s", 0.0) for e in events}
+        finish, parent = {}, {}
+        for name in self.order(p for _, inputs in self.stages.values() for p in inputs if p not in self.stages):
+            deps = [i for i in self.stages[name][1] if i in self.stages]
+            before = max(deps, key=lambda d: finish[d], default=None)
+            finish[name] = latency.get(name, 0.0) + (finish[before] if before else 0.0)
+            parent[name] = before
+        if not finish:
+            return [], 0.0
+        # Ties (zero-latency tail stages) resolve to the latest stage so the path reaches the sink.
+        stage = max(reversed(list(finish)), key=finish.get)
+        total = finish[stage]
+        path = []
+        while stage:
+            path.append(stage)
+            stage = parent[stage]
+        return path[::-1], round(total, 4)
+
+
+def agent_stage(agent, prompt, user_id, session_id):
+    """Stage running an ADK agent; `prompt` is a str.format template over the stage inputs."""
+    async def run(inputs):
+        from google.genai import types
+
+        from config.settings import get_runner
+
+        message = types.Content(role="user", parts=[types.Part(text=prompt.format(**inputs))])
+        text, usage = "", {}
+        async for event in get_runner(agent).run_async(user_id=user_id, session_id=session_id, new_message=message):
+            if event.usage_metadata:
+                usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + (event.usage_metadata.prompt_token_count or 0)
+                usage["output_tokens"] = usage.get("output_tokens", 0) + (event.usage_metadata.candidates_token_count or 0)
+            if event.is_final_response() and event.content and event.content.parts:
+                text = event.content.parts[0].text or ""
+        return text, usage
+
+    return run
+
+
+# --- DEMO: a 6-agent war room on scripted models, serial vs DAG ---
+
+_WAR_ROOM = {
+    # stage: (latency s, inputs)
+    "pitch": (0.6, ("proposal",)),
+    "market_scan": (0.5, ("proposal",)),
+    "cfo_audit": (0.7, ("pitch",)),
+    "legal_review": (0.5, ("pitch",)),
+    "security_review": (0.6, ("pitch", "market_scan")),
+    "verdict": (0.5, ("cfo_audit", "legal_review", "security_review")),
+}
+
+
+async def _demo():
+    from google.adk.agents import Agent
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
+    class ScriptedExecutive(BaseLlm):
+        """Fixed generation latency; echoes the head of its prompt; reports token usage."""
+        latency_s: float = 0.5
+
+        async def generate_content_async(self, llm_request, stream=False):
+            prompt = " ".join(p.text or "" for c in llm_request.contents for p in c.parts or ())
+            await asyncio.sleep(self.latency_s)
+            text = f"[{llm_request.config.system_instruction.split('.')[0]}] reviewed {estimate_tokens(prompt)} tokens."
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                usage_metadata=types.GenerateContentResponseUsageMetadata(
+                    prompt_token_count=estimate_tokens(prompt), candidates_token_count=estimate_tokens(text)),
+            )
+
+    service = InMemorySessionService()
+
+    async def build(max_concurrency):
+        workflow = Workflow(max_concurrency=max_concurrency)
+        for name, (latency, inputs) in _WAR_ROOM.items():
+            agent = Agent(name=name, instruction=f"You are the {name} lead.",
+                          model=ScriptedExecutive(model="scripted", latency_s=latency))
+            runner = Runner(agent=agent, app_name="workflow_demo", session_service=service)
+
+            async def run(values, runner=runner, inputs=inputs):
+                message = types.Content(role="user", parts=[types.Part(
+                    text="\n\n".join(f"{k.upper()}: {values[k]}" for k in inputs))])
+                text, usage = "", {"prompt_tokens": 0, "output_tokens": 0}
+                session = await service.create_session(app_name="workflow_demo", user_id="u")
+                async for event in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+                    if event.usage_metadata:
+                        usage["prompt_tokens"] += event.usage_metadata.prompt_token_count or 0
+                        usage["output_tokens"] += event.usage_metadata.candidates_token_count or 0
+                    if event.is_final_response():
+                        text = event.content.parts[0].text
+                return text, usage
+
+            workflow.add(name, run, inputs)
+        return workflow
+
+    proposal = {"proposal": "Decommission 100% of human-led customer support in favor of Agentic AI by Q1 2026."}
+    await (await build(6)).run(proposal)  # Warm-up: imports, first runner.
+    results = {}
+    for label, cap in (("serial (cap 1)", 1), ("DAG (cap 4)", 4)):
+        workflow = await build(cap)
+        started = time.perf_counter()
+        print(f"--- [DEMO] {label} ---")
+        events = []
+        async for event in workflow.stream(proposal):
+            events.append(event)
+            print(f"  {event['end_s']:5.2f} s  {event['stage']:<16} {event['status']} "
+                  f"({event['latency_s']:.2f} s, {event['prompt_tokens']} -> {event['output_tokens']} tokens)")
+        results[label] = (time.perf_counter() - started, workflow.critical_path(events), events)
+
+    serial_s = results["serial (cap 1)"][0]
+    dag_s, (path, path_s), events = results["DAG (cap 4)"]
+    assert all(e["status"] == "done" for e in events) and len(events) == 6
+    print(f"Serial: {serial_s:.2f} s | DAG: {dag_s:.2f} s | critical path {' -> '.join(path)} = {path_s:.2f} s "
+          f"| speedup {serial_s / dag_s:.2f}x")
+
+    # Failure isolation: a broken stage skips its dependents, siblings still finish.
+    broken = await build(4)
+
+    async def fail(_):
+        raise RuntimeError("legal knowledge base offline")
+
+    broken.stages["legal_review"] = (fail, broken.stages["legal_review"][1])
+    _, events = await broken.run(proposal)
+    print("Failure isolation: " + ", ".join(f"{e['stage']}={e['status']}" for e in events))
+    try:
+        Workflow().add("a", fail, ["b"]).add("b", fail, ["a"]).order()
+    except ValueError as exc:
+        print(f"Cycle rejected before execution: {exc}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
@@ -0,0 +1,168 @@
+"""
+FILE: tests/test_load_balancer.py
+DESCRIPTION: Least-outstanding routing, health ejection / readmission and failover for the endpoint balancer.
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+from google.adk.models.lite_llm import LiteLLMClient
+
+from config.load_balancer import BalancedLiteLLMClient, EndpointBalancer
+
+URLS = ["http://node-a:11434", "http://node-b:11434", "http://node-c:11434"]
+
+
+def make_balancer(urls=URLS, **kwargs):
+    balancer = EndpointBalancer(urls, **kwargs)
+    balancer._ensure_health_checks = lambda: None  # No background probes against fake hosts.
+    return balancer
+
+
+def test_routes_to_least_outstanding_endpoint():
+    balancer = make_balancer()
+    held = [balancer.acquire() for _ in range(3)]
+    assert sorted(e.url for e, _ in held) == URLS  # One in flight on each node.
+    balancer.release(*held[1])
+    endpoint, _ = balancer.acquire()
+    assert endpoint is held[1][0]
+
+
+def test_prefers_faster_endpoint_among_equals():
+    balancer = make_balancer()
+    for endpoint, latency in zip(balancer.endpoints, (0.4, 0.05, 0.15)):
+        endpoint.record(latency, ok=True)
+    assert balancer.acquire()[0].url == URLS[1]
+
+
+def test_rotates_between_identical_endpoints():
+    balancer = make_balancer()
+    picks = []
+    for _ in range(6):
+        endpoint, started = balancer.acquire()
+        picks.append(endpoint.url)
+        endpoint.in_flight -= 1  # Release without recording latency: all stay identical.
+    assert set(picks) == set(URLS)
+
+
+def test_repeated_failures_eject_and_traffic_shifts():
+    balancer = make_balancer(eject_after=2)
+    bad = balancer.endpoints[0]
+    for _ in range(2):
+        bad.in_flight += 1
+        balancer.release(bad, time.perf_counter(), ok=False)
+    assert not bad.healthy
+    assert all(balancer.acquire()[0] is not bad for _ in range(10))
+
+
+def test_all_unhealthy_falls_back_to_every_endpoint():
+    balancer = make_balancer()
+    for endpoint in balancer.endpoints:
+        endpoint.healthy = False
+    assert balancer.acquire()[0] in balancer.endpoints
+
+
+class _ProbeClient:
+    def __init__(self, status=None, error=None):
+        self.status, self.error = status, error
+
+    async def get(self, url, headers=None):
+        if self.error:
+            raise self.error
+        return httpx.Response(self.status)
+
+
+def test_probe_ejects_after_threshold_and_readmits_on_recovery():
+    balancer = make_balancer(eject_after=2)
+    endpoint = balancer.endpoints[0]
+
+    async def probe(client, times):
+        for _ in range(times):
+            await balancer._probe(client, endpoint)
+
+    asyncio.run(probe(_ProbeClient(status=503), 1))
+    assert endpoint.healthy  # One failed probe is not enough.
+    asyncio.run(probe(_ProbeClient(error=httpx.ConnectError("refused")), 1))
+    assert not endpoint.healthy
+    asyncio.run(probe(_ProbeClient(status=200), 1))
+    assert endpoint.healthy and endpoint.consecutive_failures == 0
+
+
+def test_client_fails_over_from_a_dead_endpoint(monkeypatch):
+    balancer = make_balancer(URLS[:2], eject_after=2)
+    routed = []
+
+    async def fake_acompletion(self, model, messages, tools, **kwargs):
+        routed.append(kwargs["api_base"])
+        if kwargs["api_base"] == URLS[0]:
+            raise httpx.ConnectError("node-a is down")
+        return {"api_base": kwargs["api_base"]}
+
+    monkeypatch.setattr(LiteLLMClient, "acompletion", fake_acompletion)
+    client = BalancedLiteLLMClient(balancer)
+
+    async def call():
+        return await client.acompletion(model="ollama_chat/llama3.2", messages=[], tools=None)
+
+    async def run(calls):
+        results = []
+        for _ in range(calls):
+            try:
+                results.append(await call())
+            except httpx.ConnectError:
+                results.append(None)
+        return results
+
+    results = asyncio.run(run(12))
+    # At most eject_after calls ever reach the dead node; everything else lands on the live one.
+    assert 1 <= routed.count(URLS[0]) <= 2
+    assert results.count(None) == routed.count(URLS[0])
+    assert results[-8:] == [{"api_base": URLS[1]}] * 8
+    assert balancer.endpoints[1].errors == 0
+    assert all(e.in_flight == 0 for e in balancer.endpoints)
+
+    # Once ejected, even a burst of concurrent calls (all tied on in-flight) avoids it.
+    balancer.endpoints[0].healthy = False
+    routed.clear()
+
+    async def burst():
+        return await asyncio.gather(*(call() for _ in range(6)))
+
+    assert asyncio.run(burst()) == [{"api_base": URLS[1]}] * 6
+    assert routed == [URLS[1]] * 6
+
+
+def test_stream_stays_in_flight_until_last_chunk(monkeypatch):
+    balancer = make_balancer(URLS[:1])
+
+    async def chunks():
+        for piece in ("a", "b"):
+            yield piece
+
+    async def fake_acompletion(self, model, messages, tools, **kwargs):
+        return chunks()
+
+    monkeypatch.setattr(LiteLLMClient, "acompletion", fake_acompletion)
+    client = BalancedLiteLLMClient(balancer)
+    endpoint = balancer.endpoints[0]
+
+    async def consume():
+        stream = await client.acompletion(model="m", messages=[], tools=None, stream=True)
+        seen = []
+        async for chunk in stream:
+            seen.append((chunk, endpoint.in_flight))
+        return seen
+
+    assert asyncio.run(consume()) == [("a", 1), ("b", 1)]
+    assert endpoint.in_flight == 0 and endpoint.requests == 1
+
+
+@pytest.mark.parametrize("ok", [True, False])
+def test_release_records_latency_and_errors(ok):
+    balancer = make_balancer(URLS[:1])
+    endpoint, started = balancer.acquire()
+    balancer.release(endpoint, started, ok=ok)
+    metrics = balancer.metrics()[URLS[0]]
+    assert metrics["requests"] == 1 and metrics["in_flight"] == 0
+    assert metrics["errors"] == (0 if ok else 1)
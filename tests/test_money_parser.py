@@ -0,0 +1,62 @@
+"""
+FILE: tests/test_money_parser.py
+DESCRIPTION: The money parser's property / fuzz corpus and regression strings, as CI assertions.
+"""
+import math
+import random
+
+import pytest
+
+from config.money_parser import _property_corpus, normalize_arguments, parse_money, parse_money_range
+
+
+@pytest.mark.parametrize("seed", [21, 99, 7])
+def test_property_corpus(seed):
+    failures = []
+    for text, expected in _property_corpus(5000, seed=seed):
+        got = parse_money(text)
+        if got is None or not math.isclose(got, expected, rel_tol=1e-9, abs_tol=1e-9):
+            failures.append((text, expected, got))
+    assert failures == []
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("-(300k)", -3e5), ("(-300k)", -3e5), ("(300k)", -3e5), ("-($1.2M)", -1.2e6),
+    ("about 10 - 20k", 15e3), ("-$2-3M", -2.5e6), ("between $1M and $2M", 1.5e6),
+    ("$4.5M with 20% contingency", 4.5e6), ("a 2025-2026 budget of $4.5M", 4.5e6),
+    ("5 months", 5.0), ("half a million", 5e5), ("1.5-2M", 1.75e6),
+])
+def test_regressions(text, expected):
+    assert parse_money(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text, expected", [("-$2-3M", (-3e6, -2e6)), ("1.5-2M", (1.5e6, 2e6)), ("$5k", (5e3, 5e3))])
+def test_ranges(text, expected):
+    assert parse_money_range(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", ["10-15%", "15%", "10 to 15 %"])
+def test_percentages_are_not_money(text):
+    assert parse_money(text) is None
+    assert parse_money_range(text) is None
+
+
+@pytest.mark.parametrize("text", ["mom", "km", "bbb", "", "   ", None, True, "$", "--"])
+def test_letters_never_become_multipliers(text):
+    assert parse_money(text) is None
+
+
+def test_fuzz_never_raises():
+    rng = random.Random(3)
+    alphabet = "0123456789$€,.-()kmbKMB tonusdUSDmillionthousand%\t"
+    for _ in range(20_000):
+        junk = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+        value = parse_money(junk)
+        assert value is None or math.isfinite(value)
+        parse_money_range(junk)
+
+
+def test_normalize_arguments_routes_keys():
+    assert normalize_arguments('{"capex_estimate": "$1.2M", "opex_savings": "250k", "note": "n/a"}') == {
+        "cap_ex": 1.2e6, "annual_opex_savings": 2.5e5}
+    assert normalize_arguments("not json") == {}
@@ -0,0 +1,34 @@
+"""
+FILE: tests/test_startup_report.py
+DESCRIPTION: Cold-import budget for config.settings, enforced in CI.
+"""
+import subprocess
+import sys
+
+from config.startup_report import DEFAULT_BUDGET_MS, _REPO_ROOT, check_budget, collect_import_times
+
+# Everything settings hands out lazily; none of it may load on `import config.settings`.
+HEAVY_MODULES = ("litellm", "google.adk", "google.genai", "httpx", "numpy")
+
+
+def test_settings_import_is_within_budget():
+    assert check_budget(DEFAULT_BUDGET_MS), f"cold `import config.settings` exceeds {DEFAULT_BUDGET_MS:.0f} ms"
+
+
+def test_settings_import_defers_heavy_modules():
+    probe = f"import sys, config.settings; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", probe], cwd=_REPO_ROOT, capture_output=True, text=True,
+                            check=True).stdout.strip()
+    assert loaded == "", f"imported at startup: {loaded}"
+
+
+def test_budget_gate_fails_when_exceeded(capsys):
+    assert check_budget(0.001) is False
+    assert "OVER BUDGET" in capsys.readouterr().out
+
+
+def test_import_times_include_settings():
+    rows = collect_import_times("config.settings")
+    names = {name for name, _, _ in rows}
+    assert "config.settings" in names
+    assert all(self_us >= 0 and cumulative_us >= self_us for _, self_us, cumulative_us in rows)
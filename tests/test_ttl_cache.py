@@ -0,0 +1,193 @@
+"""
+FILE: tests/test_ttl_cache.py
+DESCRIPTION: TTL expiry, stale-while-revalidate and single-flight coalescing of AsyncTTLCache on a fake clock.
+"""
+import asyncio
+
+import pytest
+
+from config.ttl_cache import AsyncTTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class Backend:
+    """Counts calls; each fetch returns 'v<n>' once `gate` opens (or fails when `error` is set)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.error = None
+
+    def fetch(self):
+        self.calls += 1
+        call = self.calls
+
+        async def run():
+            await self.gate.wait()
+            if self.error:
+                raise self.error
+            return f"v{call}"
+
+        return run()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_fresh_entry_is_served_without_fetching(clock):
+    async def scenario():
+        cache, backend = AsyncTTLCache(ttl=10, clock=clock), Backend()
+        first = await cache.get("k", backend.fetch)
+        clock.advance(9.9)
+        return first, await cache.get("k", backend.fetch), backend.calls, cache.counters
+
+    first, second, calls, counters = run(scenario())
+    assert (first, second, calls) == ("v1", "v1", 1)
+    assert counters["misses"] == 1 and counters["hits"] == 1
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(clock):
+    async def scenario():
+        cache, backend = AsyncTTLCache(ttl=10, stale_ttl=10, clock=clock), Backend()
+        await cache.get("k", backend.fetch)
+        clock.advance(15)  # Past ttl, inside the stale window.
+        backend.gate.clear()
+        stale = await asyncio.gather(*(cache.get("k", backend.fetch) for _ in range(5)))
+        calls_during_refresh = backend.calls
+        backend.gate.set()
+        await cache.drain()
+        return stale, calls_during_refresh, await cache.get("k", backend.fetch), cache.counters
+
+    stale, calls_during_refresh, refreshed, counters = run(scenario())
+    assert stale == ["v1"] * 5  # Nobody waited on the backend.
+    assert calls_during_refresh == 2  # The initial fetch plus exactly one background refresh.
+    assert refreshed == "v2"
+    assert counters["stale_hits"] == 5 and counters["refreshes"] == 1 and counters["hits"] == 1
+
+
+def test_entry_past_stale_window_is_fetched_synchronously(clock):
+    async def scenario():
+        cache, backend = AsyncTTLCache(ttl=10, stale_ttl=5, clock=clock), Backend()
+        await cache.get("k", backend.fetch)
+        clock.advance(15)
+        return await cache.get("k", backend.fetch), cache.counters
+
+    value, counters = run(scenario())
+    assert value == "v2" and counters["misses"] == 2 and counters["stale_hits"] == 0
+
+
+def test_concurrent_misses_coalesce_into_one_fetch(clock):
+    async def scenario():
+        cache, backend = AsyncTTLCache(ttl=10, clock=clock), Backend()
+        backend.gate.clear()
+        waiters = [asyncio.ensure_future(cache.get("k", backend.fetch)) for _ in range(20)]
+        await asyncio.sleep(0)
+        backend.gate.set()
+        return await asyncio.gather(*waiters), backend.calls, cache.counters
+
+    values, calls, counters = run(scenario())
+    assert values == ["v1"] * 20 and calls == 1
+    assert counters["misses"] == 1 and counters["coalesced"] == 19
+
+
+def test_distinct_keys_do_not_coalesce(clock):
+    async def scenario():
+        cache, backend = AsyncTTLCache(ttl=10, clock=clock), Backend()
+        return await asyncio.gather(cache.get("a", backend.fetch), cache.get("b", backend.fetch)), backend.calls
+
+    values, calls = run(scenario())
+    assert sorted(values) == ["v1", "v2"] and calls == 2
+
+
+def test_failed_fetch_is_shared_and_never_cached(clock):
+    async def scenario():
+        cache, backend = AsyncTTLCache(ttl=10, clock=clock), Backend()
+        backend.error = ConnectionError("feed down")
+        results = await asyncio.gather(*(cache.get("k", backend.fetch) for _ in range(3)), return_exceptions=True)
+        backend.error = None
+        return results, await cache.get("k", backend.fetch), backend.calls
+
+    results, recovered, calls = run(scenario())
+    assert all(isinstance(r, ConnectionError) for r in results)
+    assert recovered == "v2" and calls == 2
+
+
+def test_failed_refresh_keeps_serving_stale_value(clock):
+    async def scenario():
+        cache, backend = AsyncTTLCache(ttl=10, stale_ttl=10, clock=clock), Backend()
+        await cache.get("k", backend.fetch)
+        clock.advance(12)
+        backend.error = ConnectionError("feed down")
+        stale = await cache.get("k", backend.fetch)
+        await cache.drain()
+        still_stale = await cache.get("k", backend.fetch)  # The failure was not cached: it retries.
+        await cache.drain()
+        return stale, still_stale, cache.counters
+
+    stale, still_stale, counters = run(scenario())
+    assert stale == still_stale == "v1"
+    assert counters["refreshes"] == 2 and counters["refresh_errors"] == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_fetch(clock):
+    async def scenario():
+        cache, backend = AsyncTTLCache(ttl=10, clock=clock), Backend()
+        backend.gate.clear()
+        first = asyncio.ensure_future(cache.get("k", backend.fetch))
+        second = asyncio.ensure_future(cache.get("k", backend.fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        backend.gate.set()
+        return await second, first.cancelled(), backend.calls
+
+    value, cancelled, calls = run(scenario())
+    assert value == "v1" and cancelled and calls == 1
+
+
+def test_capacity_evicts_least_recently_used(clock):
+    async def scenario():
+        cache, backend = AsyncTTLCache(ttl=10, capacity=2, clock=clock), Backend()
+        for key in ("a", "b"):
+            await cache.get(key, backend.fetch)
+        await cache.get("a", backend.fetch)  # "b" is now least recently used.
+        await cache.get("c", backend.fetch)
+        calls = backend.calls
+        await cache.get("a", backend.fetch)
+        return calls, backend.calls, cache.counters["evictions"], await cache.get("b", backend.fetch)
+
+    calls, calls_after_a, evictions, refetched_b = run(scenario())
+    assert calls == calls_after_a == 3 and evictions == 1 and refetched_b == "v4"
+
+
+def test_wrapped_tool_keys_on_normalized_arguments(clock):
+    calls = []
+
+    async def fetch_industry_intelligence(industry_vector: str) -> str:
+        calls.append(industry_vector)
+        return f"intel:{industry_vector.strip().title()}"
+
+    cache = AsyncTTLCache(ttl=10, clock=clock)
+    tool = cache.wrap(fetch_industry_intelligence, key=lambda industry_vector: industry_vector.strip().title())
+
+    async def scenario():
+        return [await tool(industry_vector=v) for v in ("banking", " Banking ", "BANKING", "Retail")]
+
+    assert run(scenario()) == ["intel:Banking"] * 3 + ["intel:Retail"]
+    assert calls == ["banking", "Retail"] and tool.cache is cache
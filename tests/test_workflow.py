@@ -0,0 +1,119 @@
+"""
+FILE: tests/test_workflow.py
+DESCRIPTION: DAG validation, failure isolation, skip propagation and the concurrency cap of Workflow.
+"""
+import asyncio
+
+import pytest
+
+from config.workflow import Workflow
+
+
+def stage(name, log=None, fail=False, gate=None):
+    async def run(inputs):
+        if log is not None:
+            log.append(("start", name))
+        if gate is not None:
+            await gate.wait()
+        await asyncio.sleep(0)
+        if log is not None:
+            log.append(("end", name))
+        if fail:
+            raise RuntimeError(f"{name} broke")
+        return f"{name}({','.join(f'{k}={v}' for k, v in sorted(inputs.items()))})"
+
+    return run
+
+
+def run_workflow(workflow, provided=None):
+    return asyncio.run(workflow.run(provided))
+
+
+def test_cycle_is_rejected_before_any_stage_runs():
+    log = []
+    workflow = (Workflow().add("a", stage("a", log), ["c"]).add("b", stage("b", log), ["a"])
+                .add("c", stage("c", log), ["b"]).add("free", stage("free", log)))
+    with pytest.raises(ValueError, match=r"cycle among: \['a', 'b', 'c'\]"):
+        run_workflow(workflow)
+    assert log == []
+
+
+def test_unknown_input_and_duplicate_stage_are_rejected():
+    with pytest.raises(ValueError, match="unknown inputs: \\['nope'\\]"):
+        run_workflow(Workflow().add("a", stage("a"), ["nope"]))
+    with pytest.raises(ValueError, match="Duplicate"):
+        Workflow().add("a", stage("a")).add("a", stage("a"))
+
+
+def test_outputs_flow_along_declared_inputs():
+    workflow = Workflow().add("pitch", stage("pitch"), ["proposal"]).add("verdict", stage("verdict"), ["pitch"])
+    outputs, events = run_workflow(workflow, {"proposal": "P"})
+    assert outputs["verdict"] == "verdict(pitch=pitch(proposal=P))"
+    assert [e["stage"] for e in events] == ["pitch", "verdict"]
+    assert workflow.order({"proposal"}) == ["pitch", "verdict"]
+
+
+def test_failure_skips_only_its_dependents():
+    log = []
+    workflow = (Workflow()
+                .add("pitch", stage("pitch", log), ["proposal"])
+                .add("legal", stage("legal", log, fail=True), ["pitch"])
+                .add("security", stage("security", log), ["pitch"])
+                .add("verdict", stage("verdict", log), ["legal", "security"])
+                .add("memo", stage("memo", log), ["security"]))
+    outputs, events = run_workflow(workflow, {"proposal": "P"})
+    status = {e["stage"]: e["status"] for e in events}
+    assert status == {"pitch": "done", "legal": "failed", "security": "done", "verdict": "skipped", "memo": "done"}
+    failed = next(e for e in events if e["stage"] == "legal")
+    assert failed["error"] == "RuntimeError: legal broke"
+    skipped = next(e for e in events if e["stage"] == "verdict")
+    assert skipped["error"] == "upstream failed: ['legal']"
+    assert ("start", "verdict") not in log
+    assert outputs["memo"] == "memo(security=security(pitch=pitch(proposal=P)))"
+
+
+def test_skip_propagates_transitively():
+    workflow = (Workflow().add("a", stage("a", fail=True)).add("b", stage("b"), ["a"])
+                .add("c", stage("c"), ["b"]).add("d", stage("d")))
+    _, events = run_workflow(workflow)
+    assert {e["stage"]: e["status"] for e in events} == {"a": "failed", "b": "skipped", "c": "skipped", "d": "done"}
+
+
+def test_independent_stages_run_concurrently_under_the_cap():
+    log = []
+    active = {"now": 0, "peak": 0}
+
+    def tracked(name):
+        async def run(inputs):
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+            log.append(name)
+            return name
+
+        return run
+
+    workflow = Workflow(max_concurrency=3)
+    for i in range(8):
+        workflow.add(f"critique_{i}", tracked(f"critique_{i}"), ["pitch"])
+    workflow.add("pitch", tracked("pitch"))
+    run_workflow(workflow)
+    assert active["peak"] == 3
+    assert log[0] == "pitch" and len(log) == 9
+
+
+def test_events_carry_spans_and_critical_path():
+    async def slow(inputs):
+        await asyncio.sleep(0.05)
+        return "slow", {"prompt_tokens": 7, "output_tokens": 3}
+
+    workflow = (Workflow().add("a", stage("a")).add("slow", slow, ["a"])
+                .add("fast", stage("fast"), ["a"]).add("end", stage("end"), ["slow", "fast"]))
+    _, events = run_workflow(workflow)
+    spans = {e["stage"]: e for e in events}
+    assert spans["slow"]["prompt_tokens"] == 7 and spans["slow"]["output_tokens"] == 3
+    assert all(e["end_s"] >= e["start_s"] >= 0 for e in events)
+    path, seconds = workflow.critical_path(events)
+    assert path == ["a", "slow", "end"]
+    assert seconds >= 0.05